@@ -18,11 +18,32 @@ app = marimo.App(width="full")
 
 
 @app.cell
-def define_vocabulary():
+def shared_imports():
+    """Modules several cells share, imported once: marimo allows one definition per name."""
+    from array import array
+    from collections.abc import Sequence
+    from types import MappingProxyType
+    from typing import Callable, Iterable, Iterator, Set, Tuple
+    import asyncio
+    import hashlib
+    import json
+    import math
+    import random
+    import sys
+    import time
+    import numpy as np
+
+    return (array, Sequence, MappingProxyType, Callable, Iterable, Iterator, Set, Tuple,
+            asyncio, hashlib, json, math, random, sys, time, np)
+
+
+@app.cell
+def define_vocabulary(MappingProxyType, Tuple):
     """The behavior vocabulary - like tracker effect commands."""
-    from dataclasses import dataclass, field
-    from typing import Dict, Any, Optional, List, Callable
+    from dataclasses import dataclass
+    from typing import Dict, Any, Optional
     from enum import Enum
+    from weakref import WeakValueDictionary
 
     class BehaviorType(Enum):
         """Core behavior verbs."""
@@ -38,20 +59,85 @@ def define_vocabulary():
         SAY = "say"         # Display text
         FLAG = "flag"       # Set a flag/trigger
 
-    @dataclass
+    @dataclass(frozen=True)
+    class Condition:
+        """A guard on a cell, kept as data until a pattern compiles it.
+
+        kind is "flag", "alive", "near", "every", or the combinators
+        "all", "any" and "not" (built with &, | and ~).
+        """
+        kind: str
+        args: Tuple = ()
+
+        def __and__(self, other): return Condition("all", (self, other))
+        def __or__(self, other): return Condition("any", (self, other))
+        def __invert__(self): return Condition("not", (self,))
+
+        def __repr__(self):
+            if self.kind in ("all", "any"):
+                joiner = " & " if self.kind == "all" else " | "
+                return "(" + joiner.join(map(repr, self.args)) + ")"
+            if self.kind == "not":
+                return f"~{self.args[0]!r}"
+            return f"{self.kind}({','.join(str(a) for a in self.args if a is not None)})"
+
     class Behavior:
-        """A single behavior command."""
-        verb: BehaviorType
-        params: Dict[str, Any] = field(default_factory=dict)
+        """A single behavior command.
+
+        Behaviors are immutable flyweights: constructing one that already
+        exists returns the shared instance for as long as anything still
+        holds it. Pickling sends the verb, params and guard, so a behavior
+        is interned again on arrival. A guard makes the cell conditional
+        (see when()).
+        """
+        __slots__ = ("verb", "params", "guard", "__weakref__")
+        _interned: "WeakValueDictionary[tuple, Behavior]" = WeakValueDictionary()
+
+        def __new__(cls, verb: BehaviorType, params: Optional[Dict[str, Any]] = None,
+                    guard: Optional[Condition] = None):
+            params = params or {}
+            # type() keeps move(1, 0) and move(1.0, 0) apart - they print differently
+            key = (verb, tuple((k, type(v), v) for k, v in params.items()), guard)
+            try:
+                return cls._interned[key]
+            except KeyError:
+                pass
+            except TypeError:  # unhashable param value: a private, un-interned copy
+                key = None
+            b = object.__new__(cls)
+            object.__setattr__(b, "verb", verb)
+            object.__setattr__(b, "params", MappingProxyType(dict(params)))
+            object.__setattr__(b, "guard", guard)
+            if key is not None:
+                cls._interned[key] = b
+            return b
+
+        def __setattr__(self, name, value):
+            raise AttributeError("Behavior is immutable")
+
+        def __reduce__(self):
+            return Behavior, (self.verb, dict(self.params), self.guard)
+
+        def __eq__(self, other):
+            if not isinstance(other, Behavior):
+                return NotImplemented
+            return self is other or (self.verb == other.verb and self.params == other.params
+                                     and self.guard == other.guard)
+
+        def __hash__(self):
+            return hash((self.verb, tuple(self.params), self.guard))
 
         def __repr__(self):
             if self.verb == BehaviorType.NOP:
                 return "."
             p = ",".join(f"{v}" for v in self.params.values())
-            return f"{self.verb.value}({p})" if p else self.verb.value
+            text = f"{self.verb.value}({p})" if p else self.verb.value
+            return f"?{text}" if self.guard is not None else text
+
+    NOP = Behavior(BehaviorType.NOP)
 
     # Shorthand constructors
-    def nop(): return Behavior(BehaviorType.NOP)
+    def nop(): return NOP
     def spawn(x, y): return Behavior(BehaviorType.SPAWN, {"x": x, "y": y})
     def move(dx, dy): return Behavior(BehaviorType.MOVE, {"dx": dx, "dy": dy})
     def jump(force): return Behavior(BehaviorType.JUMP, {"force": force})
@@ -63,32 +149,187 @@ def define_vocabulary():
     def say(text): return Behavior(BehaviorType.SAY, {"text": text})
     def flag(name): return Behavior(BehaviorType.FLAG, {"name": name})
 
-    return (BehaviorType, Behavior, nop, spawn, move, jump,
-            chase, flee, shoot, die, wait, say, flag)
+    # Conditions: when(if_flag("door_open") & every(4), move(1, 0))
+    def if_flag(name): return Condition("flag", (name,))
+    def if_alive(entity=None): return Condition("alive", (entity,))  # None: the cell's own entity
+    def if_near(target, radius): return Condition("near", (target, radius))
+    def every(n, offset=0):
+        if n < 1:
+            raise ValueError(f"every(n) needs n >= 1, got {n!r}")
+        return Condition("every", (n, offset % n))
+
+    def when(condition: Condition, behavior: Behavior) -> Behavior:
+        """behavior, but only on ticks where condition holds."""
+        return Behavior(behavior.verb, dict(behavior.params), condition)
+
+    return (BehaviorType, Condition, Behavior, NOP, nop, spawn, move, jump,
+            chase, flee, shoot, die, wait, say, flag,
+            if_flag, if_alive, if_near, every, when)
 
 
 @app.cell
-def define_pattern_structure(Behavior, nop):
+def define_pattern_structure(Behavior, BehaviorType, Condition, nop, Callable, MappingProxyType,
+                             Sequence, Tuple, array, math):
     """Patterns: the reusable building blocks."""
     from dataclasses import dataclass, field
-    from typing import List, Dict
+    from typing import List, Dict, Mapping, Optional
+    from collections.abc import MutableSequence
+    import functools
+
+    class BehaviorPalette:
+        """The distinct behaviors of a song (or a lone channel), numbered in first-use order."""
+
+        def __init__(self):
+            self.behaviors: List[Behavior] = []
+            self.ids: Dict[Behavior, int] = {}
+
+        def id_of(self, b: Behavior) -> int:
+            i = self.ids.get(b)
+            if i is None:
+                i = self.ids[b] = len(self.behaviors)
+                self.behaviors.append(b)
+            return i
+
+        def __len__(self):
+            return len(self.behaviors)
+
+        def __reduce__(self):
+            # ids are only meaningful next to the rows that use them, and
+            # CompactRows pickle as Behaviors: those rows fill a fresh palette
+            return BehaviorPalette, ()
+
+    class CompactRows(MutableSequence):
+        """A channel's rows as 4-byte ids into a BehaviorPalette, read back as Behaviors.
+
+        A mutable sequence rather than a list: indexing, slicing (to
+        CompactRows), assignment, append/extend/insert/pop/del and ==
+        against any sequence all work as on a list. Rows pickle as their
+        list of Behaviors and are encoded again on arrival, so they never
+        depend on ids assigned in another process.
+        """
+        __slots__ = ("ids", "palette")
+
+        def __init__(self, rows=(), palette: Optional[BehaviorPalette] = None):
+            self.palette = BehaviorPalette() if palette is None else palette
+            self.ids = array("I", map(self.palette.id_of, rows))
+
+        def __len__(self):
+            return len(self.ids)
+
+        def __getitem__(self, i):
+            if isinstance(i, slice):
+                sliced = CompactRows(palette=self.palette)
+                sliced.ids = self.ids[i]
+                return sliced
+            return self.palette.behaviors[self.ids[i]]
+
+        def __setitem__(self, i, b):
+            if isinstance(i, slice):
+                self.ids[i] = array("I", map(self.palette.id_of, b))
+            else:
+                self.ids[i] = self.palette.id_of(b)
+
+        def __delitem__(self, i):
+            del self.ids[i]
+
+        def insert(self, i, b):
+            self.ids.insert(i, self.palette.id_of(b))
+
+        def rehome(self, palette: BehaviorPalette):
+            """Re-encode the rows against palette (a song's shared one)."""
+            if palette is not self.palette:
+                self.ids = array("I", map(palette.id_of, self))
+                self.palette = palette
+
+        def __eq__(self, other):
+            return isinstance(other, Sequence) and list(self) == list(other)
+
+        __hash__ = None
+
+        def __reduce__(self):
+            return CompactRows, (list(self), self.palette)
+
+        def __repr__(self):
+            return repr(list(self))
 
     @dataclass
     class Channel:
-        """A single entity's behavior track."""
+        """A single entity's behavior track; rows are stored as CompactRows."""
         name: str
         entity_type: str  # "player", "enemy", "item", "world"
         rows: List[Behavior] = field(default_factory=list)
 
+        def __post_init__(self):
+            if not isinstance(self.rows, CompactRows):
+                self.rows = CompactRows(self.rows)
+
+    def compile_condition(cond: Condition, entity: str) -> Callable[[object], bool]:
+        """Turn a Condition into a closure over the world, once, at pattern load."""
+        kind, args = cond.kind, cond.args
+        if kind == "flag":
+            name = args[0]
+            return lambda world: name in world.flags
+        if kind == "alive":
+            target = args[0] or entity
+
+            def alive(world):
+                e = world.get_entity(target)
+                return e is not None and bool(e.alive)
+            return alive
+        if kind == "near":
+            target, radius = args
+            return lambda world: world.distance(entity, target) <= radius
+        if kind == "every":
+            n, offset = args
+            return lambda world: world.tick % n == offset
+        parts = [compile_condition(c, entity) for c in args]
+        if kind == "all":
+            return functools.reduce(lambda p, q: lambda world: p(world) and q(world), parts)
+        if kind == "any":
+            return functools.reduce(lambda p, q: lambda world: p(world) or q(world), parts)
+        if kind == "not":
+            inner = parts[0]
+            return lambda world: not inner(world)
+        raise ValueError(f"unknown condition kind {kind!r}")
+
+    def lcm(*numbers: int) -> int:
+        """Least common multiple, 1 for none (math.lcm needs Python 3.9)."""
+        return functools.reduce(lambda a, b: a * b // math.gcd(a, b), numbers, 1)
+
+    def condition_period(cond: Condition) -> int:
+        """LCM of the every(n) moduli in cond - its tick-dependence repeats this often."""
+        if cond.kind == "every":
+            return cond.args[0]
+        if cond.kind in ("all", "any", "not"):
+            return lcm(*(condition_period(c) for c in cond.args))
+        return 1
+
+    @dataclass
+    class TickTable:
+        """A pattern frozen tick-major: rows[t] holds one Behavior per channel.
+
+        Short channels are padded with NOP once, each tick's channel →
+        behavior mapping is prebuilt and read-only, and idle[t] marks ticks
+        where every channel is NOP. guards[t] lists (channel, predicate)
+        for the tick's conditional cells; period is the LCM of their
+        every(n) moduli.
+        """
+        names: Tuple[str, ...]
+        rows: List[Tuple[Behavior, ...]]
+        views: List[Mapping[str, Behavior]]
+        idle: List[bool]
+        guards: List[Tuple[Tuple[str, Callable[[object], bool]], ...]] = field(default_factory=list)
+        period: int = 1
+
     @dataclass
     class Pattern:
         """A pattern = N ticks × M channels, like tracker pattern."""
         name: str
         length: int  # number of ticks
         channels: List[Channel] = field(default_factory=list)
+        table: Optional[TickTable] = field(default=None, repr=False, compare=False)
 
-        def get_tick(self, tick: int) -> Dict[str, Behavior]:
-            """Get all behaviors for a given tick."""
+        def _build_tick(self, tick: int) -> Dict[str, Behavior]:
             result = {}
             for ch in self.channels:
                 if tick < len(ch.rows):
@@ -97,27 +338,462 @@ def define_pattern_structure(Behavior, nop):
                     result[ch.name] = nop()
             return result
 
+        def freeze(self) -> TickTable:
+            """Precompute the tick table. Call again after editing channels."""
+            built = [self._build_tick(t) for t in range(self.length)]
+            compiled: Dict[Tuple[Condition, str], Callable[[object], bool]] = {}
+            guards = []
+            period = 1
+            for b in built:
+                tick_guards = []
+                for name, v in b.items():
+                    if v.guard is None:
+                        continue
+                    key = (v.guard, name)
+                    if key not in compiled:
+                        compiled[key] = compile_condition(v.guard, name)
+                        period = lcm(period, condition_period(v.guard))
+                    tick_guards.append((name, compiled[key]))
+                guards.append(tuple(tick_guards))
+            self.table = TickTable(
+                names=tuple(built[0]) if built else (),
+                rows=[tuple(b.values()) for b in built],
+                views=[MappingProxyType(b) for b in built],
+                idle=[all(v.verb == BehaviorType.NOP for v in b.values()) for b in built],
+                guards=guards,
+                period=period,
+            )
+            return self.table
+
+        def get_tick(self, tick: int) -> Mapping[str, Behavior]:
+            """Get all behaviors for a given tick (a shared view once frozen)."""
+            if self.table is not None and 0 <= tick < self.length:
+                return self.table.views[tick]
+            return self._build_tick(tick)
+
+        def live_tick(self, tick: int, world) -> Mapping[str, Behavior]:
+            """get_tick minus the conditional cells whose guard fails in world.
+
+            Ticks with no guards return the shared view untouched, so
+            unconditional patterns pay one list lookup per tick.
+            """
+            if self.table is None:
+                self.freeze()
+            if not 0 <= tick < self.length:
+                return self._build_tick(tick)
+            view = self.table.views[tick]
+            guards = self.table.guards[tick]
+            if not guards:
+                return view
+            skipped = [name for name, test in guards if not test(world)]
+            if not skipped:
+                return view
+            return {name: b for name, b in view.items() if name not in skipped}
+
+        def is_idle(self, tick: int) -> bool:
+            """True if the frozen table says every channel is NOP at tick."""
+            return self.table is not None and 0 <= tick < self.length and self.table.idle[tick]
+
         def __repr__(self):
             header = f"Pattern: {self.name} ({self.length} ticks, {len(self.channels)} channels)"
             return header
 
     @dataclass
     class Song:
-        """A song = sequence of pattern references, like tracker song."""
+        """A song = sequence of pattern references, like tracker song.
+
+        The song's channels share one BehaviorPalette, which lives and dies
+        with the song.
+        """
         name: str
         patterns: Dict[str, Pattern] = field(default_factory=dict)
         sequence: List[str] = field(default_factory=list)  # pattern names in order
         loop_point: int = 0  # where to loop back to
+        palette: BehaviorPalette = field(default_factory=BehaviorPalette, repr=False,
+                                         compare=False)
+
+        def __post_init__(self):
+            for pattern in self.patterns.values():
+                self._adopt(pattern)
+                if pattern.table is None:
+                    pattern.freeze()
+
+        def _adopt(self, pattern: Pattern):
+            for channel in pattern.channels:
+                if isinstance(channel.rows, CompactRows):
+                    channel.rows.rehome(self.palette)
+
+        def add_pattern(self, pattern: Pattern):
+            """Register (and freeze) a pattern under its name."""
+            self._adopt(pattern)
+            pattern.freeze()
+            self.patterns[pattern.name] = pattern
+
+    return BehaviorPalette, CompactRows, compile_condition, lcm, TickTable, Channel, Pattern, Song
+
+
+@app.cell
+def define_events(Callable, Iterator, Sequence, np):
+    """Structured event log: a preallocated ring of (tick, verb, entity, payload)."""
+    from dataclasses import dataclass
+    from typing import Dict, List, Optional
+
+    class EventVerb:
+        """Verb codes as plain ints: enum member lookup costs more than the event."""
+        SPAWN = 0
+        DIE = 1
+        SAY = 2
+        FLAG = 3
+        HIT = 4
+        NOTE = 5  # free text, e.g. messages restored from a snapshot
+        names = ("SPAWN", "DIE", "SAY", "FLAG", "HIT", "NOTE")
+
+    def _num(v):
+        return int(v) if isinstance(v, float) and v.is_integer() else v
+
+    def format_event(tick, verb, entity="", a=0, b=0, text="") -> str:
+        """The human-readable line for one event - what world.messages used to hold."""
+        if verb == EventVerb.SPAWN:
+            return f"T{tick}: {entity} spawned at ({_num(a)},{_num(b)})"
+        if verb == EventVerb.DIE:
+            return f"T{tick}: {entity} died"
+        if verb == EventVerb.SAY:
+            return f"T{tick}: {entity}: '{text}'"
+        if verb == EventVerb.FLAG:
+            return f"T{tick}: FLAG '{text}' set"
+        if verb == EventVerb.HIT:
+            return f"T{tick}: {entity} hit by {text}"
+        return text
+
+    @dataclass(frozen=True)
+    class Event:
+        seq: int
+        tick: int
+        verb: int  # EventVerb code
+        entity: str
+        a: float
+        b: float
+        text: str
+
+        def __str__(self):
+            return format_event(self.tick, self.verb, self.entity, self.a, self.b, self.text)
+
+    class EventLog:
+        """The last capacity events in a preallocated ring.
+
+        A record is a plain (tick, verb, entity, a, b, text) tuple stored
+        into a fixed list slot - cheaper than formatting it, and nothing is
+        formatted until someone reads it. Sequence numbers keep counting
+        past the ring; reading one that has been overwritten raises an
+        IndexError that says it was evicted.
+        """
+
+        def __init__(self, capacity: int = 4096):
+            self.capacity = capacity
+            self.ring: List[tuple] = [None] * capacity
+            self.head = 0  # sequence number of the next event
+            self.subscribers: List[List[Callable[[Event], None]]] = [[] for _ in EventVerb.names]
+
+        def emit(self, tick: int, verb: int, entity: str = "",
+                 a: float = 0, b: float = 0, text: str = ""):
+            seq = self.head
+            self.ring[seq % self.capacity] = (tick, verb, entity, a, b, text)
+            self.head = seq + 1
+            if self.subscribers[verb]:
+                event = self[seq]
+                for callback in self.subscribers[verb]:
+                    callback(event)
+
+        def subscribe(self, verb: int, callback: Callable[[Event], None]):
+            """Call callback with every future event of this verb."""
+            self.subscribers[verb].append(callback)
+            return callback
+
+        def unsubscribe(self, verb: int, callback: Callable[[Event], None]):
+            self.subscribers[verb].remove(callback)
+
+        @property
+        def oldest(self) -> int:
+            return max(0, self.head - self.capacity)
+
+        def __len__(self):
+            return self.head - self.oldest
+
+        def _check(self, start: int, stop: int):
+            if start < self.oldest:
+                raise IndexError(f"event {start} was evicted from the log "
+                                 f"(capacity {self.capacity}, holding {self.oldest}..{self.head - 1})")
+            if not 0 <= start <= stop <= self.head:
+                raise IndexError(f"events {start}..{stop - 1} are not in the log "
+                                 f"(holding {self.oldest}..{self.head - 1})")
+
+        def __getitem__(self, seq: int) -> Event:
+            self._check(seq, seq + 1)
+            return Event(seq, *self.ring[seq % self.capacity])
+
+        def records(self, start: int, stop: int) -> List[tuple]:
+            """The raw record tuples for sequence numbers start..stop-1."""
+            self._check(start, stop)
+            return [self.ring[s % self.capacity] for s in range(start, stop)]
+
+        def __iter__(self) -> Iterator[Event]:
+            return (self[s] for s in range(self.oldest, self.head))
+
+        def columns(self) -> Dict[str, np.ndarray]:
+            """The held events as NumPy columns, oldest first."""
+            records = [self.ring[s % self.capacity] for s in range(self.oldest, self.head)]
+            tick, verb, entity, a, b, text = zip(*records) if records else ((),) * 6
+            return {
+                "tick": np.array(tick, dtype=np.int64), "verb": np.array(verb, dtype=np.uint8),
+                "entity": np.array(entity, dtype=object),
+                "a": np.array(a, dtype=np.float64), "b": np.array(b, dtype=np.float64),
+                "text": np.array(text, dtype=object),
+            }
+
+        def view(self) -> "EventMessages":
+            return EventMessages(self, self.head, None)
+
+    class EventMessages(Sequence):
+        """Events from start on (to end, or to the log's head) as text, formatted on access.
+
+        Stands in for a world's messages list: clear() moves start to the
+        head, append() logs a NOTE, and copy() pins the current window so a
+        frame keeps its own tick's messages. A pinned window copies its
+        record tuples out of the ring, so it survives the ring wrapping.
+        """
+
+        def __init__(self, log: EventLog, start: int, end, records: Optional[List[tuple]] = None):
+            self.log, self.start, self.end = log, start, end
+            self.records = records
+
+        def _stop(self) -> int:
+            return self.log.head if self.end is None else self.end
+
+        def __len__(self):
+            return self._stop() - self.start
+
+        def __getitem__(self, i):
+            if isinstance(i, slice):
+                return [self[k] for k in range(*i.indices(len(self)))]
+            if i < 0:
+                i += len(self)
+            if not 0 <= i < len(self):
+                raise IndexError(i)
+            if self.records is not None:
+                return format_event(*self.records[i])
+            return str(self.log[self.start + i])
+
+        def __iter__(self):
+            # Sequence.__iter__ stops at the first IndexError, which would
+            # turn an evicted window into an empty one instead of an error.
+            return (self[i] for i in range(len(self)))
+
+        def __eq__(self, other):
+            return isinstance(other, Sequence) and list(self) == list(other)
+
+        def __repr__(self):
+            return repr(list(self))
+
+        def clear(self):
+            self.start = self._stop()
 
-    return Channel, Pattern, Song
+        def append(self, text: str):
+            self.log.emit(-1, EventVerb.NOTE, text=text)
+
+        def extend(self, texts):
+            for text in texts:
+                self.append(text)
+
+        def copy(self) -> "EventMessages":
+            stop = self._stop()
+            records = self.records if self.records is not None else self.log.records(self.start, stop)
+            return EventMessages(self.log, self.start, stop, records)
+
+    return EventVerb, format_event, Event, EventLog, EventMessages
+
+
+@app.cell
+def define_spatial_index(EventVerb, Sequence, Tuple, math, np):
+    """Uniform-grid spatial hash: proximity queries and bullet collisions."""
+    from typing import List, Optional
+
+    class SpatialGrid:
+        """Entities bucketed into square cells, stored CSR-style.
+
+        order lists entity indices sorted by cell; starts[k]:starts[k + 1]
+        is the slice of order that falls in cell k. Building is one argsort,
+        and every query only visits the cells within reach of its radius.
+        """
+
+        def __init__(self, width: int, height: int, cell_size: float = 1.0):
+            self.cell_size = cell_size
+            self.cols = max(1, math.ceil(width / cell_size))
+            self.rows = max(1, math.ceil(height / cell_size))
+            self.x = self.y = np.zeros(0)
+            self.order = np.zeros(0, dtype=np.intp)
+            self.starts = np.zeros(self.cols * self.rows + 1, dtype=np.intp)
+            self.tick = -1
+
+        def _cells(self, x, y):
+            cx = np.clip((np.asarray(x) // self.cell_size).astype(np.intp), 0, self.cols - 1)
+            cy = np.clip((np.asarray(y) // self.cell_size).astype(np.intp), 0, self.rows - 1)
+            return cx, cy
+
+        def build(self, x: np.ndarray, y: np.ndarray, mask: Optional[np.ndarray] = None):
+            """Index every entity i with mask[i] (default: all) at (x[i], y[i])."""
+            self.x, self.y = x, y
+            members = np.arange(len(x)) if mask is None else np.flatnonzero(mask)
+            cx, cy = self._cells(x[members], y[members])
+            keys = cy * self.cols + cx
+            sort = np.argsort(keys, kind="stable")
+            self.order = members[sort]
+            self.starts = np.searchsorted(keys[sort], np.arange(self.cols * self.rows + 1))
+            return self
+
+        def pairs_within(self, qx, qy, radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+            """All (query, entity, distance) with distance <= radius, vectorized."""
+            qx, qy = np.atleast_1d(qx).astype(float), np.atleast_1d(qy).astype(float)
+            reach = max(1, math.ceil(radius / self.cell_size))
+            qcx, qcy = self._cells(qx, qy)
+            found_q, found_e = [], []
+            for dy in range(-reach, reach + 1):
+                cy = qcy + dy
+                for dx in range(-reach, reach + 1):
+                    cx = qcx + dx
+                    ok = np.flatnonzero((cx >= 0) & (cx < self.cols) & (cy >= 0) & (cy < self.rows))
+                    keys = cy[ok] * self.cols + cx[ok]
+                    lo, hi = self.starts[keys], self.starts[keys + 1]
+                    counts = hi - lo
+                    total = int(counts.sum())
+                    if not total:
+                        continue
+                    first = np.cumsum(counts) - counts
+                    offsets = np.arange(total) - np.repeat(first, counts)
+                    found_q.append(np.repeat(ok, counts))
+                    found_e.append(self.order[np.repeat(lo, counts) + offsets])
+            if not found_q:
+                empty = np.zeros(0, dtype=np.intp)
+                return empty, empty, np.zeros(0)
+            q, e = np.concatenate(found_q), np.concatenate(found_e)
+            dist = np.hypot(self.x[e] - qx[q], self.y[e] - qy[q])
+            near = dist <= radius
+            return q[near], e[near], dist[near]
+
+        def query_radius(self, x: float, y: float, radius: float) -> np.ndarray:
+            """Indices of indexed entities within radius of (x, y)."""
+            _, e, _ = self.pairs_within(x, y, radius)
+            return e
+
+        def nearest(self, x: float, y: float, accept=None) -> int:
+            """Closest indexed entity for which accept(i) holds, or -1.
+
+            Searches a doubling radius, so only nearby cells are visited
+            unless the world is sparse.
+            """
+            radius = self.cell_size
+            limit = math.hypot(self.cols, self.rows) * self.cell_size
+            while True:
+                _, e, dist = self.pairs_within(x, y, radius)
+                for i in np.argsort(dist, kind="stable"):
+                    if accept is None or accept(int(e[i])):
+                        return int(e[i])
+                if radius >= limit:
+                    return -1
+                radius *= 2
+
+    def world_columns(world):
+        """(names, types, x, y, alive) for any world, as parallel arrays.
+
+        An ArrayWorld hands out its table columns without copying.
+        """
+        table = getattr(world, "table", None)
+        if table is not None:
+            n = table.size
+            return (table.names, table.types, table.x[:n], table.y[:n], table.alive[:n])
+        ents = list(world.entities.values())
+        return (
+            [e.name for e in ents],
+            [e.entity_type for e in ents],
+            np.array([e.x for e in ents], dtype=float),
+            np.array([e.y for e in ents], dtype=float),
+            np.array([e.alive for e in ents], dtype=bool),
+        )
+
+    def resolve_collisions(world, bullet_type: str = "bullet",
+                           target_types: Sequence[str] = ("enemy",),
+                           radius: float = 0.75) -> List[Tuple[str, str]]:
+        """Kill every live target touched by a live bullet; the bullet is spent.
+
+        Each bullet hits at most its closest target. Returns (bullet, target)
+        name pairs and logs a message per hit.
+        """
+        names, types, x, y, alive = world_columns(world)
+        types = np.array(types, dtype=object)
+        bullets = np.flatnonzero(alive & (types == bullet_type))
+        targets = alive & np.isin(types, list(target_types))
+        if not len(bullets) or not targets.any():
+            return []
+
+        grid = SpatialGrid(world.width, world.height, max(radius, 1.0)).build(x, y, targets)
+        q, e, dist = grid.pairs_within(x[bullets], y[bullets], radius)
+        hits = []
+        dead = set()
+        for k in np.lexsort((dist, q)):
+            bullet, target = names[bullets[q[k]]], names[e[k]]
+            if bullet in dead or target in dead:
+                continue
+            dead.update((bullet, target))
+            world.remove_entity(bullet)
+            world.remove_entity(target)
+            world.log(EventVerb.HIT, target, text=bullet)
+            hits.append((bullet, target))
+        return hits
+
+    def spatial_index(world, cell_size: float = 2.0) -> SpatialGrid:
+        """The world's grid of live entities, rebuilt at most once per tick."""
+        grid = world.spatial
+        if grid is None or grid.tick != world.tick or grid.cell_size != cell_size:
+            _, _, x, y, alive = world_columns(world)
+            grid = SpatialGrid(world.width, world.height, cell_size).build(x, y, alive)
+            grid.tick = world.tick
+            world.spatial = grid
+        return grid
+
+    def _index_of(world, names, name: str) -> int:
+        table = getattr(world, "table", None)
+        if table is not None:
+            return table.index.get(name, -1)
+        return names.index(name) if name in names else -1
+
+    def entities_near(world, name: str, radius: float) -> List[str]:
+        """Names of live entities within radius of name (itself excluded)."""
+        names, _, x, y, _ = world_columns(world)
+        i = _index_of(world, names, name)
+        if i < 0:
+            return []
+        found = spatial_index(world).query_radius(x[i], y[i], radius)
+        return [names[j] for j in found if j != i]
+
+    def nearest_entity(world, name: str, entity_type: Optional[str] = None) -> Optional[str]:
+        """Closest live entity to name, optionally of one entity_type."""
+        names, types, x, y, _ = world_columns(world)
+        i = _index_of(world, names, name)
+        if i < 0:
+            return None
+        j = spatial_index(world).nearest(
+            x[i], y[i], lambda j: j != i and (entity_type is None or types[j] == entity_type))
+        return names[j] if j >= 0 else None
+
+    return (SpatialGrid, world_columns, resolve_collisions, spatial_index,
+            entities_near, nearest_entity)
 
 
 @app.cell
-def define_world(Behavior, BehaviorType):
+def define_world(Behavior, BehaviorType, SpatialGrid, resolve_collisions, format_event, Tuple,
+                 Set, hashlib, math):
     """The world state that behaviors act upon."""
     from dataclasses import dataclass, field
-    from typing import Dict, List, Set, Tuple, Optional
-    import math
+    from typing import Dict, List, Optional
 
     @dataclass
     class Entity:
@@ -142,13 +818,64 @@ def define_world(Behavior, BehaviorType):
         tick: int = 0
         messages: List[str] = field(default_factory=list)
         flags: Set[str] = field(default_factory=set)
+        collisions: bool = False  # bullets kill enemies they touch
+        compact_every: int = 0  # drop dead entities every N ticks; 0 = keep them
+        spatial: Optional[SpatialGrid] = field(default=None, repr=False)
+        events: Optional[object] = field(default=None, repr=False)  # EventLog
+
+        def __post_init__(self):
+            if self.events is not None:
+                self.messages = self.events.view()
+            self._next_suffix: Dict[str, Tuple[int, int]] = {}  # prefix → (tick, next k)
+
+        def log(self, verb, entity: str = "", a=0, b=0, text: str = ""):
+            """Record an event: typed into the event log, or as text without one."""
+            if self.events is None:
+                self.messages.append(format_event(self.tick, verb, entity, a, b, text))
+            else:
+                self.events.emit(self.tick, verb, entity, a, b, text)
 
         def add_entity(self, name: str, entity_type: str, x: float, y: float):
             self.entities[name] = Entity(name, entity_type, x, y)
 
+        def unique_name(self, prefix: str) -> str:
+            """prefix_<tick>, then prefix_<tick>_1, _2, ... for later ones that tick.
+
+            The next suffix is remembered per prefix, so a burst of k names
+            in one tick costs O(k) rather than probing O(k²) taken names.
+            """
+            tick, k = self._next_suffix.get(prefix, (self.tick, 0))
+            if tick != self.tick:
+                k = 0
+            base = f"{prefix}_{self.tick}"
+            name = f"{base}_{k}" if k else base
+            while name in self.entities:
+                k += 1
+                name = f"{base}_{k}"
+            self._next_suffix[prefix] = (self.tick, k + 1)
+            return name
+
+        def compact(self) -> int:
+            """Forget dead entities so later ticks stop paying for them."""
+            dead = [name for name, e in self.entities.items() if not e.alive]
+            for name in dead:
+                del self.entities[name]
+            return len(dead)
+
         def get_entity(self, name: str) -> Optional[Entity]:
             return self.entities.get(name)
 
+        def entity_states(self) -> Dict[str, dict]:
+            """Every entity as the plain dict a frame stores."""
+            return {
+                name: {"x": e.x, "y": e.y, "alive": e.alive, "type": e.entity_type, "speech": e.speech}
+                for name, e in self.entities.items()
+            }
+
+        def clear_speech(self):
+            for e in self.entities.values():
+                e.speech = ""
+
         def remove_entity(self, name: str):
             if name in self.entities:
                 self.entities[name].alive = False
@@ -168,6 +895,40 @@ def define_world(Behavior, BehaviorType):
                 if e.y >= self.height - 1:
                     e.y = self.height - 1
                     e.vy = 0
+            if self.collisions:
+                resolve_collisions(self)
+
+        def snapshot(self) -> tuple:
+            """Immutable copy of the mutable state, for checkpoints."""
+            return (
+                self.tick,
+                tuple((e.name, e.entity_type, e.x, e.y, e.vx, e.vy, e.alive,
+                       frozenset(e.flags), e.speech) for e in self.entities.values()),
+                frozenset(self.flags),
+                tuple(self.messages),
+            )
+
+        def restore(self, snap: tuple):
+            """Put the world back exactly as snapshot() saw it."""
+            self.tick, ents, flags, messages = snap
+            self.entities = {
+                name: Entity(name, etype, x, y, vx, vy, alive, set(eflags), speech)
+                for name, etype, x, y, vx, vy, alive, eflags, speech in ents
+            }
+            self.flags = set(flags)
+            self.messages.clear()
+            self.messages.extend(messages)
+            self.spatial = None
+            self._next_suffix.clear()
+
+        def state_key(self) -> bytes:
+            """Digest of everything that shapes later ticks - not tick or messages."""
+            state = (
+                tuple((e.name, e.entity_type, e.x, e.y, e.vx, e.vy, e.alive,
+                       sorted(e.flags), e.speech) for e in self.entities.values()),
+                sorted(self.flags),
+            )
+            return hashlib.blake2b(repr(state).encode(), digest_size=16).digest()
 
         def distance(self, e1: str, e2: str) -> float:
             a, b = self.entities.get(e1), self.entities.get(e2)
@@ -187,7 +948,278 @@ def define_world(Behavior, BehaviorType):
 
 
 @app.cell
-def define_interpreter(Behavior, BehaviorType, World, Entity):
+def define_entity_table(SpatialGrid, resolve_collisions, format_event, Set, Tuple, hashlib, math,
+                        np):
+    """Struct-of-arrays entity storage for songs with thousands of entities."""
+    from dataclasses import dataclass, field
+    from typing import Dict, List, Optional
+
+    class EntityTable:
+        """Entity columns as NumPy arrays plus a name → row index map.
+
+        Rows are never reordered. Released rows go on a free list and are
+        reused by the next add, so size tracks the peak live count rather
+        than everything ever spawned; generation counts releases so row
+        caches know when to re-resolve. Columns grow by doubling.
+        """
+
+        def __init__(self, capacity: int = 64):
+            self.size = 0
+            self.free: List[int] = []
+            self.generation = 0
+            self.index: Dict[str, int] = {}
+            self.names: List[str] = []
+            self.types: List[str] = []
+            self.speech: List[str] = []
+            self.flags: List[Set[str]] = []
+            self.x = np.zeros(capacity)
+            self.y = np.zeros(capacity)
+            self.vx = np.zeros(capacity)
+            self.vy = np.zeros(capacity)
+            self.alive = np.zeros(capacity, dtype=bool)
+
+        def _grow(self):
+            capacity = max(1, len(self.x)) * 2
+            for col in ("x", "y", "vx", "vy", "alive"):
+                old = getattr(self, col)
+                new = np.zeros(capacity, dtype=old.dtype)
+                new[:self.size] = old[:self.size]
+                setattr(self, col, new)
+
+        def add(self, name: str, entity_type: str, x: float, y: float) -> int:
+            """Insert (or respawn) an entity, returning its row index."""
+            i = self.index.get(name)
+            if i is None and self.free:
+                i = self.index[name] = self.free.pop()
+                self.names[i] = name
+            elif i is None:
+                if self.size == len(self.x):
+                    self._grow()
+                i = self.size
+                self.size += 1
+                self.index[name] = i
+                self.names.append(name)
+                self.types.append(entity_type)
+                self.speech.append("")
+                self.flags.append(set())
+            # (Re)spawning replaces the entity wholesale, like World.add_entity
+            self.types[i] = entity_type
+            self.speech[i] = ""
+            self.flags[i] = set()
+            self.x[i], self.y[i] = x, y
+            self.vx[i] = self.vy[i] = 0.0
+            self.alive[i] = True
+            return i
+
+        def release(self, name: str):
+            """Drop an entity and put its row on the free list."""
+            i = self.index.pop(name)
+            self.alive[i] = False
+            self.names[i] = ""
+            self.free.append(i)
+            self.generation += 1
+
+    def _column(col, cast):
+        def get(self):
+            return cast(getattr(self.table, col)[self.row])
+
+        def set_(self, value):
+            getattr(self.table, col)[self.row] = value
+
+        return property(get, set_)
+
+    def _listed(col):
+        def get(self):
+            return getattr(self.table, col)[self.row]
+
+        def set_(self, value):
+            getattr(self.table, col)[self.row] = value
+
+        return property(get, set_)
+
+    class EntityRow:
+        """Entity-shaped view onto one row of an EntityTable."""
+        __slots__ = ("table", "row")
+
+        def __init__(self, table: EntityTable, row: int):
+            self.table = table
+            self.row = row
+
+        name = property(lambda self: self.table.names[self.row])
+        entity_type = _listed("types")
+        speech = _listed("speech")
+        flags = _listed("flags")
+        x = _column("x", float)
+        y = _column("y", float)
+        vx = _column("vx", float)
+        vy = _column("vy", float)
+        alive = _column("alive", bool)
+
+    @dataclass
+    class ArrayWorld:
+        """Drop-in World backed by an EntityTable.
+
+        Behaviors see EntityRow views, so the interpreter and player run
+        unchanged; apply_physics runs as one vectorized pass.
+        """
+        width: int = 32
+        height: int = 16
+        table: EntityTable = field(default_factory=EntityTable)
+        gravity: float = 0.0
+        tick: int = 0
+        messages: List[str] = field(default_factory=list)
+        flags: Set[str] = field(default_factory=set)
+        collisions: bool = False
+        compact_every: int = 0
+        spatial: Optional[SpatialGrid] = field(default=None, repr=False)
+        events: Optional[object] = field(default=None, repr=False)  # EventLog
+
+        def __post_init__(self):
+            if self.events is not None:
+                self.messages = self.events.view()
+            self._next_suffix: Dict[str, Tuple[int, int]] = {}  # prefix → (tick, next k)
+
+        def log(self, verb, entity: str = "", a=0, b=0, text: str = ""):
+            """Record an event: typed into the event log, or as text without one."""
+            if self.events is None:
+                self.messages.append(format_event(self.tick, verb, entity, a, b, text))
+            else:
+                self.events.emit(self.tick, verb, entity, a, b, text)
+
+        @property
+        def entities(self) -> Dict[str, EntityRow]:
+            return {name: EntityRow(self.table, i)
+                    for name, i in self.table.index.items()}
+
+        def add_entity(self, name: str, entity_type: str, x: float, y: float):
+            self.table.add(name, entity_type, x, y)
+
+        def get_entity(self, name: str) -> Optional[EntityRow]:
+            i = self.table.index.get(name)
+            return None if i is None else EntityRow(self.table, i)
+
+        def entity_states(self) -> Dict[str, dict]:
+            """World.entity_states read straight from the columns, no EntityRows."""
+            t = self.table
+            rows = np.fromiter(t.index.values(), dtype=np.intp, count=len(t.index))
+            types, speech = t.types, t.speech
+            return {
+                name: {"x": x, "y": y, "alive": alive, "type": types[i], "speech": speech[i]}
+                for name, i, x, y, alive in zip(t.index, rows.tolist(), t.x[rows].tolist(),
+                                                t.y[rows].tolist(), t.alive[rows].tolist())
+            }
+
+        def clear_speech(self):
+            """One write over the speech column."""
+            self.table.speech[:] = [""] * len(self.table.speech)
+
+        def unique_name(self, prefix: str) -> str:
+            """World.unique_name: the next suffix is remembered per prefix."""
+            tick, k = self._next_suffix.get(prefix, (self.tick, 0))
+            if tick != self.tick:
+                k = 0
+            base = f"{prefix}_{self.tick}"
+            name = f"{base}_{k}" if k else base
+            while name in self.table.index:
+                k += 1
+                name = f"{base}_{k}"
+            self._next_suffix[prefix] = (self.tick, k + 1)
+            return name
+
+        def compact(self) -> int:
+            """Release dead rows to the free list."""
+            t = self.table
+            dead = [name for name, i in t.index.items() if not t.alive[i]]
+            for name in dead:
+                t.release(name)
+            return len(dead)
+
+        def remove_entity(self, name: str):
+            i = self.table.index.get(name)
+            if i is not None:
+                self.table.alive[i] = False
+
+        def apply_physics(self):
+            """Gravity, velocity, clamping and floor collision in one pass."""
+            t = self.table
+            live = np.flatnonzero(t.alive[:t.size])
+            if not len(live):
+                return
+            vy = t.vy[live] + self.gravity
+            x = np.clip(t.x[live] + t.vx[live], 0, self.width - 1)
+            y = np.clip(t.y[live] + vy, 0, self.height - 1)
+            vy[y >= self.height - 1] = 0.0
+            t.x[live], t.y[live], t.vy[live] = x, y, vy
+            if self.collisions:
+                resolve_collisions(self)
+
+        def snapshot(self) -> tuple:
+            """Array copies of the table plus scalars, for checkpoints."""
+            t = self.table
+            n = t.size
+            return (
+                self.tick,
+                tuple(t.index.items()), tuple(t.free),
+                tuple(t.names), tuple(t.types), tuple(t.speech),
+                tuple(frozenset(f) for f in t.flags),
+                t.x[:n].copy(), t.y[:n].copy(), t.vx[:n].copy(), t.vy[:n].copy(),
+                t.alive[:n].copy(),
+                frozenset(self.flags),
+                tuple(self.messages),
+            )
+
+        def restore(self, snap: tuple):
+            """Rebuild the table exactly as snapshot() saw it."""
+            (self.tick, index, free, names, types, speech, eflags,
+             x, y, vx, vy, alive, flags, messages) = snap
+            t = EntityTable(capacity=max(64, len(names)))
+            n = t.size = len(names)
+            t.names, t.types, t.speech = list(names), list(types), list(speech)
+            t.flags = [set(f) for f in eflags]
+            t.index, t.free = dict(index), list(free)
+            t.generation = self.table.generation + 1  # invalidate row caches
+            t.x[:n], t.y[:n], t.vx[:n], t.vy[:n], t.alive[:n] = x, y, vx, vy, alive
+            self.table = t
+            self.flags = set(flags)
+            self.messages.clear()
+            self.messages.extend(messages)
+            self.spatial = None
+            self._next_suffix.clear()
+
+        def state_key(self) -> bytes:
+            """Digest of the live rows and flags - not tick or messages."""
+            t = self.table
+            rows = np.fromiter(t.index.values(), dtype=np.intp, count=len(t.index))
+            h = hashlib.blake2b(digest_size=16)
+            h.update(repr((
+                list(t.index), [t.types[i] for i in rows], [t.speech[i] for i in rows],
+                [sorted(t.flags[i]) for i in rows], sorted(self.flags),
+            )).encode())
+            for col in (t.x, t.y, t.vx, t.vy, t.alive):
+                h.update(col[rows].tobytes())
+            return h.digest()
+
+        def distance(self, e1: str, e2: str) -> float:
+            i, j = self.table.index.get(e1), self.table.index.get(e2)
+            if i is None or j is None:
+                return float('inf')
+            t = self.table
+            return math.sqrt((t.x[i] - t.x[j])**2 + (t.y[i] - t.y[j])**2)
+
+        def direction_to(self, from_name: str, to_name: str) -> Tuple[int, int]:
+            i, j = self.table.index.get(from_name), self.table.index.get(to_name)
+            if i is None or j is None:
+                return (0, 0)
+            t = self.table
+            dx = int(np.sign(t.x[j] - t.x[i]))
+            dy = int(np.sign(t.y[j] - t.y[i]))
+            return (dx, dy)
+
+    return EntityTable, EntityRow, ArrayWorld
+
+
+@app.cell
+def define_interpreter(Behavior, BehaviorType, World, Entity, EventVerb):
     """The interpreter that executes behaviors."""
     from typing import Dict
 
@@ -211,7 +1243,7 @@ def define_interpreter(Behavior, BehaviorType, World, Entity):
                 # Determine entity type from channel name
                 etype = "player" if "player" in entity_name.lower() else "enemy"
                 self.world.add_entity(entity_name, etype, x, y)
-                self.world.messages.append(f"T{self.world.tick}: {entity_name} spawned at ({x},{y})")
+                self.world.log(EventVerb.SPAWN, entity_name, x, y)
 
             elif verb == BehaviorType.MOVE:
                 if entity and entity.alive:
@@ -241,7 +1273,7 @@ def define_interpreter(Behavior, BehaviorType, World, Entity):
             elif verb == BehaviorType.SHOOT:
                 if entity and entity.alive:
                     dx, dy = params.get("dx", 1), params.get("dy", 0)
-                    bullet_name = f"bullet_{self.world.tick}"
+                    bullet_name = self.world.unique_name("bullet")
                     self.world.add_entity(bullet_name, "bullet", entity.x + dx, entity.y)
                     bullet = self.world.get_entity(bullet_name)
                     if bullet:
@@ -251,34 +1283,347 @@ def define_interpreter(Behavior, BehaviorType, World, Entity):
             elif verb == BehaviorType.DIE:
                 if entity:
                     entity.alive = False
-                    self.world.messages.append(f"T{self.world.tick}: {entity_name} died")
+                    self.world.log(EventVerb.DIE, entity_name)
 
             elif verb == BehaviorType.SAY:
                 if entity and entity.alive:
                     text = params.get("text", "...")
                     entity.speech = text
-                    self.world.messages.append(f"T{self.world.tick}: {entity_name}: '{text}'")
+                    self.world.log(EventVerb.SAY, entity_name, text=text)
 
             elif verb == BehaviorType.FLAG:
                 flag_name = params.get("name", "")
                 self.world.flags.add(flag_name)
-                self.world.messages.append(f"T{self.world.tick}: FLAG '{flag_name}' set")
+                self.world.log(EventVerb.FLAG, text=flag_name)
 
-        def execute_tick(self, tick_behaviors: Dict[str, Behavior]):
-            """Execute all behaviors for one tick."""
-            for entity_name, behavior in tick_behaviors.items():
-                self.execute(entity_name, behavior)
+        def execute_tick(self, tick_behaviors: Dict[str, Behavior], idle: bool = False):
+            """Execute all behaviors for one tick; idle ticks go straight to physics."""
+            if not idle:
+                for entity_name, behavior in tick_behaviors.items():
+                    self.execute(entity_name, behavior)
             self.world.apply_physics()
             self.world.tick += 1
+            if self.world.compact_every and self.world.tick % self.world.compact_every == 0:
+                self.world.compact()
 
     return BehaviorInterpreter,
 
 
 @app.cell
-def define_song_player(Song, Pattern, World, BehaviorInterpreter, nop):
+def define_bytecode(BehaviorType, Pattern, Song, EventVerb, Tuple, np):
+    """Compile patterns to opcode arrays and run them without dispatch chains."""
+    from dataclasses import dataclass, field
+    from typing import Dict, List
+
+    # Opcode numbering is the BehaviorType declaration order; NOP stays 0
+    OPCODES = {verb: i for i, verb in enumerate(BehaviorType)}
+    GUARD = len(OPCODES)  # conditional cell: arg_s indexes CompiledPattern.guards
+
+    class SymbolTable:
+        """Interns channel names, targets, texts and flag names to ints."""
+
+        def __init__(self):
+            self.names: List[str] = []
+            self.ids: Dict[str, int] = {}
+
+        def intern(self, name: str) -> int:
+            i = self.ids.get(name)
+            if i is None:
+                i = self.ids[name] = len(self.names)
+                self.names.append(name)
+            return i
+
+    @dataclass
+    class CompiledPattern:
+        """A pattern as packed per-channel opcode and operand arrays.
+
+        ops/arg_a/arg_b/arg_s are shaped (channels, length). arg_s holds
+        symbol ids (targets, texts, flags). program is the same data
+        regrouped per tick with NOP cells dropped - what the VM walks.
+        A conditional cell compiles to GUARD, whose guards entry holds
+        the pattern's predicate plus the real opcode and symbol; every
+        guard of a tick (guard_ticks[t]) is tested before its first cell
+        runs, as the interpreter does.
+        """
+        name: str
+        length: int
+        channel_syms: np.ndarray
+        ops: np.ndarray
+        arg_a: np.ndarray
+        arg_b: np.ndarray
+        arg_s: np.ndarray
+        program: List[Tuple[tuple, ...]] = field(default_factory=list)
+        guards: List[tuple] = field(default_factory=list)  # (predicate, op, s)
+        guard_ticks: List[Tuple[int, ...]] = field(default_factory=list)
+
+    def _operands(name, b, symbols):
+        """(a, b, s) operands for one cell, with the interpreter's defaults."""
+        p = b.params
+        verb = b.verb
+        if verb == BehaviorType.SPAWN:
+            x, y = p.get("x", 0), p.get("y", 0)
+            return x, y, -1
+        if verb == BehaviorType.MOVE:
+            return p.get("dx", 0), p.get("dy", 0), -1
+        if verb == BehaviorType.JUMP:
+            return p.get("force", 3), 0, -1
+        if verb in (BehaviorType.CHASE, BehaviorType.FLEE):
+            return 0, 0, symbols.intern(p.get("target", ""))
+        if verb == BehaviorType.SHOOT:
+            return p.get("dx", 1), p.get("dy", 0), -1
+        if verb == BehaviorType.SAY:
+            return 0, 0, symbols.intern(p.get("text", "..."))
+        if verb == BehaviorType.FLAG:
+            return 0, 0, symbols.intern(p.get("name", ""))
+        return 0, 0, -1
+
+    def compile_pattern(pattern: Pattern, symbols: SymbolTable) -> CompiledPattern:
+        """Lower a Pattern into opcode arrays, interning every string."""
+        names = list(pattern.get_tick(0)) if pattern.length else []
+        syms = [symbols.intern(n) for n in names]
+        cells = []  # tick-major (op, a, b, s) per channel
+        program = []
+        guards = []
+        guard_ticks = []
+        for t in range(pattern.length):
+            row = []
+            first_guard = len(guards)
+            tests = None  # the pattern's compiled predicates, fetched if needed
+            for name, behavior in pattern.get_tick(t).items():
+                op = OPCODES[behavior.verb]
+                a, b, s = _operands(name, behavior, symbols)
+                if behavior.guard is not None:
+                    if tests is None:
+                        tests = dict((pattern.table or pattern.freeze()).guards[t])
+                    guards.append((tests[name], op, s))
+                    op, s = GUARD, len(guards) - 1
+                row.append((op, a, b, s))
+            cells.append(row)
+            guard_ticks.append(tuple(range(first_guard, len(guards))))
+            program.append(tuple(
+                (op, sym, float(a), float(b), s)
+                for sym, (op, a, b, s) in zip(syms, row) if op
+            ))
+
+        shape = (pattern.length, len(names), 4)
+        packed = np.array(cells, dtype=np.float64).reshape(shape).transpose(1, 0, 2)
+        return CompiledPattern(
+            pattern.name, pattern.length,
+            channel_syms=np.array(syms, dtype=np.int32),
+            ops=packed[..., 0].astype(np.uint8),
+            arg_a=np.ascontiguousarray(packed[..., 1]),
+            arg_b=np.ascontiguousarray(packed[..., 2]),
+            arg_s=packed[..., 3].astype(np.int32),
+            program=program,
+            guards=guards,
+            guard_ticks=guard_ticks,
+        )
+
+    def compile_song(song: Song) -> Tuple[SymbolTable, Dict[str, CompiledPattern]]:
+        """Compile every pattern of a song against one shared symbol table."""
+        symbols = SymbolTable()
+        compiled = {name: compile_pattern(p, symbols) for name, p in song.patterns.items()}
+        return symbols, compiled
+
+    class BytecodeVM:
+        """Table-driven executor for CompiledPatterns on an ArrayWorld.
+
+        Symbols resolve to EntityTable rows once and are cached, so a tick
+        touches no Behavior objects, params dicts or verb comparisons.
+        """
+
+        def __init__(self, world, symbols: SymbolTable):
+            self.world = world
+            self.symbols = symbols
+            self.rows: List[int] = []
+            self.generation = world.table.generation
+            self.handlers = [None] * (GUARD + 1)
+            for verb, op in OPCODES.items():
+                self.handlers[op] = getattr(self, f"_op_{verb.name.lower()}")
+            self.handlers[GUARD] = self._op_guard
+            self.guards: List[tuple] = []
+            self.open: Dict[int, bool] = {}  # this tick's guard results
+
+        def _row(self, sym: int) -> int:
+            """Entity row for a symbol, or -1 if nothing by that name exists."""
+            rows = self.rows
+            if sym >= len(rows):
+                rows.extend([-1] * (len(self.symbols.names) - len(rows)))
+            r = rows[sym]
+            if r < 0:
+                r = rows[sym] = self.world.table.index.get(self.symbols.names[sym], -1)
+            return r
+
+        def _live_row(self, sym: int) -> int:
+            r = self._row(sym)
+            return r if r >= 0 and self.world.table.alive[r] else -1
+
+        def _op_nop(self, sym, a, b, s):
+            pass
+
+        def _op_guard(self, sym, a, b, k):
+            if self.open[k]:
+                _, op, s = self.guards[k]
+                self.handlers[op](sym, a, b, s)
+
+        _op_wait = _op_nop
+
+        def _op_spawn(self, sym, a, b, s):
+            name = self.symbols.names[sym]
+            etype = "player" if "player" in name.lower() else "enemy"
+            self._row(sym)
+            self.rows[sym] = self.world.table.add(name, etype, a, b)
+            self.world.log(EventVerb.SPAWN, name, a, b)
+
+        def _op_move(self, sym, a, b, s):
+            r = self._live_row(sym)
+            if r >= 0:
+                t = self.world.table
+                t.x[r] += a
+                t.y[r] += b
+
+        def _op_jump(self, sym, a, b, s):
+            r = self._live_row(sym)
+            if r >= 0:
+                self.world.table.vy[r] = -a
+
+        def _step_toward(self, sym, s, scale):
+            r = self._live_row(sym)
+            if r < 0:
+                return
+            q = self._row(s)
+            if q < 0:
+                return
+            t = self.world.table
+            xr, yr = float(t.x[r]), float(t.y[r])
+            xq, yq = float(t.x[q]), float(t.y[q])
+            t.x[r] += scale * ((xq > xr) - (xq < xr))
+            t.y[r] += scale * ((yq > yr) - (yq < yr))
+
+        def _op_chase(self, sym, a, b, s):
+            self._step_toward(sym, s, 0.5)
+
+        def _op_flee(self, sym, a, b, s):
+            self._step_toward(sym, s, -0.5)
+
+        def _op_shoot(self, sym, a, b, s):
+            r = self._live_row(sym)
+            if r >= 0:
+                t = self.world.table
+                i = t.add(self.world.unique_name("bullet"), "bullet", t.x[r] + a, t.y[r])
+                t.vx[i] = a * 2
+                t.vy[i] = b
+
+        def _op_die(self, sym, a, b, s):
+            r = self._row(sym)
+            if r >= 0:
+                self.world.table.alive[r] = False
+                self.world.log(EventVerb.DIE, self.symbols.names[sym])
+
+        def _op_say(self, sym, a, b, s):
+            r = self._live_row(sym)
+            if r >= 0:
+                text = self.symbols.names[s]
+                self.world.table.speech[r] = text
+                self.world.log(EventVerb.SAY, self.symbols.names[sym], text=text)
+
+        def _op_flag(self, sym, a, b, s):
+            flag_name = self.symbols.names[s]
+            self.world.flags.add(flag_name)
+            self.world.log(EventVerb.FLAG, text=flag_name)
+
+        def execute_tick(self, pattern: CompiledPattern, tick: int):
+            """Execute one compiled tick, then physics - like execute_tick."""
+            if self.generation != self.world.table.generation:
+                self.generation = self.world.table.generation
+                self.rows.clear()  # rows were released or restored: re-resolve
+            handlers = self.handlers
+            if pattern.guard_ticks[tick]:
+                self.guards = guards = pattern.guards
+                self.open = {k: guards[k][0](self.world) for k in pattern.guard_ticks[tick]}
+            for op, sym, a, b, s in pattern.program[tick]:
+                handlers[op](sym, a, b, s)
+            self.world.apply_physics()
+            self.world.tick += 1
+            if self.world.compact_every and self.world.tick % self.world.compact_every == 0:
+                self.world.compact()
+
+    return OPCODES, GUARD, SymbolTable, CompiledPattern, compile_pattern, compile_song, BytecodeVM
+
+
+@app.cell
+def define_timeline(Song, Iterator, Tuple, np):
+    """Compiled arrangement: any global tick → (sequence index, row) in O(1)."""
+    from typing import Optional
+
+    class SongTimeline:
+        """Prefix sums over a song's sequence plus a per-tick lookup table.
+
+        One pass through the sequence is tabulated; ticks past the end fold
+        back into the looped section (sequence[loop_point:]) by modulo.
+        Each entry takes max(1, length) ticks, as SongPlayer plays it, and
+        the arrangement stops at the first name with no pattern.
+        """
+
+        def __init__(self, song: Song):
+            lengths = []
+            for name in song.sequence:
+                pattern = song.patterns.get(name)
+                if pattern is None:
+                    break
+                lengths.append(max(1, pattern.length))
+            self.song = song
+            self.lengths = np.array(lengths, dtype=np.int64)
+            self.starts = np.concatenate(([0], np.cumsum(self.lengths)))
+            self.length = int(self.starts[-1])  # one pass, in ticks
+
+            self.looping = 0 <= song.loop_point < len(lengths)
+            self.intro_length = int(self.starts[song.loop_point]) if self.looping else self.length
+            self.loop_length = self.length - self.intro_length
+
+            self.tick_entry = np.repeat(np.arange(len(lengths), dtype=np.int32), self.lengths)
+            self.tick_row = (np.arange(self.length) - self.starts[self.tick_entry]).astype(np.int32)
+
+        def fold(self, tick: int) -> Optional[int]:
+            """The tick within one pass that plays at global tick, or None."""
+            if tick < self.length:
+                return tick if tick >= 0 else None
+            if not self.looping:
+                return None
+            return self.intro_length + (tick - self.intro_length) % self.loop_length
+
+        def locate(self, tick: int) -> Optional[Tuple[int, int]]:
+            """(sequence index, row) playing at global tick; None past the end."""
+            t = self.fold(tick)
+            if t is None:
+                return None
+            return int(self.tick_entry[t]), int(self.tick_row[t])
+
+        def segments(self, start: int, end: int) -> Iterator[Tuple[int, int, int, int]]:
+            """Split global ticks [start, end) at pattern boundaries.
+
+            Yields (global_start, sequence_index, first_row, row_count): the
+            units for planning per-segment work such as parallel simulation.
+            """
+            tick = start
+            while tick < end:
+                where = self.locate(tick)
+                if where is None:
+                    return
+                entry, row = where
+                count = min(int(self.lengths[entry]) - row, end - tick)
+                yield tick, entry, row, count
+                tick += count
+
+    return SongTimeline,
+
+
+@app.cell
+def define_song_player(Song, Pattern, World, BehaviorInterpreter, SongTimeline, nop, Iterator,
+                       lcm, asyncio):
     """Song player: chains patterns together like a tracker song."""
     from dataclasses import dataclass, field
-    from typing import List, Dict, Optional
+    from typing import List, Dict, Optional, AsyncIterator
 
     @dataclass
     class SongPosition:
@@ -287,6 +1632,23 @@ def define_song_player(Song, Pattern, World, BehaviorInterpreter, nop):
         tick: int = 0           # which tick in current pattern
         total_tick: int = 0     # global tick counter
 
+    @dataclass
+    class CycleReport:
+        """Playback found a repeat of (pattern index, world state)."""
+        start: int        # global tick where the repeating stretch begins
+        length: int       # ticks per repetition
+        detected_at: int  # tick where the repeat was noticed
+        skipped: int = 0  # ticks jumped over without simulating
+
+        def fold(self, tick: int) -> int:
+            """The tick in the first repetition that looks exactly like tick."""
+            if tick < self.start:
+                return tick
+            return self.start + (tick - self.start) % self.length
+
+        def __str__(self):
+            return f"cycle of length {self.length} starting at tick {self.start}"
+
     @dataclass
     class SongFrame:
         """A frame from song playback."""
@@ -298,12 +1660,16 @@ def define_song_player(Song, Pattern, World, BehaviorInterpreter, nop):
     class SongPlayer:
         """Plays through a song's pattern sequence."""
 
-        def __init__(self, song: Song, world: World):
+        def __init__(self, song: Song, world: World, checkpoint_every: int = 0):
             self.song = song
             self.world = world
             self.interpreter = BehaviorInterpreter(world)
+            self.timeline = SongTimeline(song)
             self.position = SongPosition()
             self.finished = False
+            # total_tick -> (world snapshot, position, finished); 0 = off
+            self.checkpoint_every = checkpoint_every
+            self.checkpoints: Dict[int, tuple] = {}
 
         def current_pattern(self) -> Optional[Pattern]:
             if self.position.pattern_index >= len(self.song.sequence):
@@ -318,32 +1684,45 @@ def define_song_player(Song, Pattern, World, BehaviorInterpreter, nop):
                 self.finished = True
                 return None
 
-            # Get behaviors for current tick
-            behaviors = pattern.get_tick(self.position.tick)
+            frame = self.capture(pattern)
+            self.advance(pattern)
+            return frame
 
-            # Capture frame
-            frame = SongFrame(
+        def capture(self, pattern: Pattern) -> SongFrame:
+            """The world as it stands, before the current tick executes."""
+            return SongFrame(
                 position=SongPosition(
                     self.position.pattern_index,
                     self.position.tick,
                     self.position.total_tick
                 ),
                 pattern_name=pattern.name,
-                entities={
-                    name: {"x": e.x, "y": e.y, "alive": e.alive,
-                           "type": e.entity_type, "speech": e.speech}
-                    for name, e in self.world.entities.items()
-                },
-                messages=list(self.world.messages)
+                entities=self.world.entity_states(),
+                messages=self.world.messages.copy()
             )
+
+        def advance(self, pattern: Pattern):
+            """Execute the current tick of pattern and move the playhead."""
+            total = self.position.total_tick
+            if self.checkpoint_every and total % self.checkpoint_every == 0 \
+                    and total not in self.checkpoints:
+                self.checkpoints[total] = (
+                    self.world.snapshot(),
+                    (self.position.pattern_index, self.position.tick, total),
+                    self.finished,
+                )
+
+            # Get behaviors for current tick, leaving out cells whose guard fails
+            behaviors = pattern.live_tick(self.position.tick, self.world)
+            idle = pattern.is_idle(self.position.tick)
+
             self.world.messages.clear()
 
             # Clear speech
-            for e in self.world.entities.values():
-                e.speech = ""
+            self.world.clear_speech()
 
             # Execute
-            self.interpreter.execute_tick(behaviors)
+            self.interpreter.execute_tick(behaviors, idle)
 
             # Advance position
             self.position.tick += 1
@@ -361,22 +1740,616 @@ def define_song_player(Song, Pattern, World, BehaviorInterpreter, nop):
                     else:
                         self.finished = True
 
-            return frame
+        def position_at(self, tick: int) -> Optional[SongPosition]:
+            """Where global tick falls in the arrangement, without simulating."""
+            where = self.timeline.locate(tick)
+            if where is None:
+                return None
+            return SongPosition(where[0], where[1], tick)
+
+        def seek(self, tick: int):
+            """Move to global tick: restore the nearest earlier checkpoint and
+            simulate at most checkpoint_every ticks. The next step() returns
+            the frame for tick. Without checkpoints it can only move forward.
+            """
+            recorded = [t for t in self.checkpoints if t <= tick]
+            if recorded:
+                snap, pos, finished = self.checkpoints[max(recorded)]
+                self.world.restore(snap)
+                self.position = SongPosition(*pos)
+                self.finished = finished
+            elif tick < self.position.total_tick:
+                raise ValueError(f"no checkpoint at or before tick {tick}")
+            while not self.finished and self.position.total_tick < tick:
+                pattern = self.current_pattern()
+                if not pattern:
+                    self.finished = True
+                    break
+                self.advance(pattern)
+
+        def frame_at(self, tick: int) -> Optional[SongFrame]:
+            """Random access: the frame for a global tick."""
+            self.seek(tick)
+            return self.step()
+
+        def fast_forward(self, max_ticks: int) -> Optional[CycleReport]:
+            """Play headless to max_ticks, skipping repeats of a looping song.
+
+            World state is hashed at every pattern boundary. Once a
+            (pattern index, state) pair comes round again every later
+            repetition is known, so whole repetitions are skipped by moving
+            the clocks and only the remainder is simulated. Songs with
+            every(n) guards also key on the tick's phase within their period.
+            """
+            period = lcm(*(p.table.period for p in self.song.patterns.values()
+                           if p.table is not None))
+            seen: Dict[tuple, int] = {}
+            cycle = None
+            while not self.finished and self.position.total_tick < max_ticks:
+                pattern = self.current_pattern()
+                if not pattern:
+                    self.finished = True
+                    break
+                total = self.position.total_tick
+                if cycle is None and self.position.tick == 0:
+                    key = (self.position.pattern_index, self.world.tick % period,
+                           self.world.state_key())
+                    start = seen.setdefault(key, total)
+                    if start != total:
+                        length = total - start
+                        skip = (max_ticks - total) // length * length
+                        self.position.total_tick += skip
+                        self.world.tick += skip
+                        cycle = CycleReport(start, length, total, skip)
+                        continue
+                self.advance(pattern)
+            return cycle
+
+        def frames(self, max_ticks: Optional[int] = None) -> Iterator[SongFrame]:
+            """Yield frames lazily. max_ticks=None plays a looping song forever."""
+            produced = 0
+            while not self.finished and (max_ticks is None or produced < max_ticks):
+                frame = self.step()
+                if frame:
+                    produced += 1
+                    yield frame
+
+        def __iter__(self) -> Iterator[SongFrame]:
+            return self.frames()
+
+        async def aframes(self, max_ticks: Optional[int] = None) -> AsyncIterator[SongFrame]:
+            """Async frames: yields to the event loop after every tick."""
+            for frame in self.frames(max_ticks):
+                yield frame
+                await asyncio.sleep(0)
 
         def run_all(self, max_ticks: int = 1000) -> List[SongFrame]:
             """Run entire song and return all frames."""
-            frames = []
-            while not self.finished and len(frames) < max_ticks:
-                frame = self.step()
-                if frame:
-                    frames.append(frame)
-            return frames
+            return list(self.frames(max_ticks))
 
-    return SongPosition, SongFrame, SongPlayer
+    return SongPosition, CycleReport, SongFrame, SongPlayer
 
 
 @app.cell
-def create_demo_patterns(Pattern, Channel, Song, spawn, move, jump, chase, flee, shoot, say, nop, die, flag):
+def define_frame_store(SongPosition, SongFrame, array, sys):
+    """Keyframe + delta playback history: memory grows with changes, not ticks."""
+    from typing import Dict, List
+
+    class FrameStore:
+        """SongFrames stored as a keyframe every N ticks plus per-tick deltas.
+
+        An entity's state is the tuple (x, y, alive, type, speech). A delta
+        keeps only entities whose state changed since the previous tick, so
+        idle entities cost nothing. Indexing rebuilds a SongFrame from the
+        nearest keyframe; iteration replays deltas in order.
+        """
+
+        def __init__(self, keyframe_every: int = 32):
+            self.keyframe_every = max(1, keyframe_every)
+            self.keyframes: List[Dict[str, tuple]] = []
+            # per tick: (pattern_name, changed, removed, messages)
+            self.ticks: List[tuple] = []
+            self.positions = array("q")  # pattern_index, tick, total_tick per tick
+            self._last: Dict[str, tuple] = {}
+
+        def __len__(self):
+            return len(self.ticks)
+
+        def capture(self, position, pattern_name: str, world):
+            """Record the world as it stands at position."""
+            last = self._last
+            current = {}
+            changed = []
+            kept = 0
+            for name, e in world.entities.items():
+                state = (e.x, e.y, e.alive, e.entity_type, e.speech)
+                prev = last.get(name)
+                if prev is not None:
+                    kept += 1
+                if prev != state:
+                    changed.append((name, state))
+                else:
+                    state = prev  # share the tuple already stored
+                current[name] = state
+            removed = ()
+            if kept < len(last):
+                removed = tuple(n for n in last if n not in current)
+            if len(self.ticks) % self.keyframe_every == 0:
+                self.keyframes.append(current)
+                changed, removed = (), ()
+            self.positions.extend((position.pattern_index, position.tick, position.total_tick))
+            self.ticks.append((pattern_name, tuple(changed), removed, tuple(world.messages)))
+            self._last = current
+
+        def _frame(self, tick: int, states: Dict[str, tuple]) -> SongFrame:
+            pattern_name, _, _, messages = self.ticks[tick]
+            return SongFrame(
+                position=SongPosition(*self.positions[3 * tick:3 * tick + 3]),
+                pattern_name=pattern_name,
+                entities={
+                    name: {"x": x, "y": y, "alive": alive, "type": etype, "speech": speech}
+                    for name, (x, y, alive, etype, speech) in states.items()
+                },
+                messages=list(messages),
+            )
+
+        @staticmethod
+        def _apply(states: Dict[str, tuple], record):
+            _, changed, removed, _ = record
+            for name in removed:
+                del states[name]
+            states.update(changed)
+
+        def __getitem__(self, tick: int) -> SongFrame:
+            if tick < 0:
+                tick += len(self.ticks)
+            if not 0 <= tick < len(self.ticks):
+                raise IndexError(tick)
+            k = tick // self.keyframe_every
+            states = dict(self.keyframes[k])
+            for t in range(k * self.keyframe_every + 1, tick + 1):
+                self._apply(states, self.ticks[t])
+            return self._frame(tick, states)
+
+        def __iter__(self):
+            states: Dict[str, tuple] = {}
+            for t, record in enumerate(self.ticks):
+                if t % self.keyframe_every == 0:
+                    states = dict(self.keyframes[t // self.keyframe_every])
+                else:
+                    self._apply(states, record)
+                yield self._frame(t, states)
+
+    def record_song(player, max_ticks: int = 1000, keyframe_every: int = 32) -> FrameStore:
+        """Play a song into a FrameStore instead of run_all's list of frames."""
+        store = FrameStore(keyframe_every)
+        while not player.finished and len(store) < max_ticks:
+            pattern = player.current_pattern()
+            if not pattern:
+                player.finished = True
+                break
+            store.capture(player.position, pattern.name, player.world)
+            player.advance(pattern)
+        return store
+
+    def deep_sizeof(obj, seen=None) -> int:
+        """Bytes held by obj and everything it references (shared objects once)."""
+        seen = set() if seen is None else seen
+        if id(obj) in seen:
+            return 0
+        seen.add(id(obj))
+        size = sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            size += sum(deep_sizeof(v, seen) for v in obj)
+        elif hasattr(obj, "__dict__"):
+            size += deep_sizeof(vars(obj), seen)
+        return size
+
+    return FrameStore, record_song, deep_sizeof
+
+
+@app.cell
+def define_frame_archive(SongPosition, SongFrame, EventVerb, format_event, Iterable, np):
+    """Columnar on-disk frame archive, read back through a memory map."""
+    from functools import lru_cache
+    from typing import BinaryIO, Dict, List, Optional
+    import mmap
+    import struct
+    import tempfile
+
+    ARCHIVE_MAGIC = b"BTARCH02"
+    # magic, then (offset, count) for records, ticks, events, string ends and
+    # name order, then (offset, bytes) for the string heap
+    ARCHIVE_HEADER = struct.Struct("<8s12Q")
+    ARCHIVE_DATA_START = 128  # header slot; sections start 8-byte aligned after it
+
+    ALIVE, DIED, SPAWNED = 1, 2, 4  # record flag bits
+
+    RECORD = np.dtype([
+        ("tick", "<i8"), ("entity", "<u4"), ("speech", "<u4"),
+        ("x", "<f8"), ("y", "<f8"),
+        ("type", "<u2"), ("flags", "u1"), ("pad", "u1"),
+    ])
+    TICK = np.dtype([
+        ("first", "<u8"), ("count", "<u4"), ("pattern_name", "<u4"),
+        ("total_tick", "<i8"), ("pattern_index", "<i4"), ("pattern_tick", "<i4"),
+        ("events_first", "<u8"), ("events_count", "<u4"), ("pad", "<u4"),
+    ])
+    EVENT = np.dtype([
+        ("tick", "<i8"), ("a", "<f8"), ("b", "<f8"),
+        ("entity", "<u4"), ("text", "<u4"), ("verb", "u1"), ("pad", "V7"),
+    ])
+    END = struct.Struct("<Q")
+
+    class FrameArchiveWriter:
+        """Streams SongFrames to disk as fixed-width entity and event records.
+
+        Every tick appends one RECORD per entity in the frame, so the
+        record section is ordered by tick. A frame's messages are stored
+        as the typed events behind them - verb, entity, a, b and text,
+        formatted again only when read - if the world kept an event log,
+        and as NOTE events carrying the text otherwise. Strings go to a
+        heap file as they first appear and records hold ids into it.
+        Names, types, speech and event arguments are interned (a song's
+        vocabulary); free text is appended without a lookup. Every
+        section is spilled to a temporary file, so memory stays flat
+        however long the run is. close() joins the sections and writes
+        the header.
+        """
+
+        def __init__(self, path):
+            self.path = path
+            self.file: BinaryIO = open(path, "wb")
+            self.file.write(bytes(ARCHIVE_DATA_START))
+            self.tick_rows = tempfile.TemporaryFile()
+            self.events = tempfile.TemporaryFile()
+            self.heap = tempfile.TemporaryFile()
+            self.string_ends = tempfile.TemporaryFile()
+            self.heap_size = self.n_strings = 0
+            self.ids: Dict[str, int] = {}
+            self.alive: Dict[int, bool] = {}  # entity id → alive at its last record
+            self.n_records = self.n_ticks = self.n_events = 0
+            self.intern("")  # id 0: no entity, no speech
+
+        def append_string(self, s: str) -> int:
+            """Add s to the heap without interning it; returns its id."""
+            data = s.encode()
+            self.heap.write(data)
+            self.heap_size += len(data)
+            self.string_ends.write(END.pack(self.heap_size))
+            self.n_strings += 1
+            return self.n_strings - 1
+
+        def intern(self, s: str) -> int:
+            i = self.ids.get(s)
+            if i is None:
+                i = self.ids[s] = self.append_string(s)
+            return i
+
+        def write(self, frame: SongFrame):
+            n = len(frame.entities)
+            records = np.zeros(n, dtype=RECORD)
+            records["tick"] = frame.position.total_tick
+            if n:
+                ids, xs, ys, types, speech, flags = [], [], [], [], [], []
+                for name, e in frame.entities.items():
+                    i = self.intern(name)
+                    was_alive = self.alive.get(i, False)
+                    alive = bool(e["alive"])
+                    self.alive[i] = alive
+                    ids.append(i)
+                    xs.append(e["x"])
+                    ys.append(e["y"])
+                    types.append(self.intern(e["type"]))
+                    speech.append(self.intern(e.get("speech", "")))
+                    flags.append(ALIVE if alive and was_alive else
+                                 ALIVE | SPAWNED if alive else
+                                 DIED if was_alive else 0)
+                records["entity"], records["x"], records["y"] = ids, xs, ys
+                records["type"], records["speech"], records["flags"] = types, speech, flags
+            self.file.write(records.tobytes())
+
+            logged = getattr(frame.messages, "records", None)  # a pinned EventMessages window
+            if logged is None:
+                logged = [(frame.position.total_tick, EventVerb.NOTE, "", 0, 0, m)
+                          for m in frame.messages]
+            events = np.zeros(len(logged), dtype=EVENT)
+            if logged:
+                tick, verb, entity, a, b, text = zip(*logged)
+                events["tick"], events["verb"], events["a"], events["b"] = tick, verb, a, b
+                events["entity"] = [self.intern(e) for e in entity]
+                events["text"] = [self.append_string(t) if v == EventVerb.NOTE else self.intern(t)
+                                  for v, t in zip(verb, text)]
+            self.events.write(events.tobytes())
+
+            row = np.zeros(1, dtype=TICK)
+            row[0] = (self.n_records, n, self.intern(frame.pattern_name),
+                      frame.position.total_tick, frame.position.pattern_index,
+                      frame.position.tick, self.n_events, len(events), 0)
+            self.tick_rows.write(row.tobytes())
+            self.n_records += n
+            self.n_events += len(events)
+            self.n_ticks += 1
+
+        def _append(self, spill: BinaryIO) -> int:
+            self.file.write(bytes(-self.file.tell() % 8))
+            offset = self.file.tell()
+            spill.seek(0)
+            while chunk := spill.read(1 << 20):
+                self.file.write(chunk)
+            spill.close()
+            return offset
+
+        def close(self):
+            if self.file.closed:
+                return
+            ticks_at = self._append(self.tick_rows)
+            events_at = self._append(self.events)
+            ends_at = self._append(self.string_ends)
+            # interned ids sorted by their string, so readers can binary-search a name
+            order = np.array([self.ids[s] for s in sorted(self.ids)], dtype="<u4")
+            self.file.write(bytes(-self.file.tell() % 8))
+            order_at = self.file.tell()
+            self.file.write(order.tobytes())
+            heap_at = self._append(self.heap)
+            self.file.seek(0)
+            self.file.write(ARCHIVE_HEADER.pack(
+                ARCHIVE_MAGIC, ARCHIVE_DATA_START, self.n_records, ticks_at, self.n_ticks,
+                events_at, self.n_events, ends_at, self.n_strings, order_at, len(order),
+                heap_at, self.heap_size))
+            self.file.close()
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            self.close()
+
+    def export_frames(frames: Iterable[SongFrame], path) -> int:
+        """Write frames (e.g. player.frames(n), consumed lazily) to an archive."""
+        with FrameArchiveWriter(path) as writer:
+            for frame in frames:
+                writer.write(frame)
+        return writer.n_ticks
+
+    class FrameArchive:
+        """Memory-mapped reader for a FrameArchiveWriter file.
+
+        records, ticks, events and the string table are NumPy views
+        straight into the mapping - nothing is read until a query touches
+        it, and opening costs the same for any length of run. Tick ranges
+        map to record slices via ticks["first"], so range queries are
+        views too; per-entity queries binary-search the sorted name order
+        once, then scan the entity column of that slice.
+        """
+
+        def __init__(self, path):
+            self.file = open(path, "rb")
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            (magic, rec_at, n_rec, ticks_at, n_ticks, events_at, n_events,
+             ends_at, n_strings, order_at, n_order, heap_at, _heap_len) = \
+                ARCHIVE_HEADER.unpack_from(self.map)
+            if magic != ARCHIVE_MAGIC:
+                raise ValueError(f"{path} is not a frame archive")
+            self.records = np.frombuffer(self.map, RECORD, n_rec, rec_at)
+            self.ticks = np.frombuffer(self.map, TICK, n_ticks, ticks_at)
+            self.events = np.frombuffer(self.map, EVENT, n_events, events_at)
+            self.string_ends = np.frombuffer(self.map, "<u8", n_strings, ends_at)
+            self.name_order = np.frombuffer(self.map, "<u4", n_order, order_at)
+            self.heap_at = heap_at
+            self.string = lru_cache(maxsize=1 << 16)(self._decode)
+
+        def _decode(self, i: int) -> str:
+            i = int(i)
+            start = self.heap_at + (int(self.string_ends[i - 1]) if i else 0)
+            return self.map[start:self.heap_at + int(self.string_ends[i])].decode()
+
+        def string_id(self, s: str) -> Optional[int]:
+            """The id s was interned under, or None if it never appeared."""
+            lo, hi = 0, len(self.name_order)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self.string(self.name_order[mid]) < s:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            if lo < len(self.name_order) and self.string(self.name_order[lo]) == s:
+                return int(self.name_order[lo])
+            return None
+
+        def __len__(self):
+            return len(self.ticks)
+
+        def span(self, start: int = 0, end: Optional[int] = None) -> np.ndarray:
+            """Records for archived ticks [start, end), as a view."""
+            end = len(self.ticks) if end is None else min(end, len(self.ticks))
+            if start >= end:
+                return self.records[:0]
+            first = int(self.ticks["first"][start])
+            last = int(self.ticks["first"][end - 1] + self.ticks["count"][end - 1])
+            return self.records[first:last]
+
+        def trajectory(self, name: str, start: int = 0, end: Optional[int] = None) -> np.ndarray:
+            """name's records (tick, x, y, flags, ...) in tick order."""
+            rows = self.span(start, end)
+            i = self.string_id(name)
+            if i is None:
+                return rows[:0]
+            return rows[rows["entity"] == i]
+
+        def deaths(self, start: int = 0, end: Optional[int] = None) -> List[tuple]:
+            """(tick, name) for every entity that went from alive to dead."""
+            rows = self.span(start, end)
+            dead = rows[(rows["flags"] & DIED) != 0]
+            return [(int(t), self.string(e)) for t, e in zip(dead["tick"], dead["entity"])]
+
+        def frame(self, tick: int) -> SongFrame:
+            """Rebuild the SongFrame archived at index tick."""
+            t = self.ticks[tick]
+            s = self.string
+            m = int(t["events_first"])
+            return SongFrame(
+                position=SongPosition(int(t["pattern_index"]), int(t["pattern_tick"]),
+                                      int(t["total_tick"])),
+                pattern_name=s(t["pattern_name"]),
+                entities={
+                    s(r["entity"]): {"x": float(r["x"]), "y": float(r["y"]),
+                                     "alive": bool(r["flags"] & ALIVE),
+                                     "type": s(r["type"]), "speech": s(r["speech"])}
+                    for r in self.span(tick, tick + 1)
+                },
+                messages=[format_event(int(e["tick"]), int(e["verb"]), s(e["entity"]),
+                                       float(e["a"]), float(e["b"]), s(e["text"]))
+                          for e in self.events[m:m + int(t["events_count"])]],
+            )
+
+        def close(self):
+            self.string.cache_clear()
+            # release the views before the map
+            self.records = self.ticks = self.events = self.string_ends = self.name_order = None
+            self.map.close()
+            self.file.close()
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            self.close()
+
+    return FrameArchiveWriter, FrameArchive, export_frames
+
+
+@app.cell
+def define_instrumentation(Tuple, json, time):
+    """Opt-in profiling of the tick loop that costs nothing when detached."""
+    from typing import Dict, List
+
+    class TickProfiler:
+        """Per-verb, per-channel and per-tick timings for one SongPlayer.
+
+        attach() shadows the player's capture, its interpreter's execute and
+        execute_tick, and its world's apply_physics with timed wrappers set
+        on those instances; detach() deletes them again. The classes are
+        never touched, so an unprofiled player runs exactly the code it ran
+        before - there is no "is profiling on?" check anywhere.
+        """
+
+        def __init__(self):
+            self.cells: Dict[Tuple[str, str], List[int]] = {}  # (verb, channel) → [calls, ns]
+            self.tick_ns = 0
+            self.physics_ns = 0
+            self.capture_ns = 0
+            self.captures = 0
+            self.ticks = 0
+            self.latency = [0] * 64  # ticks whose execute_tick took 2**(k-1)..2**k ns
+            self.patched: List[Tuple[object, str]] = []
+
+        def _patch(self, obj, name, wrapper):
+            setattr(obj, name, wrapper)
+            self.patched.append((obj, name))
+
+        def attach(self, player) -> "TickProfiler":
+            clock = time.perf_counter_ns
+            interpreter, world = player.interpreter, player.world
+            execute, execute_tick = interpreter.execute, interpreter.execute_tick
+            apply_physics, capture = world.apply_physics, player.capture
+            cells = self.cells
+
+            def timed_execute(entity_name, behavior):
+                start = clock()
+                execute(entity_name, behavior)
+                ns = clock() - start
+                key = (behavior.verb.name, entity_name)
+                cell = cells.get(key)
+                if cell is None:
+                    cell = cells[key] = [0, 0]
+                cell[0] += 1
+                cell[1] += ns
+
+            def timed_execute_tick(tick_behaviors, idle=False):
+                start = clock()
+                execute_tick(tick_behaviors, idle)
+                ns = clock() - start
+                self.tick_ns += ns
+                self.ticks += 1
+                self.latency[min(ns.bit_length(), 63)] += 1
+
+            def timed_apply_physics():
+                start = clock()
+                apply_physics()
+                self.physics_ns += clock() - start
+
+            def timed_capture(pattern):
+                start = clock()
+                frame = capture(pattern)
+                self.capture_ns += clock() - start
+                self.captures += 1
+                return frame
+
+            self._patch(interpreter, "execute", timed_execute)
+            self._patch(interpreter, "execute_tick", timed_execute_tick)
+            self._patch(world, "apply_physics", timed_apply_physics)
+            self._patch(player, "capture", timed_capture)
+            return self
+
+        def detach(self):
+            for obj, name in reversed(self.patched):
+                delattr(obj, name)
+            self.patched.clear()
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            self.detach()
+
+        def report(self) -> dict:
+            verbs: Dict[str, Dict[str, int]] = {}
+            channels: Dict[str, int] = {}
+            for (verb, channel), (calls, ns) in self.cells.items():
+                v = verbs.setdefault(verb, {"calls": 0, "ns": 0})
+                v["calls"] += calls
+                v["ns"] += ns
+                channels[channel] = channels.get(channel, 0) + ns
+            execute_ns = sum(v["ns"] for v in verbs.values())
+            return {
+                "ticks": self.ticks,
+                "tick_ns": self.tick_ns,
+                "execute_ns": execute_ns,
+                "physics_ns": self.physics_ns,
+                "capture_ns": self.capture_ns,
+                "captures": self.captures,
+                "verbs": dict(sorted(verbs.items(), key=lambda kv: -kv[1]["ns"])),
+                "channels": dict(sorted(channels.items(), key=lambda kv: -kv[1])),
+                "latency_histogram": {f"<{2 ** k}ns": n for k, n in enumerate(self.latency) if n},
+            }
+
+        def to_json(self, path):
+            with open(path, "w") as f:
+                json.dump(self.report(), f, indent=2)
+
+        def collapsed(self) -> List[str]:
+            """Collapsed-stack lines ("a;b;c ns") for flamegraph.pl or speedscope."""
+            execute_ns = sum(ns for _, ns in self.cells.values())
+            lines = [f"tick;capture {self.capture_ns}",
+                     f"tick;execute_tick;apply_physics {self.physics_ns}",
+                     f"tick;execute_tick {max(0, self.tick_ns - execute_ns - self.physics_ns)}"]
+            lines += [f"tick;execute_tick;execute;{verb};{channel} {ns}"
+                      for (verb, channel), (_, ns) in sorted(self.cells.items())]
+            return lines
+
+        def to_collapsed(self, path):
+            with open(path, "w") as f:
+                f.write("\n".join(self.collapsed()) + "\n")
+
+    return TickProfiler,
+
+
+@app.cell
+def create_demo_patterns(Pattern, Channel, Song, spawn, move, jump, chase, flee, shoot, say, nop,
+                         die, flag):
     """Create multiple patterns and a song that chains them."""
 
     # Pattern 00: Intro - player enters, looks around
@@ -544,12 +2517,18 @@ def run_simulation(demo, World, BehaviorInterpreter):
 
 
 @app.cell
-def run_song_simulation(demo_song, World, SongPlayer):
+def run_song_simulation(demo_song, World, ArrayWorld, SongPlayer):
     """Run the full song and collect frames."""
 
-    def run_song(song, gravity=0.3, max_ticks=500):
-        """Execute entire song and return frames."""
-        world = World(width=32, height=16, gravity=gravity)
+    def run_song(song, gravity=0.3, max_ticks=500, arrays=False):
+        """Execute entire song and return frames.
+
+        arrays=True stores entities in an EntityTable and runs physics
+        vectorized - same frames; with 3000 entities over 100 ticks it runs
+        in about half the time of the dict world (0.07s vs 0.15s).
+        """
+        world_cls = ArrayWorld if arrays else World
+        world = world_cls(width=32, height=16, gravity=gravity)
         player = SongPlayer(song, world)
         return player.run_all(max_ticks)
 
@@ -559,44 +2538,1389 @@ def run_song_simulation(demo_song, World, SongPlayer):
 
 
 @app.cell
-def render_world(frames):
-    """Render the world as ASCII for each frame."""
+def verify_entity_table(demo_song, run_song, song_frames):
+    """The array-backed world must replay the demo song frame for frame."""
+    array_frames = run_song(demo_song, arrays=True)
 
-    def render_frame(frame, width=32, height=16) -> str:
-        """Render a single frame as ASCII."""
-        # Initialize empty grid
-        grid = [['·' for _ in range(width)] for _ in range(height)]
+    soa_frames_match = len(array_frames) == len(song_frames) and all(
+        a.entities == b.entities and a.messages == b.messages
+        for a, b in zip(array_frames, song_frames)
+    )
 
-        # Draw floor
-        for x in range(width):
-            grid[height-1][x] = '▀'
+    return soa_frames_match,
 
-        # Draw entities
-        symbols = {"player": "P", "enemy": "E", "item": "◆", "bullet": "→", "world": " "}
-        speeches = []
 
-        for name, e in frame.entities.items():
-            if not e["alive"]:
-                continue
-            x, y = int(e["x"]), int(e["y"])
-            if 0 <= x < width and 0 <= y < height:
-                sym = symbols.get(e["type"], "?")
-                grid[y][x] = sym
-                if e.get("speech"):
-                    speeches.append(f'{name}: "{e["speech"]}"')
+@app.cell
+def define_benchmark_songs(demo_song, Song, Pattern, Channel, random,
+                           spawn, move, jump, chase, flee, shoot, die, wait, say, flag, nop):
+    """Workloads for the measurement cells: random patterns and an endless song."""
+
+    def synthetic_pattern(ticks=64, channels=64, seed=0):
+        """Random verb mix; every channel spawns on its first row."""
+        rng = random.Random(seed)
+        makers = [
+            lambda: move(rng.choice((-1, 0, 1)), rng.choice((-1, 0, 1))),
+            lambda: jump(rng.randint(1, 4)),
+            lambda: chase(f"ch{rng.randrange(channels)}"),
+            lambda: flee(f"ch{rng.randrange(channels)}"),
+            lambda: shoot(rng.choice((-1, 1)), 0),
+            lambda: say(rng.choice(("hey", "ouch", "..."))),
+            lambda: flag(f"f{rng.randrange(4)}"),
+            wait, nop, nop, nop,
+        ]
+        chans = []
+        for c in range(channels):
+            rows = [spawn(rng.randint(0, 31), rng.randint(0, 15))]
+            rows += [rng.choice(makers)() for _ in range(ticks - 2)] + [die()]
+            chans.append(Channel(f"ch{c}", "enemy", rows))
+        return Pattern(name="synthetic", length=ticks, channels=chans)
+
+    looping_song = Song(
+        name=f"{demo_song.name}_endless",
+        patterns=demo_song.patterns,
+        sequence=demo_song.sequence + ["idle"],
+        loop_point=len(demo_song.sequence),  # idle forever after the adventure
+    )
+
+    return synthetic_pattern, looping_song
+
+
+@app.cell
+def benchmark_controls():
+    """The measurements below take seconds each, so they wait for this button."""
+    import marimo as _mo
+
+    run_benchmarks = _mo.ui.run_button(label="Run benchmarks")
+
+    def stop_unless_pressed(button):
+        """Halt the calling cell (and its dependents) until button has been pressed."""
+        _mo.stop(not button.value)
+
+    return run_benchmarks, stop_unless_pressed
+
+
+@app.cell
+def benchmark_bytecode(run_benchmarks, stop_unless_pressed, synthetic_pattern, ArrayWorld,
+                       BehaviorInterpreter, compile_pattern, SymbolTable, BytecodeVM, time):
+    """Interpreter vs bytecode VM on a synthetic 64-tick × 64-channel pattern."""
+    stop_unless_pressed(run_benchmarks)
+
+    def run_interpreted(pattern):
+        world = ArrayWorld(gravity=0.3)
+        interpreter = BehaviorInterpreter(world)
+        for t in range(pattern.length):
+            interpreter.execute_tick(pattern.get_tick(t))
+        return world
+
+    def run_compiled(compiled):
+        world = ArrayWorld(gravity=0.3)
+        vm = BytecodeVM(world, bench_symbols)
+        for t in range(compiled.length):
+            vm.execute_tick(compiled, t)
+        return world
+
+    def best_of(fn, arg, repeat=3):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = fn(arg)
+            best = min(best, time.perf_counter() - start)
+        return best, result
+
+    bench_pattern = synthetic_pattern()
+    bench_symbols = SymbolTable()
+    compile_start = time.perf_counter()
+    bench_compiled = compile_pattern(bench_pattern, bench_symbols)
+    _compile_s = time.perf_counter() - compile_start
+
+    interp_s, _interp_world = best_of(run_interpreted, bench_pattern)
+    vm_s, _vm_world = best_of(run_compiled, bench_compiled)
+
+    _n = _interp_world.table.size
+    bytecode_matches = (
+        _interp_world.table.names == _vm_world.table.names
+        and _interp_world.messages == _vm_world.messages
+        and all((getattr(_interp_world.table, c)[:_n] == getattr(_vm_world.table, c)[:_n]).all()
+                for c in ("x", "y", "vx", "vy", "alive"))
+    )
+    bytecode_speedup = interp_s / vm_s if vm_s else float("inf")
+
+    bytecode_summary = (
+        f"Bytecode VM: {interp_s * 1e3:.1f} ms → {vm_s * 1e3:.1f} ms per 64×64 pattern "
+        f"({bytecode_speedup:.1f}x, one-off compile {_compile_s * 1e3:.1f} ms, "
+        f"identical state: {bytecode_matches})"
+    )
+
+    return bytecode_matches, bytecode_speedup, bytecode_summary
+
+
+@app.cell
+def measure_frame_store(run_benchmarks, stop_unless_pressed, looping_song, World, SongPlayer,
+                        record_song, deep_sizeof):
+    """Memory of list-of-dicts history vs the keyframe + delta store."""
+    stop_unless_pressed(run_benchmarks)
+
+    history_ticks = 2000
+    list_frames = SongPlayer(looping_song, World(gravity=0.3)).run_all(history_ticks)
+    frame_store = record_song(SongPlayer(looping_song, World(gravity=0.3)),
+                              history_ticks, keyframe_every=64)
+
+    list_bytes = deep_sizeof(list_frames)
+    store_bytes = deep_sizeof(frame_store)
+    store_matches = all(
+        frame_store[t].entities == list_frames[t].entities
+        for t in range(0, history_ticks, 97)
+    )
+
+    frame_store_summary = (
+        f"Frame store: {history_ticks} ticks of history in {store_bytes / 1024:.0f} KiB "
+        f"vs {list_bytes / 1024:.0f} KiB as frame dicts "
+        f"({list_bytes / store_bytes:.0f}x smaller, random access matches: {store_matches})"
+    )
+
+    return frame_store, frame_store_summary
+
+
+@app.cell
+def define_batch_runner(World, SongPlayer, Callable):
+    """Parameter sweeps fanned out over a pool of worker processes."""
+    from typing import Dict, List, Optional
+    import itertools
+
+    from forkpool import fork_map
+
+    def sweep_grid(**axes) -> List[dict]:
+        """Cartesian product of named axes: sweep_grid(gravity=[.2, .3], ...)."""
+        names = list(axes)
+        return [dict(zip(names, combo)) for combo in itertools.product(*axes.values())]
+
+    def summarize_run(song, gravity=0.3, width=32, height=16, max_ticks=500) -> dict:
+        """Play a song headless and keep only the outcome, not the frames."""
+        world = World(width=width, height=height, gravity=gravity)
+        player = SongPlayer(song, world)
+        died: Dict[str, int] = {}
+        while not player.finished and world.tick < max_ticks:
+            pattern = player.current_pattern()
+            if not pattern:
+                break
+            player.advance(pattern)
+            for name, e in world.entities.items():
+                if not e.alive and name not in died:
+                    died[name] = world.tick - 1  # the tick whose behaviors killed it
+        return {
+            "ticks": world.tick,
+            "positions": {name: (e.x, e.y) for name, e in world.entities.items() if e.alive},
+            "flags": sorted(world.flags),
+            "died": died,
+        }
+
+    def _run_task(songs, params, max_ticks):
+        params = dict(params)
+        song = songs[params.pop("song")]
+        return summarize_run(song, max_ticks=max_ticks, **params)
+
+    def run_sweep(songs: Dict[str, "Song"], grid: List[dict], workers: Optional[int] = None,
+                  chunksize: int = 16, max_ticks: int = 500,
+                  on_result: Optional[Callable[[int, dict, dict], None]] = None) -> List[dict]:
+        """Run summarize_run for every params dict in grid, in parallel.
+
+        Each params dict names its arrangement with a "song" key into songs;
+        the remaining keys go to summarize_run. Runs on forkpool.fork_map:
+        workers inherit songs, so tasks only carry (index, params) chunks.
+        on_result is called in the parent as each result arrives; the
+        returned list is in grid order.
+        """
+        deliver = (lambda i, summary: on_result(i, grid[i], summary)) if on_result else None
+        return fork_map(lambda params: _run_task(songs, params, max_ticks), grid,
+                        workers, chunksize, deliver)
+
+    return sweep_grid, summarize_run, run_sweep
+
+
+@app.cell
+def define_world_batch(BehaviorType, Song, SongTimeline, np):
+    """Many worlds, one song: state arrays with a leading world axis."""
+    from typing import Dict, List, Optional
+
+    class WorldBatch:
+        """n_worlds copies of a World, stepped by one tick loop.
+
+        Every world plays the same song, so which entities exist, what they
+        are called and when they die is shared; only positions and
+        velocities differ, and those are (world, entity) arrays. Worlds vary
+        by gravity, size and spawn jitter (spawns land up to ±jitter cells
+        off the pattern's coordinates). Collisions and compaction are not
+        modelled - they would make the roster differ between worlds.
+        """
+
+        def __init__(self, gravity=0.0, width=32, height=16, jitter=0.0,
+                     n_worlds: Optional[int] = None, seed: int = 0, capacity: int = 64):
+            params = [np.atleast_1d(np.asarray(p, dtype=np.float64))
+                      for p in (gravity, width, height, jitter)]
+            n = n_worlds or max(len(p) for p in params)
+            self.gravity, self.width, self.height, self.jitter = (
+                np.broadcast_to(p, (n,)).copy() for p in params)
+            self.n_worlds = n
+            self.rng = np.random.default_rng(seed)
+            self.tick = 0
+            self.flags: set = set()
+            self.names: List[str] = []
+            self.types: List[str] = []
+            self.index: Dict[str, int] = {}
+            self.alive = np.zeros(capacity, dtype=bool)
+            self.died = np.full(capacity, -1, dtype=np.int64)
+            self.x, self.y, self.vx, self.vy = (np.zeros((n, capacity)) for _ in range(4))
+            self._next_suffix: Dict[str, tuple] = {}  # prefix → (tick, next k)
+
+        def _grow(self):
+            extra = self.alive.shape[0]
+            self.alive = np.concatenate((self.alive, np.zeros(extra, dtype=bool)))
+            self.died = np.concatenate((self.died, np.full(extra, -1, dtype=np.int64)))
+            for name in ("x", "y", "vx", "vy"):
+                col = getattr(self, name)
+                setattr(self, name, np.concatenate((col, np.zeros_like(col)), axis=1))
+
+        def add_entity(self, name: str, entity_type: str, x, y) -> int:
+            """Like World.add_entity: an existing name is replaced in place."""
+            i = self.index.get(name)
+            if i is None:
+                i = self.index[name] = len(self.names)
+                if i == self.alive.shape[0]:
+                    self._grow()
+                self.names.append(name)
+                self.types.append(entity_type)
+            self.types[i] = entity_type
+            self.alive[i], self.died[i] = True, -1
+            self.x[:, i], self.y[:, i] = x, y
+            self.vx[:, i] = self.vy[:, i] = 0.0
+            return i
+
+        def unique_name(self, prefix: str) -> str:
+            """World.unique_name: the next suffix is remembered per prefix."""
+            tick, k = self._next_suffix.get(prefix, (self.tick, 0))
+            if tick != self.tick:
+                k = 0
+            base = f"{prefix}_{self.tick}"
+            name = f"{base}_{k}" if k else base
+            while name in self.index:
+                k += 1
+                name = f"{base}_{k}"
+            self._next_suffix[prefix] = (self.tick, k + 1)
+            return name
+
+        def _step_toward(self, i: int, target: str, scale: float):
+            j = self.index.get(target)
+            if j is None:
+                return
+            self.x[:, i] += scale * np.sign(self.x[:, j] - self.x[:, i])
+            self.y[:, i] += scale * np.sign(self.y[:, j] - self.y[:, i])
+
+        def execute(self, entity_name: str, behavior):
+            """BehaviorInterpreter.execute, for every world at once."""
+            verb, params = behavior.verb, behavior.params
+            i = self.index.get(entity_name)
+            live = i is not None and self.alive[i]
+
+            if verb == BehaviorType.SPAWN:
+                x, y = params.get("x", 0), params.get("y", 0)
+                if self.jitter.any():
+                    x = x + self.jitter * self.rng.uniform(-1, 1, self.n_worlds)
+                    y = y + self.jitter * self.rng.uniform(-1, 1, self.n_worlds)
+                etype = "player" if "player" in entity_name.lower() else "enemy"
+                self.add_entity(entity_name, etype, x, y)
+            elif not live:
+                if verb == BehaviorType.FLAG:
+                    self.flags.add(params.get("name", ""))
+            elif verb == BehaviorType.MOVE:
+                self.x[:, i] += params.get("dx", 0)
+                self.y[:, i] += params.get("dy", 0)
+            elif verb == BehaviorType.JUMP:
+                self.vy[:, i] = -params.get("force", 3)
+            elif verb == BehaviorType.CHASE:
+                self._step_toward(i, params.get("target", ""), 0.5)
+            elif verb == BehaviorType.FLEE:
+                self._step_toward(i, params.get("target", ""), -0.5)
+            elif verb == BehaviorType.SHOOT:
+                dx, dy = params.get("dx", 1), params.get("dy", 0)
+                b = self.add_entity(self.unique_name("bullet"), "bullet", 0.0, 0.0)
+                self.x[:, b], self.y[:, b] = self.x[:, i] + dx, self.y[:, i]
+                self.vx[:, b], self.vy[:, b] = dx * 2, dy
+            elif verb == BehaviorType.DIE:
+                self.alive[i], self.died[i] = False, self.tick
+            elif verb == BehaviorType.FLAG:
+                self.flags.add(params.get("name", ""))
+
+        def apply_physics(self):
+            """World.apply_physics with per-world gravity and bounds."""
+            live = np.flatnonzero(self.alive[:len(self.names)])
+            if not len(live):
+                return
+            floor = (self.height - 1)[:, None]
+            vy = self.vy[:, live] + self.gravity[:, None]
+            x = np.clip(self.x[:, live] + self.vx[:, live], 0, (self.width - 1)[:, None])
+            y = np.clip(self.y[:, live] + vy, 0, floor)
+            vy[y >= floor] = 0.0
+            self.x[:, live], self.y[:, live], self.vy[:, live] = x, y, vy
+
+        def execute_tick(self, tick_behaviors, idle: bool = False):
+            if not idle:
+                for entity_name, behavior in tick_behaviors.items():
+                    self.execute(entity_name, behavior)
+            self.apply_physics()
+            self.tick += 1
+
+        def play(self, song: Song, max_ticks: int = 500) -> "WorldBatch":
+            """Advance every world through song, like SongPlayer.advance."""
+            if any(any(p.table.guards) for p in song.patterns.values() if p.table is not None):
+                raise ValueError("WorldBatch cannot play conditional cells: "
+                                 "their guards may differ between worlds")
+            timeline = SongTimeline(song)
+            for _, entry, row, count in timeline.segments(self.tick, max_ticks):
+                pattern = song.patterns[song.sequence[entry]]
+                for r in range(row, row + count):
+                    self.execute_tick(pattern.get_tick(r), pattern.is_idle(r))
+            return self
+
+        def outcomes(self) -> Dict[str, object]:
+            """Per-world results: (world, entity) arrays plus the shared roster."""
+            n = len(self.names)
+            alive = np.broadcast_to(self.alive[:n], (self.n_worlds, n))
+            return {
+                "names": list(self.names),
+                "x": self.x[:, :n].copy(), "y": self.y[:, :n].copy(),
+                "alive": alive.copy(),
+                "grounded": alive & (self.y[:, :n] >= (self.height - 1)[:, None]),
+                "died": self.died[:n].copy(),  # tick, or -1 if still alive
+                "flags": sorted(self.flags),
+                "ticks": self.tick,
+            }
+
+    return WorldBatch,
+
+
+@app.cell
+def measure_world_batch(run_benchmarks, stop_unless_pressed, looping_song, summarize_run,
+                        WorldBatch, time, np):
+    """One batched tick loop vs looping summarize_run over world variants."""
+    stop_unless_pressed(run_benchmarks)
+
+    rng = np.random.default_rng(5)
+    n_worlds = 2000
+    gravity = rng.choice([0.1, 0.2, 0.3, 0.45, 0.6], n_worlds)
+    width = rng.choice([24, 32, 48, 64], n_worlds)
+    height = rng.choice([12, 16, 24], n_worlds)
+    batch_ticks = 500
+
+    _start = time.perf_counter()
+    batch = WorldBatch(gravity, width, height).play(looping_song, batch_ticks)
+    batch_s = time.perf_counter() - _start
+    outcome = batch.outcomes()
+
+    sample = range(0, n_worlds, 40)
+    _start = time.perf_counter()
+    looped = [summarize_run(looping_song, gravity[w], int(width[w]), int(height[w]), batch_ticks)
+              for w in sample]
+    loop_s = (time.perf_counter() - _start) / len(sample) * n_worlds
+
+    _live = [k for k, name in enumerate(outcome["names"]) if outcome["alive"][0, k]]
+    batch_matches = all(
+        {outcome["names"][k]: (outcome["x"][w, k], outcome["y"][w, k]) for k in _live}
+        == run["positions"]
+        for w, run in zip(sample, looped)
+    )
+
+    jittered = WorldBatch(0.3, 32, 16, jitter=np.linspace(0, 3, 256), seed=1).play(looping_song, batch_ticks)
+    spread = jittered.outcomes()["x"][:, _live].std(axis=0).mean()
+
+    world_batch_summary = (
+        f"World batch: {n_worlds} worlds × {batch_ticks} ticks in {batch_s * 1e3:.0f} ms "
+        f"vs ~{loop_s:.1f} s looping summarize_run ({loop_s / batch_s:.0f}x); "
+        f"matches per-world runs: {batch_matches}; spawn jitter 0-3 spreads final x by {spread:.2f} cells"
+    )
+
+    return world_batch_summary,
+
 
-        # Build output
-        lines = ["".join(row) for row in grid]
-        frame_str = "\n".join(lines)
+@app.cell
+def run_demo_sweep(run_benchmarks, stop_unless_pressed, demo_song, Song, sweep_grid, run_sweep,
+                   time):
+    """Tune game feel: gravity × world size × arrangement over the demo song."""
+    stop_unless_pressed(run_benchmarks)
+
+    arrangements = {
+        "full": demo_song,
+        "skip_intro": Song("skip_intro", demo_song.patterns, ["action", "victory"], -1),
+    }
+    sweep = sweep_grid(song=list(arrangements), gravity=[0.1, 0.3, 0.6],
+                       width=[24, 32, 48], height=[12, 16])
+
+    sweep_start = time.perf_counter()
+    sweep_results = run_sweep(arrangements, sweep, chunksize=4)
+    sweep_s = time.perf_counter() - sweep_start
+
+    wins = sum("win" in r["flags"] for r in sweep_results)
+    sweep_summary = (
+        f"Sweep: {len(sweep)} runs in {sweep_s * 1e3:.0f} ms, "
+        f"{wins} reached the 'win' flag"
+    )
+
+    return sweep, sweep_results, sweep_summary
+
+
+@app.cell
+def benchmark_collisions(run_benchmarks, stop_unless_pressed, ArrayWorld, SpatialGrid,
+                         resolve_collisions, time, np, random):
+    """Bullet-vs-enemy collisions should scale with entity count, not its square."""
+    stop_unless_pressed(run_benchmarks)
+
+    def crowded_world(n_bullets, n_enemies, seed=0):
+        rng = random.Random(seed)
+        world = ArrayWorld(width=512, height=256)
+        for i in range(n_enemies):
+            world.add_entity(f"enemy_{i}", "enemy", rng.uniform(0, 511), rng.uniform(0, 255))
+        for i in range(n_bullets):
+            world.add_entity(f"bullet_{i}", "bullet", rng.uniform(0, 511), rng.uniform(0, 255))
+        return world
+
+    collision_timings = []
+    for _n in (1000, 2000, 4000, 8000):
+        world = crowded_world(_n, _n // 2)
+        _start = time.perf_counter()
+        hits = resolve_collisions(world)
+        collision_timings.append((_n, len(hits), time.perf_counter() - _start))
+
+    # The grid must find exactly the pairs a brute-force all-pairs check finds
+    check = crowded_world(1000, 500, seed=1)
+    _t = check.table
+    is_bullet = np.array([ty == "bullet" for ty in _t.types])
+    bx, by = _t.x[:_t.size][is_bullet], _t.y[:_t.size][is_bullet]
+    grid = SpatialGrid(check.width, check.height, 1.0).build(_t.x[:_t.size], _t.y[:_t.size], ~is_bullet)
+    q, e, _ = grid.pairs_within(bx, by, 0.75)
+    ex, ey = _t.x[:_t.size][~is_bullet], _t.y[:_t.size][~is_bullet]
+    brute = np.hypot(bx[:, None] - ex[None, :], by[:, None] - ey[None, :]) <= 0.75
+    enemy_rows = np.flatnonzero(~is_bullet)
+    grid_pairs = {(int(a), int(b)) for a, b in zip(q, e)}
+    brute_pairs = {(int(a), int(enemy_rows[b])) for a, b in zip(*np.nonzero(brute))}
+    spatial_matches_brute_force = grid_pairs == brute_pairs
+
+    collision_summary = "Spatial grid collisions: " + ", ".join(
+        f"{n} bullets {secs * 1e3:.1f} ms ({hits} hits)" for n, hits, secs in collision_timings
+    ) + f"; matches all-pairs check: {spatial_matches_brute_force}"
+
+    return collision_timings, spatial_matches_brute_force, collision_summary
+
+
+@app.cell
+def define_streaming(SongFrame, Iterable, Iterator, asyncio):
+    """Bounded-memory consumption of SongPlayer.frames()."""
+    from collections import deque
+    from typing import Optional
+
+    class FrameWindow:
+        """Pass-through over a frame stream that remembers the last N frames.
+
+        Frames are pulled only as the consumer iterates, and anything older
+        than the window is dropped, so an endless song runs in constant memory.
+        """
+
+        def __init__(self, frames: Iterable[SongFrame], size: int = 64):
+            self._source = iter(frames)
+            self.recent = deque(maxlen=size)
+            self.seen = 0
 
-        if speeches:
-            frame_str += "\n" + " | ".join(speeches)
+        def __iter__(self) -> Iterator[SongFrame]:
+            for frame in self._source:
+                self.recent.append(frame)
+                self.seen += 1
+                yield frame
 
-        return frame_str
+        def __len__(self):
+            return len(self.recent)
 
-    rendered_frames = [(f.tick, render_frame(f), f.messages) for f in frames]
+        def __getitem__(self, i: int) -> SongFrame:
+            return self.recent[i]
 
-    return render_frame, rendered_frames
+    async def stream_to_queue(player, queue: asyncio.Queue, max_ticks: Optional[int] = None):
+        """Producer task: fill queue with frames, then None.
+
+        A bounded queue is the backpressure - the simulation waits whenever
+        the consumer (renderer, exporter) falls maxsize frames behind.
+        """
+        async for frame in player.aframes(max_ticks):
+            await queue.put(frame)
+        await queue.put(None)
+
+    return FrameWindow, stream_to_queue
+
+
+@app.cell
+def define_realtime(SongFrame, Callable, asyncio, math, random, time):
+    """Real-time playback: a drift-free tick clock with a separate render task."""
+    from dataclasses import dataclass, field
+    from typing import List, Optional
+    import inspect
+
+    @dataclass
+    class ClockStats:
+        """How closely a RealtimeClock kept to its schedule.
+
+        Per-tick timings are folded into running sums and a fixed-size
+        reservoir sample (for p99), so an endless run stays in constant
+        memory. Jitter is the standard deviation of the intervals between
+        tick starts.
+        """
+        ticks: int = 0
+        rendered: int = 0
+        render_skipped: int = 0  # frames not captured because the clock was behind
+        render_dropped: int = 0  # captured frames replaced before the renderer got to them
+        late_ticks: int = 0      # ticks that started a whole period or more late
+        elapsed: float = 0.0     # start of the first tick to start of the last
+        scheduled: float = 0.0   # what that span should have been
+        observed: int = 0        # ticks folded in by observe()
+        lateness_total: float = 0.0
+        lateness_sample: List[float] = field(default_factory=list, repr=False)  # seconds
+        sample_size: int = 1024
+        _rng: random.Random = field(default_factory=lambda: random.Random(0), repr=False)
+        _last_start: Optional[float] = field(default=None, repr=False)
+        _interval_mean: float = field(default=0.0, repr=False)
+        _interval_m2: float = field(default=0.0, repr=False)  # Welford's running sum of squares
+
+        def observe(self, late: float, started: float):
+            """Fold in one tick that started late seconds after it was due."""
+            self.observed += 1
+            self.lateness_total += late
+            if len(self.lateness_sample) < self.sample_size:
+                self.lateness_sample.append(late)
+            else:
+                slot = self._rng.randrange(self.observed)
+                if slot < self.sample_size:
+                    self.lateness_sample[slot] = late
+            if self._last_start is not None:
+                interval = started - self._last_start
+                n = self.observed - 1
+                delta = interval - self._interval_mean
+                self._interval_mean += delta / n
+                self._interval_m2 += delta * (interval - self._interval_mean)
+            self._last_start = started
+
+        @property
+        def mean_lateness_ms(self) -> float:
+            return 1e3 * self.lateness_total / self.observed if self.observed else 0.0
+
+        @property
+        def jitter_ms(self) -> float:
+            intervals = self.observed - 1
+            return 1e3 * math.sqrt(self._interval_m2 / intervals) if intervals > 0 else 0.0
+
+        @property
+        def p99_ms(self) -> float:
+            if not self.lateness_sample:
+                return 0.0
+            ordered = sorted(self.lateness_sample)
+            return 1e3 * ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))]
+
+        @property
+        def drift_ms(self) -> float:
+            return 1e3 * (self.elapsed - self.scheduled)
+
+    class RealtimeClock:
+        """Plays a SongPlayer at ticks_per_second.
+
+        Tick k is due at start + k / ticks_per_second on the monotonic
+        clock. Sleep overshoot on one tick is absorbed by the next, so
+        error never accumulates. When a tick starts a whole period late,
+        the clock simulates without capturing a frame until it catches up.
+        Rendering runs in its own task and only ever sees the newest frame.
+        Plain render functions run in a worker thread, so a slow renderer
+        costs frames, not ticks. Coroutine renderers are awaited on the loop.
+        """
+
+        def __init__(self, player, ticks_per_second: float = 50.0,
+                     render: Optional[Callable[[SongFrame], object]] = None,
+                     clock: Callable[[], float] = time.perf_counter):
+            self.player = player
+            self.period = 1.0 / ticks_per_second
+            self.render = render
+            self.clock = clock
+            self.stats = ClockStats()
+            self._latest: Optional[SongFrame] = None
+            self._fresh: Optional[asyncio.Event] = None  # made in run(), inside the loop
+
+        @classmethod
+        def from_bpm(cls, player, bpm: float = 125.0, **kwargs) -> "RealtimeClock":
+            """Tracker tempo: ProTracker's CIA timer ticks bpm × 2 / 5 times a second."""
+            return cls(player, ticks_per_second=bpm * 2 / 5, **kwargs)
+
+        async def _simulate(self, max_ticks: int):
+            player, stats, clock, period = self.player, self.stats, self.clock, self.period
+            start = now = clock()
+            k = 0
+            while not player.finished and k < max_ticks:
+                pattern = player.current_pattern()
+                if not pattern:
+                    player.finished = True
+                    break
+                due = start + k * period
+                now = clock()
+                if now < due:
+                    await asyncio.sleep(due - now)
+                    now = clock()
+                else:
+                    await asyncio.sleep(0)  # let the renderer in even when behind
+                late = now - due
+                stats.observe(late, now)
+                if late >= period:
+                    stats.late_ticks += 1
+                    stats.render_skipped += 1
+                else:
+                    if self._latest is not None:
+                        stats.render_dropped += 1
+                    self._latest = player.capture(pattern)
+                    self._fresh.set()
+                player.advance(pattern)
+                k += 1
+            stats.ticks = k
+            stats.elapsed = now - start
+            stats.scheduled = max(0, k - 1) * period
+
+        async def _render_loop(self):
+            threaded = not inspect.iscoroutinefunction(self.render)
+            while True:
+                await self._fresh.wait()
+                self._fresh.clear()
+                frame, self._latest = self._latest, None
+                if frame is None:
+                    continue
+                if threaded:
+                    await asyncio.get_running_loop().run_in_executor(None, self.render, frame)
+                else:
+                    await self.render(frame)
+                self.stats.rendered += 1
+
+        async def run(self, max_ticks: int = 1000) -> ClockStats:
+            """Play up to max_ticks in real time; returns the timing stats."""
+            self.stats = ClockStats()
+            self._latest = None
+            self._fresh = asyncio.Event()
+            renderer = asyncio.create_task(self._render_loop()) if self.render else None
+            try:
+                await self._simulate(max_ticks)
+            finally:
+                if renderer is not None:
+                    renderer.cancel()
+                    try:
+                        await renderer
+                    except asyncio.CancelledError:
+                        pass
+            return self.stats
+
+    return ClockStats, RealtimeClock
+
+
+@app.cell
+def measure_streaming(run_benchmarks, stop_unless_pressed, looping_song, World, SongPlayer,
+                      FrameWindow, stream_to_queue, asyncio):
+    """An endless song streamed through a window stays flat in memory."""
+    stop_unless_pressed(run_benchmarks)
+
+    import tracemalloc
+
+    def peak_streaming(ticks, window=64):
+        player = SongPlayer(looping_song, World(gravity=0.3))
+        tracemalloc.start()
+        stream = FrameWindow(player.frames(ticks), size=window)
+        for _ in stream:
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak, stream
+
+    peak_short, _ = peak_streaming(1_000)
+    peak_long, long_stream = peak_streaming(10_000)
+
+    async def slow_consumer(maxsize=8, ticks=200):
+        queue = asyncio.Queue(maxsize=maxsize)
+        producer = asyncio.ensure_future(
+            stream_to_queue(SongPlayer(looping_song, World(gravity=0.3)), queue, ticks))
+        consumed, deepest = 0, 0
+        while (frame := await queue.get()) is not None:
+            deepest = max(deepest, queue.qsize())
+            consumed += 1
+            for _ in range(3):  # a renderer slower than the simulation
+                await asyncio.sleep(0)
+        await producer
+        return consumed, deepest
+
+    streamed, deepest_queue = asyncio.run(slow_consumer())
+
+    streaming_summary = (
+        f"Streaming: peak {peak_short / 1024:.0f} KiB at 1k ticks vs "
+        f"{peak_long / 1024:.0f} KiB at 10k ticks with a {len(long_stream)}-frame window; "
+        f"slow async consumer got {streamed} frames, queue capped at {deepest_queue}"
+    )
+
+    return streaming_summary,
+
+
+@app.cell
+def measure_seeking(run_benchmarks, stop_unless_pressed, looping_song, World, ArrayWorld,
+                    SongPlayer, time, random):
+    """Scrub a long song: checkpoint restore + at most K ticks of simulation."""
+    stop_unless_pressed(run_benchmarks)
+
+    seek_horizon = 10_000
+    seek_spacing = 256
+
+    def seek_latency(world_cls):
+        player = SongPlayer(looping_song, world_cls(gravity=0.3), checkpoint_every=seek_spacing)
+        player.seek(seek_horizon)  # first pass records the checkpoint index
+        targets = random.Random(0).sample(range(seek_horizon), 50)
+        start = time.perf_counter()
+        for t in targets:
+            player.seek(t)
+        return (time.perf_counter() - start) / len(targets), player
+
+    seek_s, seek_player = seek_latency(World)
+    array_seek_s, _ = seek_latency(ArrayWorld)
+
+    replay_start = time.perf_counter()
+    replay = SongPlayer(looping_song, World(gravity=0.3))
+    replay.seek(seek_horizon // 2)
+    replay_s = time.perf_counter() - replay_start
+
+    _straight = SongPlayer(looping_song, World(gravity=0.3)).run_all(600)
+    seek_frames_match = all(
+        seek_player.frame_at(t).entities == _straight[t].entities
+        and seek_player.frame_at(t).messages == _straight[t].messages
+        for t in (0, 1, 255, 256, 257, 599, 300, 20)
+    )
+
+    seek_summary = (
+        f"Seeking: {len(seek_player.checkpoints)} checkpoints every {seek_spacing} ticks, "
+        f"random seek {seek_s * 1e3:.2f} ms ({array_seek_s * 1e3:.2f} ms array world) "
+        f"vs {replay_s * 1e3:.0f} ms replaying to tick {seek_horizon // 2}; "
+        f"frames match straight playback: {seek_frames_match}"
+    )
+
+    return seek_summary,
+
+
+@app.cell
+def measure_pattern_memory(run_benchmarks, stop_unless_pressed, BehaviorType, BehaviorPalette,
+                           CompactRows, Channel, Pattern, deep_sizeof, spawn, move, jump, chase,
+                           flee, shoot, die, say, flag, nop, time, random):
+    """A 64×64 pattern library: per-cell dataclasses vs interned, packed rows."""
+    stop_unless_pressed(run_benchmarks)
+
+    from dataclasses import dataclass as _dataclass, field as _field
+    from typing import Any as _Any, Dict as _Dict
+
+    @_dataclass
+    class LegacyBehavior:
+        """The old per-cell representation, kept only for comparison."""
+        verb: BehaviorType
+        params: _Dict[str, _Any] = _field(default_factory=dict)
+
+    def library_cells(n_patterns=32, ticks=64, channels=64, seed=0):
+        """(pattern, channel, row) -> (verb maker, args), mostly idle like real songs."""
+        rng = random.Random(seed)
+        makers = [
+            (move, lambda: (rng.choice((-1, 0, 1)), rng.choice((-1, 0, 1)))),
+            (jump, lambda: (rng.randint(1, 4),)),
+            (chase, lambda: (f"ch{rng.randrange(channels)}",)),
+            (flee, lambda: (f"ch{rng.randrange(channels)}",)),
+            (shoot, lambda: (rng.choice((-1, 1)), 0)),
+            (say, lambda: (rng.choice(("hey", "ouch", "...", "!!")),)),
+            (flag, lambda: (f"f{rng.randrange(8)}",)),
+        ]
+        for p in range(n_patterns):
+            pattern_rows = []
+            for c in range(channels):
+                rows = [(spawn, (rng.randint(0, 31), rng.randint(0, 15)))]
+                for _ in range(ticks - 2):
+                    if rng.random() < 0.6:
+                        rows.append((nop, ()))
+                    else:
+                        maker, args = rng.choice(makers)
+                        rows.append((maker, args()))
+                rows.append((die, ()))
+                pattern_rows.append(rows)
+            yield p, pattern_rows
+
+    def legacy_cell(maker, args):
+        b = maker(*args)
+        return LegacyBehavior(b.verb, dict(b.params))
+
+    # Old layout: one dataclass + params dict per cell, in plain row lists
+    _start = time.perf_counter()
+    legacy_library = [
+        [[legacy_cell(maker, args) for maker, args in rows] for rows in chans]
+        for _, chans in library_cells()
+    ]
+    legacy_s = time.perf_counter() - _start
+
+    _start = time.perf_counter()
+    library_palette = BehaviorPalette()  # what a Song holding the library would share
+    compact_library = [
+        Pattern(f"p{p}", len(chans[0]), [
+            Channel(f"ch{c}", "enemy",
+                    CompactRows([maker(*args) for maker, args in rows], library_palette))
+            for c, rows in enumerate(chans)
+        ])
+        for p, chans in library_cells()
+    ]
+    compact_s = time.perf_counter() - _start
+
+    _cells = sum(len(ch.rows) for p in compact_library for ch in p.channels)
+    legacy_bytes = deep_sizeof(legacy_library)
+    compact_bytes = deep_sizeof(compact_library) + deep_sizeof(library_palette)
+
+    pattern_memory_summary = (
+        f"Pattern library ({_cells} cells): {compact_bytes / 2**20:.1f} MiB interned + packed "
+        f"vs {legacy_bytes / 2**20:.1f} MiB as per-cell dataclasses "
+        f"({legacy_bytes / compact_bytes:.0f}x smaller, built in {compact_s * 1e3:.0f} ms "
+        f"vs {legacy_s * 1e3:.0f} ms); {len(library_palette)} distinct behaviors"
+    )
+
+    return pattern_memory_summary,
+
+
+@app.cell
+def measure_entity_churn(run_benchmarks, stop_unless_pressed, World, ArrayWorld, time):
+    """Spawn-and-kill churn: with compaction, tick cost follows live entities."""
+    stop_unless_pressed(run_benchmarks)
+
+    def churn(world, ticks=200, per_tick=40, lifetime=8):
+        """per_tick bullets spawned every tick, each killed lifetime ticks later.
+
+        Times only the per-tick engine work - physics, compaction and a
+        frame-style capture of every entity - not the spawning itself.
+        """
+        engine_s = 0.0
+        for _ in range(ticks):
+            for _ in range(per_tick):
+                world.add_entity(world.unique_name("bullet"), "bullet", 1, 1)
+            expired = world.tick - lifetime
+            if expired >= 0:
+                for k in range(per_tick):
+                    world.remove_entity(f"bullet_{expired}" + (f"_{k}" if k else ""))
+            start = time.perf_counter()
+            world.apply_physics()
+            world.tick += 1
+            if world.compact_every and world.tick % world.compact_every == 0:
+                world.compact()
+            world.entity_states()
+            engine_s += time.perf_counter() - start
+        return engine_s, world
+
+    churn_results = {}
+    for label, make in (("dict", World), ("array", ArrayWorld)):
+        keep_s, kept = churn(make(width=64, height=32, gravity=0.1))
+        pool_s, pooled = churn(make(width=64, height=32, gravity=0.1, compact_every=16))
+        held = len(pooled.table.index) if label == "array" else len(pooled.entities)
+        churn_results[label] = (keep_s, len(kept.entities), pool_s, held)
+
+    churn_summary = "Entity churn (8000 spawned, 320 live): " + "; ".join(
+        f"{label} world {keep_s * 1e3:.0f} ms holding {kept} → "
+        f"{pool_s * 1e3:.0f} ms holding {held} with compaction"
+        for label, (keep_s, kept, pool_s, held) in churn_results.items()
+    )
+
+    return churn_results, churn_summary
+
+
+@app.cell
+def measure_tick_table(run_benchmarks, stop_unless_pressed, synthetic_pattern, looping_song, time):
+    """get_tick on a live pattern vs its frozen tick table."""
+    stop_unless_pressed(run_benchmarks)
+
+    _live = synthetic_pattern(seed=2)  # not in a Song, so not frozen yet
+
+    def time_get_tick(pattern, rounds=20):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for t in range(pattern.length):
+                pattern.get_tick(t)
+        return (time.perf_counter() - start) / (rounds * pattern.length)
+
+    build_s = time_get_tick(_live)
+    _live.freeze()
+    frozen_s = time_get_tick(_live)
+
+    idle_ticks = sum(sum(looping_song.patterns[name].table.idle) for name in looping_song.sequence)
+    song_ticks = sum(looping_song.patterns[name].length for name in looping_song.sequence)
+
+    tick_table_summary = (
+        f"Tick table: get_tick {build_s * 1e6:.1f} µs → {frozen_s * 1e6:.2f} µs on 64 channels; "
+        f"{idle_ticks}/{song_ticks} ticks of the endless demo skip straight to physics"
+    )
+
+    return tick_table_summary,
+
+
+@app.cell
+def measure_event_log(run_benchmarks, stop_unless_pressed, synthetic_pattern, looping_song, World,
+                      BehaviorInterpreter, SongPlayer, EventVerb, EventLog, time):
+    """Typed events vs formatted strings, on a message-heavy pattern."""
+    stop_unless_pressed(run_benchmarks)
+
+    def run_headless(make_world, rounds=5):
+        pattern = synthetic_pattern(seed=4)
+        pattern.freeze()
+        ticks = [pattern.get_tick(t) for t in range(pattern.length)]
+        best = float("inf")
+        for _ in range(rounds):
+            world = make_world()
+            interpreter = BehaviorInterpreter(world)
+            start = time.perf_counter()
+            for behaviors in ticks:
+                world.messages.clear()
+                interpreter.execute_tick(behaviors)
+            best = min(best, time.perf_counter() - start)
+        return best, world
+
+    def time_log(world, n=20_000):
+        start = time.perf_counter()
+        for k in range(n):
+            world.log(EventVerb.SAY, "ch7", text="ouch")
+        return (time.perf_counter() - start) / n
+
+    text_s, _ = run_headless(lambda: World(gravity=0.3))
+    typed_s, typed_world = run_headless(lambda: World(gravity=0.3, events=EventLog()))
+    format_ns = time_log(World()) * 1e9
+    emit_ns = time_log(World(events=EventLog(capacity=1024))) * 1e9
+
+    # Frames read the same text either way; it is just formatted later
+    deaths = []
+    log = EventLog(capacity=256)
+    log.subscribe(EventVerb.DIE, deaths.append)
+    typed_frames = SongPlayer(looping_song, World(gravity=0.3, events=log)).run_all(300)
+    text_frames = SongPlayer(looping_song, World(gravity=0.3)).run_all(300)
+    events_match = all(a.messages == b.messages for a, b in zip(typed_frames[-200:], text_frames[-200:]))
+
+    event_log_summary = (
+        f"Event log: {emit_ns:.0f} ns per event record vs {format_ns:.0f} ns per formatted message; "
+        f"64×64 message-heavy pattern {text_s * 1e3:.1f} → {typed_s * 1e3:.1f} ms headless "
+        f"({typed_world.events.head:,} events, none formatted); "
+        f"DIE subscriber saw {len(deaths)} deaths; frame text matches: {events_match}"
+    )
+
+    return event_log_summary,
+
+
+@app.cell
+def measure_renderer(run_benchmarks, stop_unless_pressed, synthetic_pattern, Song, World,
+                     SongPlayer, song_frames, AsciiRenderer, time, random):
+    """Diff rendering vs redrawing every frame from scratch."""
+    stop_unless_pressed(run_benchmarks)
+
+    # Slider-style random access must still produce exactly the full render
+    shuffled = random.Random(3).sample(song_frames, len(song_frames))
+    reused = AsciiRenderer()
+    renderer_matches = all(reused.render(f) == AsciiRenderer().render(f) for f in shuffled)
+
+    big = synthetic_pattern(ticks=64, channels=256, seed=6)
+    big_song = Song("big", {"big": big}, ["big"], loop_point=0)
+    big_frames = SongPlayer(big_song, World(width=160, height=50, gravity=0.1)).run_all(128)
+
+    def per_frame(render):
+        start = time.perf_counter()
+        for f in big_frames:
+            render(f)
+        return (time.perf_counter() - start) / len(big_frames)
+
+    fresh_s = per_frame(lambda f: AsciiRenderer(160, 50).render(f))
+    diff_s = per_frame(AsciiRenderer(160, 50).render)
+    terminal = AsciiRenderer(160, 50)
+    ansi_chars = sum(len(terminal.ansi(f)) for f in big_frames[1:]) / (len(big_frames) - 1)
+    full_chars = len(AsciiRenderer(160, 50).render(big_frames[-1]))
+
+    _entities = sum(len(f.entities) for f in big_frames) / len(big_frames)
+    renderer_summary = (
+        f"Renderer: 160×50 world with {_entities:.0f} entities a frame, {fresh_s * 1e6:.0f} µs "
+        f"from a fresh buffer vs {diff_s * 1e6:.0f} µs reusing one - reading the entities "
+        f"dominates, so the diff pays off in output: ANSI updates average "
+        f"{ansi_chars:.0f} chars vs {full_chars} for a full frame; "
+        f"out-of-order slider frames match full renders: {renderer_matches}"
+    )
+
+    return renderer_summary,
+
+
+@app.cell
+def measure_frame_archive(run_benchmarks, stop_unless_pressed, looping_song, World, SongPlayer,
+                          EventLog, FrameArchive, export_frames, time):
+    """Stream a long run to disk, then query it through the memory map."""
+    stop_unless_pressed(run_benchmarks)
+
+    import os as _os
+    import tempfile as _tempfile
+
+    archive_ticks = 20_000
+    archive_dir = _tempfile.mkdtemp()
+    archive_path = _os.path.join(archive_dir, "run.btarch")
+
+    _start = time.perf_counter()
+    _logged = World(gravity=0.3, events=EventLog())  # messages archived as typed events
+    export_frames(SongPlayer(looping_song, _logged).frames(archive_ticks), archive_path)
+    export_s = time.perf_counter() - _start
+
+    _straight = SongPlayer(looping_song, World(gravity=0.3)).run_all(300)
+    with FrameArchive(archive_path) as archive:
+        archive_matches = all(archive.frame(t) == _straight[t] for t in range(0, 300, 7))
+        _start = time.perf_counter()
+        path = archive.trajectory("player")
+        died = archive.deaths(0, 2000)
+        query_s = time.perf_counter() - _start
+        n_records, n_events = len(archive.records), len(archive.events)
+    size = _os.path.getsize(archive_path)
+    _os.remove(archive_path)
+    _os.rmdir(archive_dir)
+
+    frame_archive_summary = (
+        f"Frame archive: {archive_ticks:,} ticks ({n_records:,} entity records, "
+        f"{n_events:,} typed events) streamed to "
+        f"{size / 2**20:.1f} MiB in {export_s:.2f} s; the player's {len(path):,}-point trajectory "
+        f"plus {len(died)} deaths in ticks 0-2000 in {query_s * 1e3:.1f} ms via mmap; "
+        f"round-trips frames: {archive_matches}"
+    )
+
+    return frame_archive_summary,
+
+
+@app.cell
+def measure_instrumentation(run_benchmarks, stop_unless_pressed, synthetic_pattern, Song, World,
+                            SongPlayer, TickProfiler, time):
+    """Where tick time goes, and what profiling costs on and off."""
+    stop_unless_pressed(run_benchmarks)
+
+    profiled_song = Song("profiled", {"p": synthetic_pattern(seed=7)}, ["p"], loop_point=0)
+
+    def steps_per_s(setup, ticks=128, rounds=3):
+        best = float("inf")
+        for _ in range(rounds):
+            player = SongPlayer(profiled_song, World(gravity=0.3))
+            setup(player)
+            start = time.perf_counter()
+            for _ in range(ticks):
+                player.step()
+            best = min(best, time.perf_counter() - start)
+        return ticks / best
+
+    profiler = TickProfiler()
+    plain_rate = steps_per_s(lambda player: None)
+    detached_rate = steps_per_s(lambda player: TickProfiler().attach(player).detach())
+    profiled_rate = steps_per_s(lambda player: profiler.attach(player), rounds=1)
+
+    profile = profiler.report()
+    top_verb, top = next(iter(profile["verbs"].items()))
+    top_channel = next(iter(profile["channels"]))
+    instrumentation_summary = (
+        f"Profiler: {plain_rate:,.0f} ticks/s plain, {detached_rate:,.0f} after attach+detach, "
+        f"{profiled_rate:,.0f} while attached; {top_verb} dominates "
+        f"({top['ns'] / max(1, profile['execute_ns']):.0%} of execute time), "
+        f"costliest channel {top_channel}, capture {profile['capture_ns'] / max(1, profile['tick_ns'] + profile['capture_ns']):.0%} of tick work; "
+        f"{len(profiler.collapsed())} collapsed stacks"
+    )
+
+    return instrumentation_summary,
+
+
+@app.cell
+def measure_conditionals(run_benchmarks, stop_unless_pressed, synthetic_pattern, Song, Pattern,
+                         Channel, World, ArrayWorld, SongPlayer, SymbolTable, compile_pattern,
+                         BytecodeVM, when, if_flag, if_alive, if_near, every, time):
+    """Heavily branching songs vs the same songs with every guard removed."""
+    stop_unless_pressed(run_benchmarks)
+
+    guards = [every(2), if_flag("f1"), if_alive(), if_near("ch0", 12),
+              ~if_flag("f3") & every(3), if_alive("ch1") | if_flag("f2")]
+
+    def guarded(pattern):
+        """Every cell after the spawn row gets a guard, cycling through guards."""
+        chans = []
+        for c, ch in enumerate(pattern.channels):
+            rows = [ch.rows[0]] + [when(guards[(c + t) % len(guards)], b)
+                                   for t, b in enumerate(ch.rows[1:])]
+            chans.append(Channel(ch.name, ch.entity_type, rows))
+        return Pattern(pattern.name, pattern.length, chans)
+
+    def evaluate(cond, world, entity):
+        """The uncompiled alternative: walk the Condition tree every time."""
+        kind, args = cond.kind, cond.args
+        if kind == "flag":
+            return args[0] in world.flags
+        if kind == "alive":
+            e = world.get_entity(args[0] or entity)
+            return e is not None and bool(e.alive)
+        if kind == "near":
+            return world.distance(entity, args[0]) <= args[1]
+        if kind == "every":
+            return world.tick % args[0] == args[1]
+        if kind == "all":
+            return all(evaluate(c, world, entity) for c in args)
+        if kind == "any":
+            return any(evaluate(c, world, entity) for c in args)
+        return not evaluate(args[0], world, entity)
+
+    def timed(song, rounds=3, ticks=256, walk_guards=False):
+        best = float("inf")
+        for _ in range(rounds):
+            player = SongPlayer(song, World(gravity=0.3))
+            pattern = song.patterns[song.sequence[0]]
+            start = time.perf_counter()
+            for _ in range(ticks):
+                if walk_guards:
+                    world, _t = player.world, player.position.tick
+                    behaviors = {n: b for n, b in pattern.get_tick(_t).items()
+                                 if b.guard is None or evaluate(b.guard, world, n)}
+                    player.interpreter.execute_tick(behaviors)
+                    player.position.tick = (_t + 1) % pattern.length
+                else:
+                    player.advance(pattern)
+            best = min(best, time.perf_counter() - start)
+        return best / ticks
+
+    plain = synthetic_pattern(seed=8)
+    branching = guarded(plain)
+    plain_s = timed(Song("plain", {"p": plain}, ["p"], 0))
+    branching_song = Song("branching", {"p": branching}, ["p"], 0)
+    compiled_s = timed(branching_song)
+    walked_s = timed(branching_song, walk_guards=True)
+    guarded_cells = sum(len(g) for g in branching.table.guards)
+
+    # The bytecode VM must honour guards exactly like the interpreter
+    _interp_world = ArrayWorld(gravity=0.3)
+    interp = SongPlayer(branching_song, _interp_world)
+    for _ in range(branching.length):
+        interp.advance(branching)
+    symbols = SymbolTable()
+    program = compile_pattern(branching, symbols)
+    _vm_world = ArrayWorld(gravity=0.3)
+    vm = BytecodeVM(_vm_world, symbols)
+    for _t in range(program.length):
+        vm.execute_tick(program, _t)
+    _n = _interp_world.table.size
+    guards_match = (
+        _interp_world.table.names == _vm_world.table.names
+        and sorted(_interp_world.flags) == sorted(_vm_world.flags)
+        and all((getattr(_interp_world.table, c)[:_n] == getattr(_vm_world.table, c)[:_n]).all()
+                for c in ("x", "y", "vx", "vy", "alive"))
+    )
+
+    conditional_summary = (
+        f"Conditionals: 64×64 pattern with {guarded_cells:,} guarded cells runs "
+        f"{compiled_s * 1e3:.2f} ms/tick vs {plain_s * 1e3:.2f} ms with no guards "
+        f"({walked_s * 1e3:.2f} walking condition trees each tick); "
+        f"bytecode VM honours guards like the interpreter: {guards_match}"
+    )
+
+    return conditional_summary,
+
+
+@app.cell
+def measure_realtime(run_benchmarks, stop_unless_pressed, looping_song, World, SongPlayer,
+                     RealtimeClock, AsciiRenderer, time, asyncio):
+    """Real-time playback with a quick and a too-slow renderer."""
+    stop_unless_pressed(run_benchmarks)
+
+    def slow_render(frame):
+        time.sleep(0.03)  # a renderer that manages ~33 fps
+
+    async def play(render, tps=120, ticks=240):
+        clock = RealtimeClock(SongPlayer(looping_song, World(gravity=0.3)), tps, render)
+        return await clock.run(ticks)
+
+    quick = asyncio.run(play(AsciiRenderer().render))
+    slow = asyncio.run(play(slow_render))
+
+    realtime_summary = (
+        f"Real-time clock: {quick.ticks} ticks at 120 ticks/s, drift {quick.drift_ms:+.1f} ms, "
+        f"mean lateness {quick.mean_lateness_ms:.2f} ms (p99 {quick.p99_ms:.2f}, "
+        f"jitter {quick.jitter_ms:.2f} ms between ticks), "
+        f"{quick.rendered} frames rendered; with a 30 ms renderer the simulation still "
+        f"drifted {slow.drift_ms:+.1f} ms and {slow.late_ticks} ticks ran late while "
+        f"{slow.rendered} frames were drawn"
+    )
+
+    return realtime_summary,
+
+
+@app.cell
+def verify_timeline(looping_song, Song, World, SongPlayer, SongTimeline, time):
+    """The compiled timeline must agree with the player's own stepping."""
+
+    timeline_player = SongPlayer(looping_song, World(gravity=0.3))
+    timeline_matches = all(
+        timeline_player.position_at(f.position.total_tick) == f.position
+        for f in timeline_player.frames(500)
+    )
+
+    # A long arrangement: 100k sequence entries cycling the demo patterns
+    long_song = Song("long", looping_song.patterns,
+                     [n for _ in range(25_000) for n in ("intro", "action", "victory", "idle")],
+                     loop_point=4)
+    _start = time.perf_counter()
+    long_timeline = SongTimeline(long_song)
+    _compile_s = time.perf_counter() - _start
+    _start = time.perf_counter()
+    for _t in range(0, 10**9, 10**5):
+        long_timeline.locate(_t)
+    locate_s = (time.perf_counter() - _start) / 10**4
+
+    timeline_summary = (
+        f"Timeline: {len(long_song.sequence):,}-entry arrangement "
+        f"({long_timeline.length:,} ticks/pass) compiled in {_compile_s * 1e3:.0f} ms, "
+        f"tick → (pattern, row) in {locate_s * 1e6:.1f} µs; agrees with playback: {timeline_matches}"
+    )
+
+    return timeline_summary,
+
+
+@app.cell
+def verify_cycles(looping_song, World, ArrayWorld, SongPlayer, time):
+    """Fast-forwarding a looping song must land where full playback does."""
+
+    def played(world_cls, ticks):
+        player = SongPlayer(looping_song, world_cls(gravity=0.3))
+        while player.position.total_tick < ticks:
+            player.advance(player.current_pattern())
+        return player
+
+    cycles_match = True
+    for world_cls in (World, ArrayWorld):
+        for ticks in (300, 1001):
+            skipper = SongPlayer(looping_song, world_cls(gravity=0.3))
+            skipper.fast_forward(ticks)
+            full = played(world_cls, ticks)
+            cycles_match &= (skipper.position == full.position
+                             and skipper.world.tick == full.world.tick
+                             and skipper.world.state_key() == full.world.state_key())
+
+    soak_ticks = 10**9
+    _start = time.perf_counter()
+    soak_cycle = SongPlayer(looping_song, World(gravity=0.3)).fast_forward(soak_ticks)
+    soak_s = time.perf_counter() - _start
+
+    cycle_summary = (
+        f"Cycles: endless song has a {soak_cycle}; {soak_ticks:,}-tick soak "
+        f"finished in {soak_s * 1e3:.1f} ms ({soak_cycle.skipped:,} ticks skipped); "
+        f"fast-forward matches playback: {cycles_match}"
+    )
+
+    return cycle_summary,
+
+
+@app.cell
+def define_renderer(Tuple, Iterable, sys, time):
+    """ASCII rendering for pattern and song frames, redrawing only what changed."""
+    from typing import Dict, List, Optional, TextIO
+
+    class AsciiRenderer:
+        """A reusable width × height character buffer.
+
+        draw() works out which cells differ from the last frame drawn and
+        touches only those, re-joining only rows that changed. ansi() turns
+        the same diff into cursor moves, so live terminal playback sends a
+        few hundred characters a frame instead of the whole screen. Reading
+        the frame's entities dominates the CPU cost either way.
+        """
+
+        symbols = {"player": "P", "enemy": "E", "item": "◆", "bullet": "→", "world": " "}
+
+        def __init__(self, width: int = 32, height: int = 16):
+            self.width, self.height = width, height
+            self.background = [['·'] * width for _ in range(height - 1)] + [['▀'] * width]
+            self.grid = [row[:] for row in self.background]
+            self.lines = ["".join(row) for row in self.grid]
+            self.drawn: Dict[int, str] = {}  # y * width + x → symbol shown there
+            self.speech = ""
+            self.on_screen = False  # has ansi() painted the whole screen yet
+
+        def draw(self, frame) -> List[Tuple[int, int, str]]:
+            """Bring the buffer up to frame; returns the (x, y, char) cells changed."""
+            w, h = self.width, self.height
+            symbols = self.symbols
+            cells: Dict[int, str] = {}
+            speeches = []
+            for name, e in frame.entities.items():
+                if e["alive"]:
+                    x, y = int(e["x"]), int(e["y"])
+                    if 0 <= x < w and 0 <= y < h:
+                        cells[y * w + x] = symbols.get(e["type"], "?")
+                        if e["speech"]:
+                            speeches.append(f'{name}: "{e["speech"]}"')
+
+            changes = []
+            for k in self.drawn.keys() - cells.keys():
+                y, x = divmod(k, w)
+                changes.append((x, y, self.background[y][x]))
+            drawn = self.drawn
+            for k, sym in cells.items():
+                if drawn.get(k) != sym:
+                    y, x = divmod(k, w)
+                    changes.append((x, y, sym))
+            for x, y, ch in changes:
+                self.grid[y][x] = ch
+            for y in {y for _, y, _ in changes}:
+                self.lines[y] = "".join(self.grid[y])
+            self.drawn = cells
+            self.speech = " | ".join(speeches)
+            return changes
+
+        def render(self, frame) -> str:
+            """The frame as text: the grid, then a line of speech if anyone talks."""
+            self.draw(frame)
+            text = "\n".join(self.lines)
+            return f"{text}\n{self.speech}" if self.speech else text
+
+        def ansi(self, frame) -> str:
+            """Escape codes turning the terminal's previous frame into this one."""
+            speech = self.speech
+            changes = self.draw(frame)
+            status = f"\x1b[{self.height + 1};1H\x1b[K{self.speech}"
+            if not self.on_screen:
+                self.on_screen = True
+                return "\x1b[2J\x1b[H" + "\r\n".join(self.lines) + status
+            out = "".join(f"\x1b[{y + 1};{x + 1}H{ch}" for x, y, ch in changes)
+            return out + status if self.speech != speech else out
+
+        def play(self, frames: Iterable, fps: float = 60.0,
+                 out: Optional[TextIO] = None) -> Dict[str, float]:
+            """Stream frames to a terminal at fps, sending only the changes."""
+            out = out or sys.stdout
+            period = 1.0 / fps
+            self.on_screen = False
+            sent = count = 0
+            out.write("\x1b[?25l")  # hide the cursor
+            start = deadline = time.perf_counter()
+            try:
+                for frame in frames:
+                    chunk = self.ansi(frame)
+                    out.write(chunk)
+                    out.flush()
+                    sent += len(chunk)
+                    count += 1
+                    deadline += period
+                    pause = deadline - time.perf_counter()
+                    if pause > 0:
+                        time.sleep(pause)
+            finally:
+                out.write(f"\x1b[{self.height + 2};1H\x1b[?25h")
+            elapsed = time.perf_counter() - start
+            return {"frames": count, "seconds": elapsed, "chars": sent,
+                    "fps": count / elapsed if elapsed else 0.0}
+
+    _renderers: Dict[Tuple[int, int], AsciiRenderer] = {}
+
+    def render_frame(frame, width=32, height=16) -> str:
+        """Render a pattern or song frame, reusing one buffer per size."""
+        renderer = _renderers.get((width, height))
+        if renderer is None:
+            renderer = _renderers[(width, height)] = AsciiRenderer(width, height)
+        return renderer.render(frame)
+
+    return AsciiRenderer, render_frame
 
 
 @app.cell
@@ -632,7 +3956,7 @@ def display_tracker_view(demo, nop):
 
 
 @app.cell
-def display_song_structure(demo_song):
+def display_song_structure(demo_song, SongTimeline):
     """Show the song structure."""
     import marimo as mo
 
@@ -643,7 +3967,7 @@ def display_song_structure(demo_song):
 
     sequence_md = " → ".join(f"`{p}`" for p in demo_song.sequence)
 
-    total_ticks = sum(demo_song.patterns[p].length for p in demo_song.sequence)
+    total_ticks = SongTimeline(demo_song).length
 
     song_structure = mo.md(f"""
 ## Song: {demo_song.name}
@@ -662,49 +3986,13 @@ def display_song_structure(demo_song):
 
 
 @app.cell
-def render_song_frames(song_frames):
-    """Render song frames for playback."""
-
-    def render_song_frame(frame, width=32, height=16):
-        grid = [['·' for _ in range(width)] for _ in range(height)]
-        for x in range(width):
-            grid[height-1][x] = '▀'
-
-        symbols = {"player": "P", "enemy": "E", "item": "◆", "bullet": "→"}
-        speeches = []
-
-        for name, e in frame.entities.items():
-            if not e["alive"]:
-                continue
-            x, y = int(e["x"]), int(e["y"])
-            if 0 <= x < width and 0 <= y < height:
-                grid[y][x] = symbols.get(e["type"], "?")
-                if e.get("speech"):
-                    speeches.append(f'{name}: "{e["speech"]}"')
-
-        lines = ["".join(row) for row in grid]
-        result = "\n".join(lines)
-        if speeches:
-            result += "\n" + " | ".join(speeches)
-        return result
-
-    rendered_song = [
-        (f.position.total_tick, f.pattern_name, f.position.tick,
-         render_song_frame(f), f.messages)
-        for f in song_frames
-    ]
-
-    return render_song_frame, rendered_song
-
-
-@app.cell
-def create_song_playback_ui(rendered_song):
+def create_song_playback_ui(song_frames):
     """Create song playback slider."""
     import marimo as mo
 
     song_slider = mo.ui.slider(
         start=0,
-        stop=len(rendered_song) - 1,
+        stop=len(song_frames) - 1,
         value=0,
         label="Song Position",
         show_value=True
@@ -714,12 +4002,14 @@ def create_song_playback_ui(rendered_song):
 
 
 @app.cell
-def display_song_frame(song_slider, rendered_song):
-    """Display song frame with pattern info."""
+def display_song_frame(song_slider, song_frames, render_frame):
+    """Display song frame with pattern info, rendered when the slider lands on it."""
     import marimo as mo
 
-    idx = song_slider.value
-    total_tick, pattern_name, pattern_tick, art, messages = rendered_song[idx]
+    frame = song_frames[song_slider.value]
+    total_tick, pattern_name, pattern_tick = (
+        frame.position.total_tick, frame.pattern_name, frame.position.tick)
+    art, messages = render_frame(frame), frame.messages
 
     messages_md = "\n".join(f"- {m}" for m in messages) if messages else "*no events*"
 
@@ -740,13 +4030,13 @@ def display_song_frame(song_slider, rendered_song):
 
 
 @app.cell
-def create_playback_ui(rendered_frames):
+def create_playback_ui(frames):
     """Create interactive playback."""
     import marimo as mo
 
     tick_slider = mo.ui.slider(
         start=0,
-        stop=len(rendered_frames) - 1,
+        stop=len(frames) - 1,
         value=0,
         label="Tick",
         show_value=True
@@ -756,12 +4046,12 @@ def create_playback_ui(rendered_frames):
 
 
 @app.cell
-def display_frame(tick_slider, rendered_frames):
+def display_frame(tick_slider, frames, render_frame):
     """Display the current frame."""
     import marimo as mo
 
     tick = tick_slider.value
-    _, frame_art, messages = rendered_frames[tick]
+    frame_art, messages = render_frame(frames[tick]), frames[tick].messages
 
     messages_md = "\n".join(f"- {m}" for m in messages) if messages else "*no events*"
 
@@ -780,7 +4070,7 @@ def display_frame(tick_slider, rendered_frames):
 
 
 @app.cell
-def display_all(tracker_output, song_structure, song_slider, song_frame_output):
+def display_all(tracker_output, song_structure, song_slider, song_frame_output, run_benchmarks):
     """Combine all displays - now featuring song mode!"""
     import marimo as mo
 
@@ -812,16 +4102,47 @@ but for entity actions.
             mo.vstack([song_structure, tracker_output]),
             mo.vstack([song_controls, song_frame_output])
         ], justify="start"),
+        run_benchmarks,
     ])
 
     return layout,
 
 
 @app.cell
-def reflection_layer(demo_song, song_frames):
+def benchmark_layer(bytecode_summary, frame_store_summary, sweep_summary,
+                    collision_summary, streaming_summary, seek_summary, pattern_memory_summary,
+                    churn_summary, tick_table_summary, event_log_summary, world_batch_summary,
+                    renderer_summary, frame_archive_summary, instrumentation_summary,
+                    conditional_summary, realtime_summary):
+    """What the measurements found - filled in once Run benchmarks is pressed."""
+    benchmark_findings = [
+        bytecode_summary,
+        frame_store_summary,
+        sweep_summary,
+        collision_summary,
+        streaming_summary,
+        seek_summary,
+        pattern_memory_summary,
+        churn_summary,
+        tick_table_summary,
+        event_log_summary,
+        world_batch_summary,
+        renderer_summary,
+        frame_archive_summary,
+        instrumentation_summary,
+        conditional_summary,
+        realtime_summary,
+    ]
+
+    return benchmark_findings,
+
+
+@app.cell
+def reflection_layer(demo_song, SongTimeline, song_frames, soa_frames_match,
+                     timeline_summary, cycle_summary):
     """What did we learn from building this?"""
 
-    total_ticks = sum(demo_song.patterns[p].length for p in demo_song.sequence)
+    total_ticks = SongTimeline(demo_song).length
 
     findings = [
         f"Song '{demo_song.name}' chains {len(demo_song.sequence)} patterns",
@@ -829,6 +4150,9 @@ def reflection_layer(demo_song, song_frames):
         f"Patterns are reusable: defined {len(demo_song.patterns)} patterns",
         f"Song produced {len(song_frames)} frames of continuous playback",
         "Pattern transitions are seamless - entities persist across patterns",
+        f"Array-backed entity table matches dataclass frames: {soa_frames_match}",
+        timeline_summary,
+        cycle_summary,
     ]
 
     insights = [
@@ -842,7 +4166,7 @@ def reflection_layer(demo_song, song_frames):
     next_steps = [
         "Build visual editor with drag-drop behaviors",
         "Try making a real mini-game using only tracker patterns",
-        "Add conditional behaviors (if flag set, do X)",
+        "Let conditions read entity flags and speech, not just world state",
         "Export to actual game engine (Godot, Pygame)",
     ]
 
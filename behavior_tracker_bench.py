@@ -0,0 +1,289 @@
+"""Benchmark suite for the behavior_tracker engine.
+
+Generates synthetic songs (channels, pattern length, verb mix, entity churn)
+and measures SongPlayer.step throughput, per-verb cost, frame-capture cost
+and render cost. Every run is appended to a JSON history file and compared
+with the previous run, so regressions between engine changes show up.
+
+Runs headless: the engine cells are lifted out of behavior_tracker.py with
+ast, so marimo does not need to be installed.
+
+Run: python behavior_tracker_bench.py --channels 64 --length 64
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import datetime
+import inspect
+import json
+import random
+import subprocess
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+NOTEBOOK = Path(__file__).parent / "behavior_tracker.py"
+HISTORY = Path(__file__).parent / ".bench" / "behavior_tracker.json"  # gitignored
+
+ENGINE_CELLS = [
+    "shared_imports",
+    "define_vocabulary",
+    "define_pattern_structure",
+    "define_events",
+    "define_spatial_index",
+    "define_world",
+    "define_entity_table",
+    "define_interpreter",
+    "define_bytecode",
+    "define_timeline",
+    "define_song_player",
+    "define_renderer",
+]
+
+DEFAULT_MIX = {
+    "nop": 6, "move": 4, "jump": 1, "chase": 2, "flee": 1,
+    "shoot": 1, "say": 1, "flag": 1, "wait": 1,
+}
+
+
+def load_cells(path: Path, names: Iterable[str], provided: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Run the named @app.cell functions of a notebook without marimo.
+
+    Each cell is compiled on its own, called with the definitions earlier
+    cells returned (matched by parameter name, like marimo does), and its
+    return tuple is bound to the names in its final return statement.
+    """
+    tree = ast.parse(path.read_text())
+    cells = {node.name: node for node in tree.body if isinstance(node, ast.FunctionDef)}
+    defs: Dict[str, Any] = dict(provided or {})
+    for name in names:
+        node = cells[name]
+        node.decorator_list = []
+        namespace: Dict[str, Any] = {"__file__": str(path)}
+        exec(compile(ast.Module(body=[node], type_ignores=[]), str(path), "exec"), namespace)
+        fn = namespace[name]
+        result = fn(*[defs[p] for p in inspect.signature(fn).parameters])
+        returned = node.body[-1].value
+        targets = returned.elts if isinstance(returned, ast.Tuple) else [returned]
+        values = result if isinstance(returned, ast.Tuple) else (result,)
+        for target, value in zip(targets, values):
+            defs[target.id] = value
+    return defs
+
+
+def synthetic_song(engine: Dict[str, Any], channels: int, length: int, patterns: int,
+                   mix: Dict[str, int], churn: float, seed: int = 0):
+    """A looping song of random patterns.
+
+    churn is the chance that a row kills its entity and the next row
+    respawns it, so entities keep being created and destroyed.
+    """
+    rng = random.Random(seed)
+    makers: Dict[str, Callable[[], Any]] = {
+        "nop": engine["nop"],
+        "wait": engine["wait"],
+        "move": lambda: engine["move"](rng.choice((-1, 0, 1)), rng.choice((-1, 0, 1))),
+        "jump": lambda: engine["jump"](rng.randint(1, 4)),
+        "chase": lambda: engine["chase"](f"ch{rng.randrange(channels)}"),
+        "flee": lambda: engine["flee"](f"ch{rng.randrange(channels)}"),
+        "shoot": lambda: engine["shoot"](rng.choice((-1, 1)), 0),
+        "say": lambda: engine["say"](rng.choice(("hey", "ouch", "..."))),
+        "flag": lambda: engine["flag"](f"f{rng.randrange(4)}"),
+    }
+    verbs, weights = zip(*mix.items())
+
+    def spawn_here():
+        return engine["spawn"](rng.randint(0, 31), rng.randint(0, 15))
+
+    song_patterns = {}
+    for p in range(patterns):
+        chans = []
+        for c in range(channels):
+            rows = [spawn_here()]
+            while len(rows) < length:
+                if rng.random() < churn and len(rows) < length - 1:
+                    rows += [engine["die"](), spawn_here()]
+                else:
+                    rows.append(makers[rng.choices(verbs, weights)[0]]())
+            chans.append(engine["Channel"](f"ch{c}", "enemy", rows[:length]))
+        song_patterns[f"p{p}"] = engine["Pattern"](f"p{p}", length, chans)
+    return engine["Song"]("synthetic", song_patterns, list(song_patterns), 0)
+
+
+def measure_step(engine: Dict[str, Any], song, world_cls, ticks: int,
+                 repeat: int = 3) -> Dict[str, float]:
+    """Ticks/second for step(), and how much of a tick is frame capture.
+
+    step() is timed as the best of repeat runs on fresh players. Capture
+    and advance are then timed apart, tick by tick, in one more run, so
+    the capture cost is measured rather than taken as the difference of
+    two noisy totals.
+    """
+    step_s = float("inf")
+    for _ in range(repeat):
+        player = engine["SongPlayer"](song, world_cls(gravity=0.3))
+        start = time.perf_counter()
+        for _ in range(ticks):
+            player.step()
+        step_s = min(step_s, time.perf_counter() - start)
+
+    player = engine["SongPlayer"](song, world_cls(gravity=0.3))
+    clock = time.perf_counter
+    capture_s = advance_s = 0.0
+    for _ in range(ticks):
+        pattern = player.current_pattern()
+        start = clock()
+        player.capture(pattern)
+        captured = clock()
+        player.advance(pattern)
+        advance_s += clock() - captured
+        capture_s += captured - start
+
+    return {
+        "ticks_per_s": ticks / step_s,
+        "us_per_tick": step_s / ticks * 1e6,
+        "capture_us_per_tick": capture_s / ticks * 1e6,
+        "capture_share": capture_s / (capture_s + advance_s),
+        "entities": len(player.world.entity_states()),
+    }
+
+
+def measure_verbs(engine: Dict[str, Any], channels: int, length: int,
+                  repeat: int = 5) -> Dict[str, float]:
+    """Cost of one execute() call per verb, net of a NOP-only baseline.
+
+    Entities are spawned and snapshotted outside the timing; each of the
+    repeat runs restores the snapshot and times only the execute() calls,
+    and the best run counts. The world's tick follows the pattern row, as
+    in playback, so verbs that name new entities are not charged for a
+    pile-up of names within one tick. Differences are reported as
+    measured, so a verb cheaper than NOP comes out negative rather than
+    zero.
+    """
+
+    def per_cell(verb: str) -> float:
+        song = synthetic_song(engine, channels, length, 1, {verb: 1}, churn=0.0, seed=1)
+        pattern = song.patterns["p0"]
+        world = engine["World"](gravity=0.3)
+        interpreter = engine["BehaviorInterpreter"](world)
+        interpreter.execute_tick(pattern.get_tick(0))
+        rows = [(t, list(pattern.get_tick(t).items())) for t in range(1, pattern.length)]
+        calls = sum(len(items) for _, items in rows)
+        snapshot = world.snapshot()
+        execute = interpreter.execute
+        best = float("inf")
+        for _ in range(repeat):
+            world.restore(snapshot)
+            start = time.perf_counter()
+            for t, items in rows:
+                world.tick = t
+                for name, behavior in items:
+                    execute(name, behavior)
+            best = min(best, time.perf_counter() - start)
+        return best / calls
+
+    baseline = per_cell("nop")
+    costs = {"nop": baseline * 1e9}
+    for verb in DEFAULT_MIX:
+        if verb != "nop":
+            costs[verb] = (per_cell(verb) - baseline) * 1e9
+    return costs  # ns per call
+
+
+def measure_render(engine: Dict[str, Any], song, ticks: int) -> Dict[str, float]:
+    frames = engine["SongPlayer"](song, engine["World"](gravity=0.3)).run_all(ticks)
+    renderer = engine["AsciiRenderer"]()
+    start = time.perf_counter()
+    for frame in frames:
+        renderer.render(frame)
+    render_s = time.perf_counter() - start
+    renderer = engine["AsciiRenderer"]()
+    start = time.perf_counter()
+    chars = sum(len(renderer.ansi(frame)) for frame in frames)
+    return {
+        "us_per_frame": render_s / len(frames) * 1e6,
+        "ansi_us_per_frame": (time.perf_counter() - start) / len(frames) * 1e6,
+        "ansi_chars_per_frame": chars / len(frames),
+    }
+
+
+def run_suite(args: argparse.Namespace) -> Dict[str, Any]:
+    engine = load_cells(NOTEBOOK, ENGINE_CELLS)
+    mix = dict(DEFAULT_MIX)
+    for item in filter(None, args.verbs.split(",")):
+        verb, weight = item.split("=")
+        mix[verb.strip()] = int(weight)
+    song = synthetic_song(engine, args.channels, args.length, args.patterns, mix, args.churn)
+
+    return {
+        "step": measure_step(engine, song, engine["World"], args.ticks),
+        "step_array_world": measure_step(engine, song, engine["ArrayWorld"], args.ticks),
+        "verb_ns": measure_verbs(engine, min(args.channels, 32), min(args.length, 32)),
+        "render": measure_render(engine, song, min(args.ticks, 200)),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=NOTEBOOK.parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """Lines describing how each metric moved since the previous run."""
+    before, after = flatten(previous["results"]), flatten(current["results"])
+    lines = []
+    for key, value in after.items():
+        old = before.get(key)
+        if not old:
+            continue
+        change = (value - old) / old * 100
+        lines.append(f"  {key:40} {old:12.2f} → {value:12.2f}  ({change:+.1f}%)")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--channels", type=int, default=32)
+    parser.add_argument("--length", type=int, default=64, help="ticks per pattern")
+    parser.add_argument("--patterns", type=int, default=4)
+    parser.add_argument("--ticks", type=int, default=1000, help="ticks to time per run")
+    parser.add_argument("--churn", type=float, default=0.05, help="die+respawn chance per row")
+    parser.add_argument("--verbs", default="", help="verb mix overrides, e.g. move=5,shoot=0")
+    parser.add_argument("--history", type=Path, default=HISTORY)
+    args = parser.parse_args()
+
+    record = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "revision": git_revision(),
+        "config": {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()},
+        "results": run_suite(args),
+    }
+
+    history = json.loads(args.history.read_text()) if args.history.exists() else []
+    same_config = [r for r in history if r["config"] == record["config"]]
+    history.append(record)
+    args.history.parent.mkdir(parents=True, exist_ok=True)
+    args.history.write_text(json.dumps(history, indent=2))
+
+    print(json.dumps(record["results"], indent=2))
+    if same_config:
+        print(f"\nSince {same_config[-1]['revision']} ({same_config[-1]['timestamp']}):")
+        print("\n".join(compare(same_config[-1], record)))
+
+
+if __name__ == "__main__":
+    main()
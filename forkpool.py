@@ -0,0 +1,73 @@
+"""A process pool for notebook closures: fork once, stream chunks of work.
+
+multiprocessing.Pool pickles the function it runs, which rules out the
+closures and lambdas marimo cells are made of. Forked workers inherit them
+instead, so only (index, item) chunks and results cross process lines.
+behavior_tracker's parameter sweeps and protracker_deep_dive's corpus
+scans both run on fork_map.
+"""
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+import traceback
+from typing import Any, Callable, List, Optional, Sequence
+
+
+def fork_map(fn: Callable[[Any], Any], items: Sequence, workers: Optional[int] = None,
+             chunksize: int = 16,
+             on_result: Optional[Callable[[int, Any], None]] = None) -> List[Any]:
+    """[fn(item) for item in items], computed by forked workers.
+
+    Workers are forked once and pull chunks of items off a queue. on_result
+    is called in the parent as each result arrives; the returned list is in
+    item order. Without fork, with workers=1 or with a single chunk,
+    everything runs in-process. A worker's exception is raised in the
+    parent as RuntimeError carrying the worker's traceback.
+    """
+    workers = workers or os.cpu_count() or 1
+    indexed = list(enumerate(items))
+    chunks = [indexed[i:i + chunksize] for i in range(0, len(indexed), chunksize)]
+    results: List[Any] = [None] * len(indexed)
+
+    def deliver(i, result):
+        results[i] = result
+        if on_result:
+            on_result(i, result)
+
+    if workers == 1 or len(chunks) <= 1 or "fork" not in mp.get_all_start_methods():
+        for i, item in indexed:
+            deliver(i, fn(item))
+        return results
+
+    ctx = mp.get_context("fork")
+    tasks, done = ctx.Queue(), ctx.Queue()
+
+    def worker():
+        for chunk in iter(tasks.get, None):
+            try:
+                done.put([(i, fn(item)) for i, item in chunk])
+            except Exception:  # surface the worker's traceback in the parent
+                done.put(traceback.format_exc())
+
+    procs = [ctx.Process(target=worker, daemon=True) for _ in range(min(workers, len(chunks)))]
+    for p in procs:
+        p.start()
+    for chunk in chunks:
+        tasks.put(chunk)
+    for _ in procs:
+        tasks.put(None)
+
+    try:
+        for _ in chunks:
+            batch = done.get()
+            if isinstance(batch, str):
+                raise RuntimeError(f"worker failed:\n{batch}")
+            for i, result in batch:
+                deliver(i, result)
+    finally:
+        for p in procs:
+            p.join(timeout=1)
+            if p.is_alive():
+                p.terminate()
+    return results
@@ -0,0 +1,243 @@
+"""ProTracker MOD files: a zero-copy reader, a writer and a generated demo.
+
+Pattern cells become (pattern, row, channel) arrays and sample data stays
+a view of the file buffer, so a module costs little more than its bytes.
+tracker_as_dsl plays modules read here, and protracker_deep_dive's corpus
+analyzer scans whole directories of them with the same reader.
+"""
+from __future__ import annotations
+
+import mmap
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+NOTE_NAMES = ["C-", "C#", "D-", "D#", "E-", "F-", "F#", "G-", "G#", "A-", "A#", "B-"]
+# ProTracker periods for C-1..B-3 at finetune 0
+PERIODS = np.array([
+    856, 808, 762, 720, 678, 640, 604, 570, 538, 508, 480, 453,
+    428, 404, 381, 360, 339, 320, 302, 285, 269, 254, 240, 226,
+    214, 202, 190, 180, 170, 160, 151, 143, 135, 127, 120, 113,
+], dtype=np.uint16)
+
+# period → note number (1 = C-1 … 36 = B-3, 0 = no note), nearest match
+# so finetuned periods still land on their note
+_MID = (PERIODS[:-1].astype(np.int32) + PERIODS[1:]) // 2
+PERIOD_TO_NOTE = np.zeros(4096, dtype=np.uint8)
+PERIOD_TO_NOTE[1:] = 1 + np.searchsorted(-_MID, -np.arange(1, 4096), side="left")
+
+SAMPLE_HEADER = np.dtype([
+    ("name", "S22"), ("length", ">u2"), ("finetune", "u1"), ("volume", "u1"),
+    ("loop_start", ">u2"), ("loop_length", ">u2"),
+])
+FOUR_CHANNEL_TAGS = {b"M.K.", b"M!K!", b"FLT4", b"4CHN"}
+
+# How each effect's parameter byte reads: one value (xx) or two nibbles (xy)
+EFFECT_NOTATION = ["0xy", "1xx", "2xx", "3xx", "4xy", "5xy", "6xy", "7xy",
+                   "8xx", "9xx", "Axy", "Bxx", "Cxx", "Dxx", "Exy", "Fxx"]
+
+
+def note_name(note: int) -> Optional[str]:
+    if not note:
+        return None
+    octave, semitone = divmod(note - 1, 12)
+    return f"{NOTE_NAMES[semitone]}{octave + 1}"
+
+
+@dataclass
+class ModSample:
+    """One instrument; data is an int8 view into the module's buffer."""
+    name: str
+    data: np.ndarray
+    finetune: int      # -8..7
+    volume: int        # 0..64
+    loop_start: int    # bytes
+    loop_length: int   # bytes; <= 2 means no loop
+
+    @property
+    def looped(self) -> bool:
+        return self.loop_length > 2
+
+
+@dataclass
+class ModFile:
+    """A parsed 31-sample module.
+
+    Pattern cells are split into (pattern, row, channel) uint8/uint16
+    arrays. They and every sample's data are views of buffer (bytes
+    or an mmap), which therefore stays referenced here.
+    """
+    title: str
+    tag: bytes
+    samples: List[ModSample]
+    order: np.ndarray          # pattern number per song position
+    restart: int
+    periods: np.ndarray        # (patterns, 64, channels) uint16
+    notes: np.ndarray          # note number, 0 = none
+    instruments: np.ndarray    # 1..31, 0 = none
+    effects: np.ndarray        # 0x0..0xF
+    params: np.ndarray
+    buffer: object = field(repr=False, default=None)
+
+    @property
+    def channels(self) -> int:
+        return self.periods.shape[2]
+
+    def rows(self, pattern: int, channel: int, row: Optional[Callable] = None) -> list:
+        """One channel of one pattern as (note, instrument, effect, param) tuples.
+
+        note is a name like "C-2"; instrument and effect are None when
+        empty. With row, each cell is passed as row(*cell) instead - give
+        tracker_as_dsl's TrackerRow to feed TrackerInterpreter.
+        """
+        rows = []
+        for n, i, e, p in zip(self.notes[pattern, :, channel], self.instruments[pattern, :, channel],
+                              self.effects[pattern, :, channel], self.params[pattern, :, channel]):
+            effect = f"{e:X}" if e or p else None
+            cell = (note_name(int(n)), int(i) or None, effect, int(p))
+            rows.append(row(*cell) if row else cell)
+        return rows
+
+
+def parse_mod(buffer) -> ModFile:
+    """Parse a module held in any buffer (bytes, memoryview, mmap) without copying."""
+    size = len(buffer)
+    if size < 1084:
+        raise ValueError(f"{size} bytes is too short for a 31-sample MOD")
+    tag = bytes(buffer[1080:1084])
+    if tag in FOUR_CHANNEL_TAGS:
+        channels = 4
+    elif tag[1:] == b"CHN" and tag[:1].isdigit():
+        channels = int(tag[:1])
+    elif tag[2:] == b"CH" and tag[:2].isdigit():
+        channels = int(tag[:2])
+    else:
+        raise ValueError(f"unknown MOD tag {tag!r} (15-sample modules are not supported)")
+    if channels < 1:
+        raise ValueError(f"MOD tag {tag!r} declares no channels")
+
+    headers = np.frombuffer(buffer, SAMPLE_HEADER, 31, 20)
+    song_length = buffer[950]
+    order_table = np.frombuffer(buffer, np.uint8, 128, 952)
+    n_patterns = int(order_table.max()) + 1
+    pattern_bytes = n_patterns * 64 * channels * 4
+    if 1084 + pattern_bytes > size:
+        raise ValueError("file ends inside the pattern data")
+
+    cells = np.frombuffer(buffer, np.uint8, pattern_bytes, 1084).reshape(n_patterns, 64, channels, 4)
+    b0, b1, b2, b3 = (cells[..., k] for k in range(4))
+    periods = ((b0 & 0x0F).astype(np.uint16) << 8) | b1
+    instruments = (b0 & 0xF0) | (b2 >> 4)
+
+    samples = []
+    offset = 1084 + pattern_bytes
+    for h in headers:
+        length = min(2 * int(h["length"]), max(0, size - offset))
+        finetune = int(h["finetune"]) & 0x0F
+        samples.append(ModSample(
+            name=h["name"].split(b"\0")[0].decode("latin-1"),
+            data=np.frombuffer(buffer, np.int8, length, offset),
+            finetune=finetune - 16 if finetune > 7 else finetune,
+            volume=min(64, int(h["volume"])),
+            loop_start=2 * int(h["loop_start"]),
+            loop_length=2 * int(h["loop_length"]),
+        ))
+        offset += length
+
+    return ModFile(
+        title=bytes(buffer[:20]).split(b"\0")[0].decode("latin-1"),
+        tag=tag,
+        samples=samples,
+        order=order_table[:song_length],
+        restart=buffer[951],
+        periods=periods,
+        notes=PERIOD_TO_NOTE[np.minimum(periods, 4095)],
+        instruments=instruments,
+        effects=b2 & 0x0F,
+        params=b3,
+        buffer=buffer,
+    )
+
+
+def load_mod(path, use_mmap: bool = True) -> ModFile:
+    """Read a .mod once - or map it - and parse it in place."""
+    with open(path, "rb") as f:
+        if use_mmap and Path(path).stat().st_size:
+            return parse_mod(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        return parse_mod(f.read())
+
+
+def build_mod(title: str, samples: Sequence[Tuple], order: Sequence[int],
+              periods, instruments, effects, params) -> bytes:
+    """Serialize a 4-channel M.K. module - for demos and tests.
+
+    samples are (name, int8 data, volume, finetune, loop_start,
+    loop_length) with loop values in bytes; the cell arrays are
+    shaped (patterns, 64, 4).
+    """
+    header = bytearray(1084)
+    header[:20] = title.encode("latin-1")[:20].ljust(20, b"\0")
+    slots = np.zeros(31, dtype=SAMPLE_HEADER)
+    for k, (name, data, volume, finetune, loop_start, loop_length) in enumerate(samples):
+        slots[k] = (name.encode("latin-1")[:22], len(data) // 2, finetune & 0x0F, volume,
+                    loop_start // 2, max(1, loop_length // 2))
+    header[20:950] = slots.tobytes()
+    header[950] = len(order)
+    header[951] = 127
+    header[952:952 + len(order)] = bytes(order)
+    header[1080:1084] = b"M.K."
+
+    periods = np.asarray(periods, dtype=np.uint16)
+    instruments = np.asarray(instruments, dtype=np.uint8)
+    cells = np.empty(periods.shape + (4,), dtype=np.uint8)
+    cells[..., 0] = (instruments & 0xF0) | (periods >> 8)
+    cells[..., 1] = periods & 0xFF
+    cells[..., 2] = ((instruments & 0x0F) << 4) | (np.asarray(effects, dtype=np.uint8) & 0x0F)
+    cells[..., 3] = np.asarray(params, dtype=np.uint8)
+    body = b"".join(np.asarray(s[1], dtype=np.int8)[: len(s[1]) // 2 * 2].tobytes() for s in samples)
+    return bytes(header) + cells.tobytes() + body
+
+
+def make_demo_mod(patterns: int = 4, seed: int = 0, positions: int = 0) -> bytes:
+    """Bass, lead and drums over a looped square, a looped sine and noise.
+
+    The order list cycles through the patterns; positions defaults to
+    two passes. At speed 6 each position lasts 7.68 s.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(64)
+    square = np.where(t % 32 < 16, 100, -100).astype(np.int8)
+    sine = (np.sin(2 * np.pi * np.arange(128) / 128) * 110).astype(np.int8)
+    noise = (rng.integers(-120, 120, 2048) * np.linspace(1, 0, 2048)).astype(np.int8)
+    samples = [
+        ("square", square, 48, 0, 0, 64),
+        ("sine", sine, 64, 0, 0, 128),
+        ("noise", noise, 64, 0, 0, 0),
+    ]
+    shape = (patterns, 64, 4)
+    periods = np.zeros(shape, dtype=np.uint16)
+    instruments = np.zeros(shape, dtype=np.uint8)
+    effects = np.zeros(shape, dtype=np.uint8)
+    params = np.zeros(shape, dtype=np.uint8)
+    roots = [0, 5, 7, 3]
+    for p in range(patterns):
+        root = roots[p % len(roots)]
+        for row in range(0, 64, 8):  # bass on channel 0, arpeggiated
+            periods[p, row, 0] = PERIODS[root + (row // 8 % 2) * 12]
+            instruments[p, row, 0] = 1
+            effects[p, row + 1:row + 8, 0], params[p, row + 1:row + 8, 0] = 0x0, 0x37
+        for row in range(0, 64, 4):  # lead on channel 1, with vibrato and slides
+            periods[p, row, 1] = PERIODS[12 + root + int(rng.choice([0, 3, 7, 10, 12]))]
+            instruments[p, row, 1] = 2
+            effects[p, row + 1, 1], params[p, row + 1, 1] = 0x4, 0x46
+            effects[p, row + 3, 1], params[p, row + 3, 1] = 0xA, 0x04
+            if row % 16 == 8:  # glide into every other note
+                effects[p, row, 1], params[p, row, 1] = 0x3, 0x20
+        for row in range(0, 64, 4):  # drums on channel 2
+            periods[p, row, 2] = PERIODS[24 if row % 8 else 12]
+            instruments[p, row, 2] = 3
+        effects[p, 0, 3], params[p, 0, 3] = 0xF, 6  # speed 6 on channel 3
+    order = [p % patterns for p in range(min(positions or 2 * patterns, 128))]
+    return build_mod("literate garden demo", samples, order, periods, instruments, effects, params)
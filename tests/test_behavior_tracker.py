@@ -0,0 +1,199 @@
+"""Regression tests for the behavior_tracker engine, run headless through load_cells."""
+import pickle
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from behavior_tracker_bench import ENGINE_CELLS, NOTEBOOK, load_cells  # noqa: E402
+from forkpool import fork_map  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return load_cells(NOTEBOOK, ENGINE_CELLS + ["define_frame_store", "define_frame_archive", "define_realtime",
+                                                "create_demo_patterns", "define_benchmark_songs"])
+
+
+def test_frame_messages_survive_event_ring_wrap(engine):
+    plain = engine["SongPlayer"](engine["demo_song"], engine["World"](gravity=0.3)).run_all(100)
+    world = engine["World"](gravity=0.3, events=engine["EventLog"](capacity=8))
+    frames = engine["SongPlayer"](engine["demo_song"], world).run_all(100)
+    assert world.events.head > world.events.capacity
+    assert list(frames[1].messages) == list(plain[1].messages) != []
+    assert [list(f.messages) for f in frames] == [list(f.messages) for f in plain]
+
+
+def test_live_window_past_the_ring_raises(engine):
+    log = engine["EventLog"](capacity=4)
+    messages = log.view()
+    for i in range(6):
+        messages.append(f"note {i}")
+    with pytest.raises(IndexError, match="evicted"):
+        list(messages)
+
+
+def test_guard_period_is_the_lcm_of_every_moduli(engine):
+    assert engine["lcm"]() == 1
+    assert engine["lcm"](4, 6, 10) == 60
+    guarded = engine["when"](engine["every"](4) | engine["every"](6), engine["move"](1, 0))
+    pattern = engine["Pattern"]("p", 4, [engine["Channel"]("a", "enemy", [guarded])])
+    assert pattern.freeze().period == 12
+
+
+def test_every_zero_is_rejected(engine):
+    with pytest.raises(ValueError, match="n >= 1"):
+        engine["every"](0)
+
+
+def played_to(engine, song, world_cls, ticks):
+    player = engine["SongPlayer"](song, world_cls(gravity=0.3))
+    while player.position.total_tick < ticks:
+        player.advance(player.current_pattern())
+    return player
+
+
+@pytest.mark.parametrize("world", ["World", "ArrayWorld"])
+@pytest.mark.parametrize("ticks", [300, 1001])
+def test_fast_forward_lands_where_playback_does(engine, world, ticks):
+    e = engine
+    late = e["Pattern"]("late", 2, [
+        e["Channel"]("a", "world", [e["when"](e["every"](4, 2), e["flag"]("late")), e["nop"]()]),
+    ])
+    songs = [e["looping_song"], e["Song"]("late_flag", {"late": late}, ["late"], 0)]
+    for song in songs:
+        skipper = e["SongPlayer"](song, e[world](gravity=0.3))
+        assert skipper.fast_forward(ticks) is not None
+        full = played_to(e, song, e[world], ticks)
+        assert skipper.position == full.position
+        assert skipper.world.tick == full.world.tick
+        assert skipper.world.state_key() == full.world.state_key()
+
+
+@pytest.mark.parametrize("world", ["World", "ArrayWorld"])
+def test_frame_store_replays_playback(engine, world):
+    e = engine
+    frames = e["SongPlayer"](e["looping_song"], e[world](gravity=0.3)).run_all(300)
+    store = e["record_song"](e["SongPlayer"](e["looping_song"], e[world](gravity=0.3)), 300,
+                             keyframe_every=16)
+    assert len(store) == len(frames)
+    for t in range(0, 300, 7):
+        assert store[t] == frames[t]
+    assert list(store) == frames
+
+
+@pytest.mark.parametrize("world", ["World", "ArrayWorld"])
+def test_unique_names_in_a_burst(engine, world):
+    w = engine[world]()
+    w.add_entity("bullet_3_2", "bullet", 0, 0)  # a name taken by hand is skipped
+    w.tick = 3
+    snap = w.snapshot()
+    names = []
+    for _ in range(500):
+        names.append(w.unique_name("bullet"))
+        w.add_entity(names[-1], "bullet", 0, 0)
+    assert names[:3] == ["bullet_3", "bullet_3_1", "bullet_3_3"]
+    assert len(set(names)) == 500
+    w.tick += 1
+    assert w.unique_name("bullet") == "bullet_4"
+    w.restore(snap)
+    assert w.unique_name("bullet") == "bullet_3"
+
+
+def test_clock_stats_stay_bounded(engine):
+    stats = engine["ClockStats"](sample_size=64)
+    started = 0.0
+    for k in range(10_000):
+        started += 0.009 if k % 2 else 0.011
+        stats.observe(0.001 * (k % 3), started)
+    assert len(stats.lateness_sample) == 64
+    assert stats.mean_lateness_ms == pytest.approx(1.0, abs=1e-3)
+    assert stats.jitter_ms == pytest.approx(1.0, abs=1e-3)
+    assert 0 <= stats.p99_ms <= 2.0
+
+
+def test_realtime_clock_renders_in_a_worker_thread(engine):
+    import asyncio
+    import threading
+
+    seen = []
+    player = engine["SongPlayer"](engine["looping_song"], engine["World"](gravity=0.3))
+    clock = engine["RealtimeClock"](player, 500, lambda frame: seen.append(threading.get_ident()))
+    stats = asyncio.run(clock.run(50))
+    assert stats.ticks == stats.observed == 50
+    assert seen and threading.get_ident() not in seen
+
+
+@pytest.mark.parametrize("logged", [False, True])
+def test_frame_archive_round_trips_frames(engine, tmp_path, logged):
+    e = engine
+    frames = e["SongPlayer"](e["looping_song"], e["World"](gravity=0.3)).run_all(300)
+    world = e["World"](gravity=0.3, events=e["EventLog"]() if logged else None)
+    path = tmp_path / "run.btarch"
+    assert e["export_frames"](e["SongPlayer"](e["looping_song"], world).frames(300), path) == 300
+    with e["FrameArchive"](path) as archive:
+        assert len(archive) == 300
+        assert sum(f.messages != [] for f in frames) > 0
+        for t in range(300):
+            assert archive.frame(t) == frames[t]
+        player = archive.trajectory("player")
+        assert list(player["tick"]) == [t for t, f in enumerate(frames) if "player" in f.entities]
+        assert len(archive.trajectory("nobody")) == 0
+        died = {(t, name) for t, name in archive.deaths()}
+        assert died == {(t, name) for t in range(1, 300) for name, s in frames[t].entities.items()
+                        if not s["alive"] and frames[t - 1].entities.get(name, {}).get("alive")}
+
+
+def test_compact_rows_keep_the_list_protocol(engine):
+    e = engine
+    rows = e["Channel"]("a", "enemy", [e["move"](1, 0), e["nop"]()]).rows
+    rows.append(e["say"]("hi"))
+    rows.extend([e["jump"](2), e["die"]()])
+    rows.insert(0, e["spawn"](1, 1))
+    rows[1:3] = [e["flag"]("x")]
+    del rows[-1]
+    assert rows.pop() == e["jump"](2)
+    assert rows == [e["spawn"](1, 1), e["flag"]("x"), e["say"]("hi")]
+    assert rows[1:] == [e["flag"]("x"), e["say"]("hi")]
+    assert rows.index(e["say"]("hi")) == 2 and e["flag"]("x") in rows
+    assert rows != [e["spawn"](1, 1)]
+
+
+def test_song_channels_share_the_song_palette(engine):
+    e = engine
+    pattern = e["Pattern"]("p", 2, [e["Channel"]("a", "enemy", [e["say"]("song one"), e["nop"]()]),
+                                    e["Channel"]("b", "enemy", [e["nop"](), e["nop"]()])])
+    song = e["Song"]("one", {"p": pattern}, ["p"])
+    other = e["Song"]("two", {"q": e["Pattern"]("q", 1, [e["Channel"]("c", "enemy",
+                                                                      [e["say"]("song two")])])})
+    assert all(ch.rows.palette is song.palette for ch in pattern.channels)
+    assert song.palette.behaviors == [e["say"]("song one"), e["nop"]()]
+    assert e["say"]("song one") not in other.palette.behaviors
+    assert pattern.channels[0].rows == [e["say"]("song one"), e["nop"]()]
+
+
+def test_rows_pickle_as_behaviors(engine):
+    e = engine
+    song = e["Song"]("s", {"p": e["Pattern"]("p", 2, [
+        e["Channel"]("a", "enemy", [e["when"](e["every"](2), e["move"](1, 0)), e["say"]("x")]),
+        e["Channel"]("b", "enemy", [e["say"]("x"), e["nop"]()]),
+    ])}, ["p"])
+    copy = pickle.loads(pickle.dumps(song))
+    channels = copy.patterns["p"].channels
+    assert [ch.rows for ch in channels] == [ch.rows for ch in song.patterns["p"].channels]
+    assert channels[0].rows[0] is e["when"](e["every"](2), e["move"](1, 0))  # interned again
+    assert channels[0].rows.palette is channels[1].rows.palette
+    assert len(channels[0].rows.palette) == 3
+
+
+def test_rows_built_in_a_forked_worker_decode_in_the_parent(engine):
+    e = engine
+
+    def build(i):
+        # behaviors the parent has never seen, numbered in the worker's palette
+        return e["Channel"](f"c{i}", "enemy", [e["say"](f"worker {i}.{k}") for k in range(3)]).rows
+
+    results = fork_map(build, range(4), workers=2, chunksize=1)
+    assert results == [[e["say"](f"worker {i}.{k}") for k in range(3)] for i in range(4)]
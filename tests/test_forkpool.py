@@ -0,0 +1,28 @@
+"""fork_map: closures run in forked workers, results come back in item order."""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from forkpool import fork_map  # noqa: E402
+
+
+def test_results_in_item_order_with_closure():
+    offset = 100
+    seen = []
+    results = fork_map(lambda n: n * n + offset, range(50), workers=4, chunksize=3,
+                       on_result=lambda i, r: seen.append(i))
+    assert results == [n * n + offset for n in range(50)]
+    assert sorted(seen) == list(range(50))
+
+
+def test_worker_exception_reaches_parent():
+    def fail_on_seven(n):
+        if n == 7:
+            raise ValueError("seven")
+        return n
+
+    with pytest.raises(RuntimeError, match="seven"):
+        fork_map(fail_on_seven, range(20), workers=2, chunksize=4)
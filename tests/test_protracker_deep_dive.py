@@ -0,0 +1,38 @@
+"""Regression tests for protracker_deep_dive's corpus analyzer, run headless through load_cells."""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from behavior_tracker_bench import load_cells  # noqa: E402
+
+NOTEBOOK = Path(__file__).resolve().parent.parent / "protracker_deep_dive.py"
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return load_cells(NOTEBOOK, ["corpus_analyzer"])
+
+
+def test_bad_files_are_recorded_not_fatal(analyzer, tmp_path):
+    good = analyzer["make_demo_mod"](patterns=2)
+    for k in range(6):
+        (tmp_path / f"good_{k}.mod").write_bytes(good)
+    (tmp_path / "truncated.mod").write_bytes(good[:1500])
+    (tmp_path / "garbage.mod").write_bytes(b"not a module")
+    (tmp_path / "no_channels.mod").write_bytes(good[:1080] + b"0CHN" + good[1084:])
+
+    results = analyzer["scan_corpus"](tmp_path, workers=2, chunksize=2)
+    errors = {Path(r["path"]).name: r.get("error") for r in results}
+    assert sum(e is None for e in errors.values()) == 6
+    assert all(errors[name] for name in ("truncated.mod", "garbage.mod", "no_channels.mod"))
+
+    rescan = analyzer["scan_corpus"](tmp_path, workers=2, chunksize=2)
+    assert all(r["cached"] for r in rescan)
+
+
+def test_unreadable_file_is_recorded(analyzer, tmp_path):
+    result = analyzer["analyze_file"](str(tmp_path / "missing.mod"), tmp_path)
+    assert result["error"] and not result["cached"]
@@ -0,0 +1,77 @@
+"""Regression tests for the tracker_as_dsl MOD engine, run headless through load_cells."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from behavior_tracker_bench import load_cells  # noqa: E402
+
+NOTEBOOK = Path(__file__).resolve().parent.parent / "tracker_as_dsl.py"
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return load_cells(NOTEBOOK, ["execution_layer", "mod_loader", "effect_tables", "mod_mixer"],
+                      {"questions": []})
+
+
+def test_glide_without_target_keeps_period(engine):
+    effects = engine["ChannelEffects"](2, [64], [0])
+    none = np.zeros(2, dtype=np.uint8)
+    effects.row(np.array([13, 0], dtype=np.uint8), np.array([1, 0], dtype=np.uint8), none, none)
+    start = effects.period.copy()
+    for effect in (0x3, 0x5):  # glide effects with no note ever latched as a target
+        effects.row(none, none, np.full(2, effect, dtype=np.uint8), np.full(2, 0x20, dtype=np.uint8))
+        for tick in range(1, 6):
+            period, _ = effects.tick(tick)
+            assert (period == start).all()
+
+
+def test_glide_stays_in_period_range(engine):
+    effects = engine["ChannelEffects"](1, [64], [0])
+    none = np.zeros(1, dtype=np.uint8)
+    effects.row(np.array([1], dtype=np.uint8), np.array([1], dtype=np.uint8), none, none)
+    effects.row(np.array([36], dtype=np.uint8), none, np.array([0x3], dtype=np.uint8),
+                np.array([0xFF], dtype=np.uint8))
+    periods = [int(effects.tick(t)[0][0]) for t in range(1, 6)]
+    low, high = engine["PERIODS"].min(), engine["PERIODS"].max()
+    assert all(low <= p <= high for p in periods)
+    assert periods[-1] == engine["FINETUNE_PERIODS"][0, 35]
+
+
+def test_slides_leave_a_silent_channel_silent(engine):
+    effects = engine["ChannelEffects"](2, [64], [0])
+    none = np.zeros(2, dtype=np.uint8)
+    for effect in (0x1, 0x2):
+        effects.row(none, none, np.full(2, effect, dtype=np.uint8), np.full(2, 0x10, dtype=np.uint8))
+        for tick in range(1, 6):
+            period, _ = effects.tick(tick)
+            assert (period == 0).all()
+
+
+def test_ticks_resume_mid_row_and_keep_the_pending_break(engine):
+    shape = (2, 64, 4)
+    periods, instruments = np.zeros(shape, np.uint16), np.zeros(shape, np.uint8)
+    effects, params = np.zeros(shape, np.uint8), np.zeros(shape, np.uint8)
+    periods[:, ::4, 0], instruments[:, ::4, 0] = engine["PERIODS"][12], 1
+    effects[0, 1, 3] = 0xD  # pattern break on row 1: position 1 starts after two rows
+    square = np.where(np.arange(64) % 32 < 16, 100, -100).astype(np.int8)
+    data = engine["build_mod"]("break", [("square", square, 64, 0, 0, 64)], [0, 1],
+                               periods, instruments, effects, params)
+
+    whole = list(engine["ModMixer"](engine["parse_mod"](data)).ticks())
+    mixer = engine["ModMixer"](engine["parse_mod"](data))
+    first = mixer.ticks()
+    resumed = [next(first) for _ in range(9)]  # stop three ticks into row 1
+    resumed += list(mixer.ticks())
+    assert len(whole) == len(resumed) == (2 + 64) * 6
+    assert all((a == b).all() for a, b in zip(whole, resumed))
+
+
+def test_zero_channel_tag_is_rejected(engine):
+    data = engine["make_demo_mod"]()
+    with pytest.raises(ValueError, match="no channels"):
+        engine["parse_mod"](data[:1080] + b"0CHN" + data[1084:])
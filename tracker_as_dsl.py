@@ -132,6 +132,541 @@ def execution_layer(questions):
     return Pattern, TrackerRow, TrackerInterpreter, pattern, execution_log, findings
 
 
+@app.cell
+def mod_loader():
+    """Read real ProTracker modules: pattern data as arrays, samples as views.
+
+    The reader lives in modfile.py, so protracker_deep_dive's corpus
+    analyzer parses modules with exactly the same code.
+    """
+    from typing import Optional
+    import numpy as np
+
+    from modfile import (NOTE_NAMES, PERIODS, PERIOD_TO_NOTE, note_name, ModSample, ModFile,
+                         parse_mod, load_mod, build_mod, make_demo_mod)
+
+    return (NOTE_NAMES, PERIODS, PERIOD_TO_NOTE, note_name, ModSample, ModFile,
+            parse_mod, load_mod, build_mod, make_demo_mod, np, Optional)
+
+
+@app.cell
+def demo_module(make_demo_mod):
+    """A small generated module, since the repo ships no .mod files."""
+    demo_mod_bytes = make_demo_mod()
+
+    return demo_mod_bytes,
+
+
+@app.cell
+def measure_mod_loading(make_demo_mod, demo_mod_bytes, parse_mod, load_mod, TrackerRow,
+                        TrackerInterpreter, np):
+    """Parse the demo module, feed it to the interpreter, time a corpus."""
+    import os
+    import tempfile
+    import time
+
+    demo_mod = parse_mod(demo_mod_bytes)
+    mod_interpreter = TrackerInterpreter()
+    mod_log = []
+    for _i, _row in enumerate(demo_mod.rows(0, 1, TrackerRow)[:8]):
+        _actions = mod_interpreter.execute_row(_row)
+        if _actions:
+            mod_log.append(f"Row {_i:02d}: {', '.join(_actions)}")
+
+    sample_is_view = all(np.shares_memory(s.data, np.frombuffer(demo_mod_bytes, np.uint8))
+                         for s in demo_mod.samples if len(s.data))
+
+    corpus_dir = tempfile.mkdtemp()
+    corpus = []
+    for k in range(200):
+        path = os.path.join(corpus_dir, f"demo_{k:03d}.mod")
+        with open(path, "wb") as f:
+            f.write(make_demo_mod(patterns=1 + k % 16, seed=k))
+        corpus.append(path)
+    _start = time.perf_counter()
+    loaded = [load_mod(path) for path in corpus]
+    load_ms = (time.perf_counter() - _start) / len(corpus) * 1e3
+    cells_loaded = sum(m.notes.size for m in loaded)
+    for path in corpus:
+        os.remove(path)
+    os.rmdir(corpus_dir)
+
+    mod_summary = (
+        f"MOD loader: '{demo_mod.title}' has {len(demo_mod.order)} positions over "
+        f"{demo_mod.periods.shape[0]} patterns; samples are views of the file buffer: "
+        f"{sample_is_view}; {len(corpus)} mmapped modules ({cells_loaded:,} cells) "
+        f"loaded at {load_ms:.2f} ms each"
+    )
+
+    return demo_mod, mod_log, mod_summary, os, tempfile, time
+
+
+@app.cell
+def effect_tables(PERIODS, np):
+    """Amiga pitch and LFO tables, and a per-tick effect engine that only indexes them."""
+
+    # Periods for each finetune (row = finetune & 0xF, so rows 8..15 are -8..-1),
+    # one eighth of a semitone apart, derived from the finetune-0 table
+    _finetunes = np.where(np.arange(16) < 8, np.arange(16), np.arange(16) - 16)
+    FINETUNE_PERIODS = np.round(PERIODS[None, :] * 2.0 ** (-_finetunes[:, None] / 96.0)).astype(np.int32)
+    FINETUNE_PERIODS[0] = PERIODS
+    MIN_PERIOD, MAX_PERIOD = 113, 856
+
+    # ProTracker's half-sine; one LFO cycle is 64 steps
+    _half_sine = np.array([0, 24, 49, 74, 97, 120, 141, 161, 180, 197, 212, 224, 235, 244, 250, 253,
+                           255, 253, 250, 244, 235, 224, 212, 197, 180, 161, 141, 120, 97, 74, 49, 24])
+    LFO_WAVEFORMS = np.stack([
+        np.concatenate([_half_sine, -_half_sine]),                  # 0: sine
+        255 - np.arange(64) * 8,                                     # 1: ramp down
+        np.where(np.arange(64) < 32, 255, -255),                     # 2: square
+        np.random.default_rng(0).integers(-255, 256, 64),            # 3: random
+    ]).astype(np.int32)
+
+    class ChannelEffects:
+        """Pitch and volume state for every channel, stepped one tick at a time.
+
+        row() latches a row's notes, instruments and effects and plans the
+        work for its ticks; tick() applies 0xy, 1xx, 2xx, 3xx, 4xy, 5xy,
+        6xy, 7xy and Axy to all channels at once with masks and table
+        lookups, returning the period and volume to play this tick. Effect
+        memory (3xx speed, 4xy/7xy speed and depth) persists like in
+        ProTracker; slides and glides on a channel with no note leave the pitch alone.
+        """
+
+        def __init__(self, channels: int, sample_volumes, sample_finetunes):
+            zeros = lambda: np.zeros(channels, dtype=np.int32)
+            self.sample_volume = np.asarray(sample_volumes, dtype=np.int32)
+            self.sample_finetune = np.asarray(sample_finetunes, dtype=np.int32) & 0xF
+            self.note, self.finetune = zeros(), zeros()
+            self.period, self.target, self.porta_speed = zeros(), zeros(), zeros()
+            self.volume = zeros()
+            self.effect, self.param = zeros(), zeros()
+            self.vib_pos, self.vib_speed, self.vib_depth = zeros(), zeros(), zeros()
+            self.trem_pos, self.trem_speed, self.trem_depth = zeros(), zeros(), zeros()
+            self.waveform = 0
+            self._plan(self.effect, self.param)
+
+        def row(self, notes, instruments, effects, params) -> np.ndarray:
+            """Latch one row; return the mask of channels whose sample restarts."""
+            notes, instruments = notes.astype(np.int32), instruments.astype(np.int32)
+            effects, params = effects.astype(np.int32), params.astype(np.int32)
+            self.effect, self.param = effects, params
+            x, y = params >> 4, params & 0xF
+
+            given = (instruments > 0) & (instruments <= len(self.sample_volume))
+            slot = np.where(given, instruments - 1, 0)
+            self.volume = np.where(given, self.sample_volume[slot], self.volume)
+            self.finetune = np.where(given, self.sample_finetune[slot], self.finetune)
+
+            has_note = notes > 0
+            gliding = has_note & ((effects == 0x3) | (effects == 0x5))
+            trigger = has_note & ~gliding
+            note = np.where(has_note, notes - 1, self.note)
+            pitch = FINETUNE_PERIODS[self.finetune, note]
+            self.target = np.where(gliding, pitch, self.target)
+            self.note = np.where(trigger, note, self.note)
+            self.period = np.where(trigger, pitch, self.period)
+            self.vib_pos = np.where(trigger, 0, self.vib_pos)
+            self.trem_pos = np.where(trigger, 0, self.trem_pos)
+
+            self.porta_speed = np.where((effects == 0x3) & (params > 0), params, self.porta_speed)
+            vib, trem = effects == 0x4, effects == 0x7
+            self.vib_speed = np.where(vib & (x > 0), x, self.vib_speed)
+            self.vib_depth = np.where(vib & (y > 0), y, self.vib_depth)
+            self.trem_speed = np.where(trem & (x > 0), x, self.trem_speed)
+            self.trem_depth = np.where(trem & (y > 0), y, self.trem_depth)
+            self.volume = np.where(effects == 0xC, np.minimum(params, 64), self.volume)
+            self._plan(effects, params)
+            return trigger
+
+        def _plan(self, effects, params) -> None:
+            """Precompute this row's per-tick work, so tick() skips idle effects.
+
+            Each slot is None when no channel uses the effect; otherwise it
+            holds the per-channel deltas or masks tick() applies.
+            """
+            x, y = params >> 4, params & 0xF
+            gliding = ((effects == 0x3) | (effects == 0x5)) & (self.target > 0) & (self.period > 0)
+            sliding = (effects == 0xA) | (effects == 0x5) | (effects == 0x6)
+            arpeggio = (effects == 0x0) & (params > 0)
+            vibrato = (effects == 0x4) | (effects == 0x6)
+            tremolo = effects == 0x7
+            pitched = self.period > 0  # 1xx/2xx on a channel with no note would invent one
+            pitch = (np.where(pitched & (effects == 0x1), -params, 0)
+                     + np.where(pitched & (effects == 0x2), params, 0))
+
+            self.slide_pitch = pitch if pitch.any() else None
+            self.glide = gliding if gliding.any() else None
+            self.slide_volume = np.where(sliding, np.where(x > 0, x, -y), 0) if sliding.any() else None
+            self.arpeggio = None
+            if arpeggio.any():
+                top = len(FINETUNE_PERIODS[0]) - 1
+                self.arpeggio = (self.note, np.minimum(self.note + x, top),
+                                 np.minimum(self.note + y, top), arpeggio)
+            self.vibrato = vibrato.astype(np.int32) if vibrato.any() else None
+            self.tremolo = tremolo.astype(np.int32) if tremolo.any() else None
+            self.running = any(v is not None for v in (self.slide_pitch, self.glide, self.slide_volume,
+                                                        self.arpeggio, self.vibrato, self.tremolo))
+
+        def tick(self, tick: int):
+            """Advance the running effects; return (period, volume) for this tick."""
+            if tick == 0 or not self.running:
+                return self.period, self.volume
+            if self.slide_pitch is not None:
+                self.period = np.clip(self.period + self.slide_pitch, MIN_PERIOD, MAX_PERIOD)
+            if self.glide is not None:
+                step = np.clip(self.target - self.period, -self.porta_speed, self.porta_speed)
+                self.period = np.where(self.glide, np.clip(self.period + step, MIN_PERIOD, MAX_PERIOD),
+                                       self.period)
+            if self.slide_volume is not None:
+                self.volume = np.clip(self.volume + self.slide_volume, 0, 64)
+
+            period, volume = self.period, self.volume
+            if self.arpeggio is not None:
+                shifted = FINETUNE_PERIODS[self.finetune, self.arpeggio[tick % 3]]
+                period = np.where(self.arpeggio[3], shifted, period)
+            if self.vibrato is not None:
+                wobble = (LFO_WAVEFORMS[self.waveform, self.vib_pos] * self.vib_depth) >> 7
+                period = period + self.vibrato * wobble
+                self.vib_pos = (self.vib_pos + self.vibrato * self.vib_speed) & 63
+            if self.tremolo is not None:
+                swell = (LFO_WAVEFORMS[self.waveform, self.trem_pos] * self.trem_depth) >> 6
+                volume = np.clip(volume + self.tremolo * swell, 0, 64)
+                self.trem_pos = (self.trem_pos + self.tremolo * self.trem_speed) & 63
+            return period, volume
+
+    return FINETUNE_PERIODS, LFO_WAVEFORMS, ChannelEffects
+
+
+@app.cell
+def mod_mixer(ChannelEffects, np, Optional):
+    """Turn a ModFile into 44.1 kHz stereo PCM, one NumPy pass per tick."""
+    import struct
+
+    PAL_CLOCK = 3546894.6     # Paula's sample clock: rate = PAL_CLOCK / period
+    AMIGA_PANNING = "LRRL"    # hard-panned channels, repeating for wider modules
+
+    class ModMixer:
+        """Offline renderer: sequences rows and mixes every channel per tick.
+
+        Pitch and volume come from ChannelEffects, stepped once per tick for
+        all channels. Per tick all channels are then resampled at once
+        (nearest neighbour, like Paula) from one bank holding every sample.
+        """
+
+        def __init__(self, mod, rate: int = 44100, separation: float = 1.0):
+            self.mod = mod
+            self.rate = rate
+            channels = mod.channels
+            pan = np.array([1.0 if AMIGA_PANNING[c % 4] == "L" else 0.0 for c in range(channels)])
+            pan = 0.5 + (pan - 0.5) * separation
+            self.pan = np.stack([pan, 1.0 - pan]) * (2.0 / channels)   # (2, channels)
+
+            # bank[0] is silence; sample k starts at base[k]
+            offsets, chunks, size = [], [np.zeros(1, dtype=np.float32)], 1
+            for s in mod.samples:
+                offsets.append(size)
+                chunks.append(s.data.astype(np.float32) / 128.0)
+                size += len(s.data)
+            self.bank = np.concatenate(chunks)
+            self.sample_base = np.array(offsets, dtype=np.int64)
+
+            self.effects = ChannelEffects(channels, [smp.volume for smp in mod.samples],
+                                          [smp.finetune for smp in mod.samples])
+            self.sample = np.full(channels, -1)
+            self.pos = np.zeros(channels)
+            self.step = np.zeros(channels)
+            self.base = np.zeros(channels, dtype=np.int64)
+            self.end = np.zeros(channels)
+            self.loop_start = np.zeros(channels)
+            self.loop_length = np.zeros(channels)
+            self.active = np.zeros(channels, dtype=bool)
+            self.volume = np.zeros(channels)
+            self._ramp = np.arange(rate, dtype=np.float64)
+
+            self.speed, self.bpm = 6, 125
+            self.position, self.row, self.tick = 0, 0, 0
+            self.finished = len(mod.order) == 0
+            self._tick_carry = 0.0
+            self._jump: Optional[tuple] = None  # the current row's B/D jump, taken after its last tick
+
+        def _trigger(self, channel: int, sample: int) -> None:
+            s = self.mod.samples[sample]
+            self.base[channel] = self.sample_base[sample]
+            self.pos[channel] = 0.0
+            self.active[channel] = len(s.data) > 0
+            if s.looped:
+                self.loop_start[channel] = min(s.loop_start, len(s.data))
+                self.end[channel] = min(s.loop_start + s.loop_length, len(s.data))
+                self.loop_length[channel] = self.end[channel] - self.loop_start[channel]
+            else:
+                self.loop_length[channel] = 0.0
+                self.end[channel] = len(s.data)
+
+        def _play_row(self) -> Optional[tuple]:
+            """Apply the current row to every channel; return (position, row) to jump to."""
+            pattern, row = int(self.mod.order[self.position]), self.row
+            instruments = self.mod.instruments[pattern, row]
+            effects, params = self.mod.effects[pattern, row], self.mod.params[pattern, row]
+            given = (instruments > 0) & (instruments <= len(self.mod.samples))
+            self.sample = np.where(given, instruments.astype(np.int64) - 1, self.sample)
+            restart = self.effects.row(self.mod.notes[pattern, row], instruments, effects, params)
+            for c in np.flatnonzero(restart & (self.sample >= 0)):
+                self._trigger(c, int(self.sample[c]))
+
+            jump = None
+            for c in np.flatnonzero((effects == 0xB) | (effects == 0xD) | (effects == 0xF)):
+                effect, param = int(effects[c]), int(params[c])
+                if effect == 0xF and param:
+                    if param < 32:
+                        self.speed = param
+                    else:
+                        self.bpm = param
+                elif effect == 0xB:
+                    jump = (param, 0)
+                elif effect == 0xD:
+                    target = (jump[0] if jump else self.position + 1, (param >> 4) * 10 + (param & 0xF))
+                    jump = (target[0], target[1] if target[1] < 64 else 0)
+            return jump
+
+        def _advance_row(self, jump: Optional[tuple]) -> None:
+            if jump is None:
+                self.row += 1
+                if self.row == 64:
+                    self.position, self.row = self.position + 1, 0
+            else:
+                if jump[0] <= self.position and (jump[0], jump[1]) != (self.position + 1, 0):
+                    self.finished = True  # a backwards jump loops the song forever
+                self.position, self.row = jump
+            if self.position >= len(self.mod.order):
+                self.finished = True
+
+        def mix(self, frames: int) -> np.ndarray:
+            """Mix the next frames samples of every channel into (frames, 2) float32."""
+            ramp = self._ramp[:frames]
+            rel = self.pos[:, None] + self.step[:, None] * ramp
+            looped = self.loop_length > 0
+            over = rel >= self.end[:, None]
+            if over.any():
+                span = np.maximum(self.loop_length, 1.0)[:, None]
+                start = self.loop_start[:, None]
+                into = rel - start
+                wrapped = start + into - span * np.floor(into / span)  # np.mod is ~3x slower
+                rel = np.where(over & looped[:, None], wrapped, rel)
+                silent = over & ~looped[:, None]
+            else:
+                silent = None
+            index = self.base[:, None] + rel.astype(np.int64)
+            if silent is not None:
+                index[silent] = 0
+            index[~self.active] = 0
+            voices = self.bank[index] * (self.volume * self.active)[:, None].astype(np.float32)
+
+            self.pos += self.step * frames
+            wrap = looped & (self.pos >= self.end)
+            self.pos[wrap] = self.loop_start[wrap] + np.mod(self.pos[wrap] - self.loop_start[wrap],
+                                                            self.loop_length[wrap])
+            self.active &= looped | (self.pos < self.end)
+            return (self.pan.astype(np.float32) @ voices).T
+
+        def ticks(self):
+            """Yield the mixed (frames, 2) float32 block of each tick until the song ends.
+
+            Mixer state lives on self and is advanced before each yield, so
+            a new ticks() picks up mid-row exactly where an abandoned one
+            stopped.
+            """
+            while not self.finished:
+                if self.tick == 0:
+                    self._jump = self._play_row()
+                period, volume = self.effects.tick(self.tick)
+                self.step = np.where(period > 0, PAL_CLOCK / np.maximum(period, 1) / self.rate, 0.0)
+                self.volume = volume / 64.0
+                exact = self.rate * 2.5 / self.bpm + self._tick_carry
+                frames = int(exact)
+                self._tick_carry = exact - frames
+                block = self.mix(frames)
+                self.tick += 1
+                if self.tick >= self.speed:
+                    self.tick = 0
+                    self._advance_row(self._jump)
+                yield block
+
+        def blocks(self, frames: int = 4096, max_seconds: Optional[float] = None):
+            """Yield the song as (frames, 2) int16 blocks; only the last may be shorter.
+
+            Tick output is copied into one reused buffer, so memory does
+            not grow with the length of the song.
+            """
+            buffer = np.empty((frames, 2), dtype=np.float32)
+            remaining = None if max_seconds is None else int(max_seconds * self.rate)
+            fill = 0
+            for tick in self.ticks():
+                if remaining is not None:
+                    tick = tick[:remaining]
+                    remaining -= len(tick)
+                while len(tick):
+                    take = min(frames - fill, len(tick))
+                    buffer[fill:fill + take] = tick[:take]
+                    fill += take
+                    tick = tick[take:]
+                    if fill == frames:
+                        yield to_pcm16(buffer)
+                        fill = 0
+                if remaining == 0:
+                    break
+            if fill:
+                yield to_pcm16(buffer[:fill])
+
+        def render(self, max_seconds: Optional[float] = None) -> np.ndarray:
+            """The whole song (or its first max_seconds) as (frames, 2) int16."""
+            blocks = list(self.blocks(max_seconds=max_seconds))
+            return np.concatenate(blocks) if blocks else np.zeros((0, 2), np.int16)
+
+    def to_pcm16(block: np.ndarray) -> np.ndarray:
+        return np.clip(block * 32767.0, -32768, 32767).astype(np.int16)
+
+    def write_wav(blocks, path, rate: int = 44100, channels: int = 2) -> int:
+        """Stream int16 blocks into a WAV file; return the frames written.
+
+        The RIFF and data sizes are unknown until the last block, so the
+        header is written with zeros and patched once the stream ends.
+        """
+        frames = 0
+        with open(path, "wb") as f:
+            f.write(struct.pack("<4sI4s4sIHHIIHH4sI", b"RIFF", 0, b"WAVE", b"fmt ", 16, 1, channels,
+                                rate, rate * channels * 2, channels * 2, 16, b"data", 0))
+            for block in blocks:
+                f.write(block.astype("<i2", copy=False).tobytes())
+                frames += len(block)
+            data_bytes = frames * channels * 2
+            f.seek(4)
+            f.write(struct.pack("<I", 36 + data_bytes))
+            f.seek(40)
+            f.write(struct.pack("<I", data_bytes))
+        return frames
+
+    return PAL_CLOCK, ModMixer, to_pcm16, write_wav
+
+
+@app.cell
+def benchmark_controls():
+    """Rendering minutes of audio takes seconds, so those cells wait for a click."""
+    import marimo as mo
+
+    run_benchmarks = mo.ui.run_button(label="Run benchmarks")
+
+    return mo, run_benchmarks
+
+
+@app.cell
+def measure_mixer(mo, run_benchmarks, make_demo_mod, parse_mod, ModMixer, np, time):
+    """Render a four-minute module and compare wall time with its duration."""
+    mo.stop(not run_benchmarks.value)
+
+    long_mod = parse_mod(make_demo_mod(positions=32))
+    _start = time.perf_counter()
+    _mixer = ModMixer(long_mod)
+    pcm = _mixer.render()
+    render_s = time.perf_counter() - _start
+    duration_s = len(pcm) / _mixer.rate
+    left, right = pcm[:, 0].astype(np.int64), pcm[:, 1].astype(np.int64)
+
+    mixer_summary = (
+        f"Mixer: {duration_s:.0f} s of {_mixer.rate} Hz stereo from {long_mod.channels} channels "
+        f"in {render_s:.2f} s ({duration_s / render_s:.0f}x real time); "
+        f"peak {np.abs(pcm).max()}, L/R differ on {np.mean(left != right):.0%} of frames"
+    )
+
+    return mixer_summary,
+
+
+@app.cell
+def measure_effects(mo, run_benchmarks, demo_mod, ChannelEffects, ModMixer, np, time):
+    """Trace a few effects tick by tick and weigh effect processing against mixing."""
+    mo.stop(not run_benchmarks.value)
+
+    def trace(effect: int, param: int, ticks: int = 6, volume: int = 32):
+        fx = ChannelEffects(1, [volume], [0])
+        fx.row(np.array([13]), np.array([1]), np.array([0]), np.array([0]))  # C-2
+        fx.row(np.array([25 if effect == 0x3 else 0]), np.array([0]), np.array([effect]), np.array([param]))
+        return [tuple(int(v[0]) for v in fx.tick(t)) for t in range(ticks)]
+
+    effect_traces = {
+        "037 arpeggio": [period for period, _ in trace(0x0, 0x37)],
+        "3 10 glide to C-3": [period for period, _ in trace(0x3, 0x10)],
+        "4 48 vibrato": [period for period, _ in trace(0x4, 0x48)],
+        "A 04 volume slide": [volume for _, volume in trace(0xA, 0x04)],
+    }
+
+    _mixer = ModMixer(demo_mod)
+    _played = 0
+    for _, _block in zip(range(2000), _mixer.ticks()):  # into the song, so effects are live
+        _played += len(_block)
+    _start = time.perf_counter()
+    for t in range(2000):
+        _mixer.effects.tick(t % 6)
+    fx_us = (time.perf_counter() - _start) / 2000 * 1e6
+    _start = time.perf_counter()
+    for _ in range(200):
+        _mixer.mix(882)
+    mix_us = (time.perf_counter() - _start) / 200 * 1e6
+
+    effects_summary = (
+        "Effects: " + "; ".join(f"{name} → {values}" for name, values in effect_traces.items())
+        + f". {_played / _mixer.rate:.0f} s into the song, one tick of effects for "
+        f"{demo_mod.channels} channels costs {fx_us:.0f} µs against {mix_us:.0f} µs to mix it"
+    )
+
+    return effect_traces, effects_summary
+
+
+@app.cell
+def measure_streaming(mo, run_benchmarks, make_demo_mod, parse_mod, ModMixer, write_wav,
+                      time, os, tempfile):
+    """Stream an 8 s and a 16 min module to WAV; peak RSS should not track length."""
+    mo.stop(not run_benchmarks.value)
+    import multiprocessing as mp
+    import resource
+    import wave
+
+    def stream_once(positions: int) -> dict:
+        mod = parse_mod(make_demo_mod(positions=positions))
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        frames = write_wav(ModMixer(mod).blocks(), path)
+        elapsed = time.perf_counter() - start
+        after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KiB on Linux
+        with wave.open(path) as w:
+            header_ok = w.getnframes() == frames and w.getframerate() == 44100
+        os.remove(path)
+        return {"seconds": frames / 44100, "realtime": frames / 44100 / elapsed,
+                "peak_rss_kib": after, "growth_kib": after - before, "header_ok": header_ok}
+
+    def in_fresh_process(positions: int) -> dict:
+        """Fork so each run's peak RSS starts from the same baseline."""
+        if "fork" not in mp.get_all_start_methods():
+            return stream_once(positions)
+        ctx = mp.get_context("fork")
+        results = ctx.Queue()
+        proc = ctx.Process(target=lambda: results.put(stream_once(positions)))
+        proc.start()
+        result = results.get()
+        proc.join()
+        return result
+
+    streaming_runs = [in_fresh_process(positions) for positions in (1, 128)]
+    streaming_summary = "Streaming to WAV: " + "; ".join(
+        f"{r['seconds']:.0f} s at {r['realtime']:.0f}x real time, peak RSS "
+        f"{r['peak_rss_kib'] / 1024:.0f} MiB (+{r['growth_kib'] / 1024:.1f} MiB)"
+        for r in streaming_runs
+    ) + f"; headers valid: {all(r['header_ok'] for r in streaming_runs)}"
+
+    return streaming_runs, streaming_summary
+
+
 @app.cell
 def game_dsl_sketch(findings):
     """Sketch: what would a 'game tracker' look like?"""
@@ -190,11 +725,12 @@ def reflection_layer(findings, game_dsl_questions):
 
 
 @app.cell
-def display(hypothesis, execution_log, game_tracker_idea, findings, insights, next_steps):
+def display(mo, hypothesis, execution_log, game_tracker_idea, findings, insights, next_steps,
+            mod_log, mod_summary, run_benchmarks):
     """Display exploration results."""
-    import marimo as mo
 
     log_md = "\n".join(f"- `{line}`" for line in execution_log)
+    mod_log_md = "\n".join(f"- `{line}`" for line in mod_log)
 
     output = mo.md(f"""
 # Tracker as DSL
@@ -207,6 +743,18 @@ def display(hypothesis, execution_log, game_tracker_idea, findings, insights, ne
 
 {log_md}
 
+## Real Modules
+
+{mod_summary}
+
+Tracing the effect engine, rendering a four-minute module and streaming a
+sixteen-minute one to WAV take a few seconds, so they wait for
+{run_benchmarks}.
+
+Lead channel of the demo module through the same interpreter:
+
+{mod_log_md}
+
 ## Game Tracker Sketch
 
 {game_tracker_idea}
@@ -227,5 +775,22 @@ def display(hypothesis, execution_log, game_tracker_idea, findings, insights, ne
     return output,
 
 
+@app.cell
+def display_benchmarks(mo, effects_summary, mixer_summary, streaming_summary):
+    """Effect, mixer and streaming results, once Run benchmarks has been pressed."""
+
+    benchmark_output = mo.md(f"""
+## Benchmarks
+
+{effects_summary}
+
+{mixer_summary}
+
+{streaming_summary}
+""")
+
+    return benchmark_output,
+
+
 if __name__ == "__main__":
     app.run()